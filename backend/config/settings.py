@@ -1,6 +1,6 @@
 # config/settings.py
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List
+from typing import Dict, List
 
 class Settings(BaseSettings):
     # Load from .env file
@@ -20,21 +20,119 @@ class Settings(BaseSettings):
     SEARCH_MAX_RESULTS_PER_QUERY: int = 10
     IMAGE_SEARCH_QUERIES_TO_GENERATE: int = 2
     IMAGE_SEARCH_MAX_RESULTS_PER_QUERY: int = 10
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
     RETRIEVER_TOP_K: int = 10
     IMAGE_RETRIEVER_TOP_K: int = 5
+    # "vector", "lexical" (BM25 only, no query embedding) or "hybrid" (both, fused by reciprocal rank).
+    RETRIEVAL_MODE: str = "hybrid"
+    # Used when regenerating a single question, where latency matters more than recall.
+    REGENERATE_RETRIEVAL_MODE: str = "lexical"
+    # Candidates taken from each of the vector and lexical rankings before fusion.
+    RETRIEVAL_FETCH_K: int = 30
+    # Diversify the vector candidates with maximal marginal relevance (0 = most diverse, 1 = most relevant).
+    RETRIEVAL_USE_MMR: bool = True
+    RETRIEVAL_MMR_LAMBDA: float = 0.5
+    RETRIEVAL_RRF_K: int = 60
+    # Append each question spec's prompt to its retrieval query, so specs can retrieve different context.
+    RETRIEVAL_QUERY_INCLUDES_PROMPT: bool = False
+    # Token budget for the retrieved context of each question generation prompt, counted with tiktoken.
+    QUESTION_GENERATOR_CONTEXT_TOKENS: int = 6000
+    # Share of that budget available to image descriptions; whatever they leave unused goes to text.
+    QUESTION_GENERATOR_IMAGE_CONTEXT_TOKENS: int = 1000
+    # Token budget for the document sample the spec generator sees for an uploaded file,
+    # picked by clustering chunk embeddings so long files are covered end to end.
+    SPEC_GENERATOR_CONTEXT_TOKENS: int = 3000
     
     # --- Data Ingestion & Exam Generation Configuration ---
     DOWNLOADER_TIMEOUT: int = 15
     INGESTION_CONCURRENT_DOWNLOADS: int = 5
+    # Shared HTTP session used by the crawler and the downloader.
+    FETCH_MAX_CONNECTIONS: int = 100
+    FETCH_MAX_CONNECTIONS_PER_HOST: int = 4
+    FETCH_DNS_CACHE_TTL_SECONDS: int = 300
+    FETCH_KEEPALIVE_TIMEOUT_SECONDS: int = 30
+    # Downloads larger than this are rejected, up front when the server sends Content-Length.
+    DOWNLOAD_MAX_BYTES: int = 100 * 1024 ** 2
+    # Bodies larger than this are spooled to a temporary file and partitioned from disk.
+    DOWNLOAD_SPOOL_THRESHOLD_BYTES: int = 8 * 1024 ** 2
+    # Capacity of the bounded queues between download, partition and embed/upsert stages.
+    INGESTION_QUEUE_SIZE: int = 8
+    # Chunks embedded and upserted together as soon as they are available.
+    EMBEDDING_BATCH_SIZE: int = 64
+    # Number of embedding batches in flight at once, bounded by the provider limits below.
+    EMBEDDING_CONCURRENCY: int = 4
+    EMBEDDING_REQUESTS_PER_MINUTE: int = 3000
+    EMBEDDING_TOKENS_PER_MINUTE: int = 1000000
+    EMBEDDING_MAX_RETRIES: int = 5
+    # Ceiling on concurrent LLM calls per model. Below it the limit adapts (AIMD) to 429s and latency spikes.
     EXAM_GENERATION_MAX_CONCURRENCY: int = 5
+    # Per-model ceilings overriding the one above, e.g. {"deepseek-reasoner": 2}.
+    LLM_MODEL_MAX_CONCURRENCY: Dict[str, int] = {}
+    LLM_MIN_CONCURRENCY: int = 1
+    # Calls this many times slower than a model's typical latency count as congestion. 0 disables the latency signal.
+    LLM_LATENCY_TOLERANCE: float = 3.0
+    LLM_MAX_RETRIES: int = 5
+    # "local" renders the exam paper and answer key from a template; "llm" additionally has the LLM polish them.
+    EXAM_COMPILER_MODE: str = "local"
+    # Questions of the same type solved together in one LLM call. 1 solves every question separately.
+    SOLVER_BATCH_SIZE: int = 5
+    MATH_SOLVER_BATCH_SIZE: int = 3
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
+    # Near-duplicate chunks (SimHash similarity at or above the threshold) are dropped before embedding.
+    DEDUP_ENABLED: bool = True
+    DEDUP_SIMILARITY_THRESHOLD: float = 0.9
+    # Chunks with fewer words than this (e.g. image placeholders) are never treated as duplicates.
+    DEDUP_MIN_TOKENS: int = 20
     CHROMA_BATCH_SIZE: int = 5000
     IMAGE_PARTITIONING_STRATEGY: str = "auto"
+    # Shared process pool for CPU-bound partitioning. 0 workers means one per CPU core.
+    PARTITION_POOL_WORKERS: int = 0
+    # Recycle a worker after this many documents to cap memory growth from OCR/layout models. 0 disables recycling.
+    PARTITION_POOL_MAX_TASKS_PER_CHILD: int = 50
+    PARTITION_POOL_PRELOAD_MODELS: bool = True
+    # PDFs are partitioned per run of pages: pages whose text layer has at least PDF_TEXT_LAYER_MIN_CHARS
+    # characters use the text strategy, the others (scans) are OCR'd with the scanned-page strategy.
+    PDF_PAGE_STRATEGY_ENABLED: bool = True
+    PDF_TEXT_LAYER_MIN_CHARS: int = 50
+    PDF_TEXT_PAGE_STRATEGY: str = "fast"
+    PDF_SCANNED_PAGE_STRATEGY: str = "hi_res"
+    # Runs of pages sharing a strategy are split into ranges of at most this many pages, partitioned in parallel.
+    PDF_PAGES_PER_PARTITION: int = 20
+    # Uploads are streamed to disk and rejected once they grow past this size.
+    UPLOAD_MAX_BYTES: int = 200 * 1024 ** 2
+
+    # --- Job Scheduler Configuration ---
+    # Number of exam jobs (topic, file or regenerate) allowed to run at the same time.
+    JOB_SCHEDULER_MAX_WORKERS: int = 3
+    # Maximum number of jobs waiting for a worker. Set to 0 for unlimited.
+    JOB_SCHEDULER_MAX_QUEUE_SIZE: int = 50
+    # Maximum number of queued or running jobs per client. Set to 0 for unlimited.
+    JOB_SCHEDULER_MAX_JOBS_PER_CLIENT: int = 2
 
     # --- Vector Store Configuration ---
     CHROMA_PERSIST_DIR: str = "./chroma_store"
+    # Run-scoped collections are kept this long after their last use so exams can still be regenerated.
+    RUN_COLLECTION_TTL_SECONDS: int = 6 * 60 * 60
+    RUN_COLLECTION_SWEEP_INTERVAL_SECONDS: int = 10 * 60
     
+    # --- Cache Configuration ---
+    # Root directory for all on-disk caches (downloads, partitions, embeddings, ...).
+    CACHE_DIR: str = "./cache"
+    HTTP_CACHE_ENABLED: bool = True
+    # Cached downloads younger than this are served without revalidation.
+    HTTP_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    HTTP_CACHE_MAX_BYTES: int = 2 * 1024 ** 3
+    # Partitioning results keyed by content hash, type, strategy and unstructured version.
+    PARTITION_CACHE_ENABLED: bool = True
+    PARTITION_CACHE_MAX_BYTES: int = 1024 ** 3
+    # Chunk embeddings keyed by (model, sha256 of chunk text), reused across collections and runs.
+    EMBEDDING_CACHE_ENABLED: bool = True
+    # Responses of deterministic agents (solvers, compiler, spec generator) keyed by (model, temperature, prompt hash).
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 60 * 60
+    LLM_CACHE_MAX_BYTES: int = 256 * 1024 ** 2
+
     # --- Web Crawler Configuration ---
     # User agent for your custom crawler's requests.
     CRAWLER_USER_AGENT: str = "ExamGeneratorBot/1.0 (Educational Research; +http://example.com/bot)"
@@ -49,6 +147,21 @@ class Settings(BaseSettings):
     
     # NEW: The maximum number of URLs to process after discovery. Set to 0 for unlimited.
     CRAWLER_MAX_DISCOVERED_URLS: int = 10
+    # Search hits are depth 0. Pages shallower than this are fetched to discover links.
+    CRAWLER_MAX_DEPTH: int = 2
+    # Maximum number of pages fetched for link discovery per run.
+    CRAWLER_MAX_PAGES_TO_FETCH: int = 30
+    CRAWLER_PER_DOMAIN_CONCURRENCY: int = 2
+    # Minimum spacing between two requests to the same domain.
+    CRAWLER_PER_DOMAIN_DELAY_SECONDS: float = 0.5
+    CRAWLER_RESPECT_ROBOTS_TXT: bool = True
+    CRAWLER_ROBOTS_CACHE_TTL_SECONDS: int = 60 * 60
+    # "streaming" parses pages incrementally as bytes arrive; "beautifulsoup" builds the full tree.
+    CRAWLER_LINK_EXTRACTOR: str = "streaming"
+    # Stop reading a crawled page after this many bytes. Truncated pages are not reused for ingestion.
+    CRAWLER_MAX_BODY_BYTES: int = 2 * 1024 ** 2
+    # Stop parsing a page once this many distinct links were found. Set to 0 for unlimited.
+    CRAWLER_MAX_LINKS_PER_PAGE: int = 0
 
 
 settings = Settings()
\ No newline at end of file
@@ -3,12 +3,14 @@ import asyncio
 import traceback
 import logging
 import json
+import os
 import uuid
 import sys
+from contextlib import asynccontextmanager
 from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Dict, Coroutine, Tuple, Callable
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, APIRouter
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, APIRouter, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 
@@ -20,6 +22,7 @@ from config.exam_presets import PRESETS
 from src.deep_searcher.agents.query_generator_agent import SearchQueryGeneratorAgent
 from src.deep_searcher.agents.question_spec_generator_agent import QuestionSpecGeneratorAgent
 from src.deep_searcher.vector_store.manager import VectorStoreManager
+from src.deep_searcher.vector_store.dedup import DedupStats
 from src.deep_searcher.chains.exam_pipeline import run_exam_generation_pipeline
 from src.deep_searcher.models.exam_models import (
     FullExam, 
@@ -27,26 +30,53 @@ from src.deep_searcher.models.exam_models import (
     QuestionSpec, 
     ExamQuestion, 
     ExamFromTopicRequest,
+    LLMCacheSummary,
 )
 from src.deep_searcher.data_pipeline import web_searcher, crawler, url_processor
+from src.deep_searcher.data_pipeline.fetcher import close_fetch_session, new_fetch_context
+from src.deep_searcher.data_pipeline.http_cache import new_spool_file
+from src.deep_searcher.data_pipeline.partition_pool import start_partition_pool, shutdown_partition_pool
 from src.deep_searcher.utils.streaming_utils import StreamCallbackHandler
+from src.deep_searcher.utils.job_scheduler import JobScheduler, JobRejectedError, PRIORITY_INTERACTIVE, PRIORITY_NORMAL
+from src.deep_searcher.utils.llm_cache import LLMCacheStats, llm_cache_scope
+from src.deep_searcher.utils.llm_gate import get_llm_gate
 
 logger = logging.getLogger(__name__)
 
 vsm = VectorStoreManager()
 query_agent = SearchQueryGeneratorAgent()
 spec_agent = QuestionSpecGeneratorAgent()
-api_lock = asyncio.Lock()
+scheduler = JobScheduler(
+    max_workers=settings.JOB_SCHEDULER_MAX_WORKERS,
+    max_queue_size=settings.JOB_SCHEDULER_MAX_QUEUE_SIZE,
+    max_jobs_per_client=settings.JOB_SCHEDULER_MAX_JOBS_PER_CLIENT,
+)
 ACTIVE_EXAMS: Dict[str, FullExam] = {}
+# exam_id -> run_id of the run-scoped collections the exam was generated from
+EXAM_RUNS: Dict[str, str] = {}
+# Uploads are copied to disk in chunks of this size rather than read into memory at once.
+UPLOAD_READ_CHUNK_BYTES = 1024 ** 2
 origins = [
     "http://localhost:5173",
     "http://localhost:3000",
 ]
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    scheduler.start()
+    start_partition_pool()
+    sweeper_task = asyncio.create_task(vsm.run_sweeper(settings.RUN_COLLECTION_SWEEP_INTERVAL_SECONDS))
+    yield
+    sweeper_task.cancel()
+    await scheduler.stop()
+    await close_fetch_session()
+    await asyncio.to_thread(shutdown_partition_pool)
+
 app = FastAPI(
     title="Agentic Exam Generator API",
     description="An API to generate customized exam papers using a multi-agent system. Use `/exam/from-topic` for the best experience.",
     version="2.3.0",
+    lifespan=lifespan,
 )
 app.add_middleware(
     CORSMiddleware,
@@ -57,7 +87,61 @@ app.add_middleware(
 )
 router = APIRouter(prefix="/exam")
 
-async def _ingest_data_for_subject(subject: str, grade_level: str, callback: StreamCallbackHandler) -> IngestionSummary:
+def _get_client_id(request: Request) -> str:
+    """Identifies the caller for per-client fairness, preferring an explicit header over the peer address."""
+    client_header = request.headers.get("X-Client-ID")
+    if client_header:
+        return client_header
+    return request.client.host if request.client else "anonymous"
+
+async def _submit_job(factory: Callable[[], Coroutine], request: Request, priority: int, callback: Optional[StreamCallbackHandler] = None):
+    try:
+        return await scheduler.submit(factory, client_id=_get_client_id(request), priority=priority, callback=callback)
+    except JobRejectedError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+def _embedding_progress_reporter(callback: StreamCallbackHandler) -> Callable[[Dict], Coroutine]:
+    async def report(progress: Dict):
+        await callback.send_update("progress", {
+            "step": "embedding",
+            "status": f"Embedded {progress['chunks_embedded']} chunks ({progress['batches_done']} batches)...",
+        })
+    return report
+
+def _partition_progress_reporter(callback: StreamCallbackHandler) -> Callable[[Dict], Coroutine]:
+    async def report(progress: Dict):
+        await callback.send_update("progress", {
+            "step": "file_processing",
+            "status": (
+                f"Processed pages {progress['first_page']}-{progress['last_page']} with '{progress['strategy']}' "
+                f"({progress['ranges_done']}/{progress['ranges_total']} page ranges)..."
+            ),
+        })
+    return report
+
+async def _spool_upload(upload: UploadFile) -> Tuple[str, int]:
+    """Streams an upload to a temporary file in chunks and returns its path and size. The caller deletes the file."""
+    size = 0
+    with new_spool_file() as spool:
+        try:
+            while chunk := await upload.read(UPLOAD_READ_CHUNK_BYTES):
+                size += len(chunk)
+                if size > settings.UPLOAD_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail=f"The uploaded file exceeds the {settings.UPLOAD_MAX_BYTES // 1024 ** 2} MiB limit.")
+                await asyncio.to_thread(spool.write, chunk)
+        except BaseException:
+            spool.close()
+            _discard_upload(spool.name)
+            raise
+    return spool.name, size
+
+def _discard_upload(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+async def _ingest_data_for_subject(subject: str, grade_level: str, run_id: str, callback: StreamCallbackHandler) -> IngestionSummary:
     log_msg = f"--- Starting data ingestion for subject: '{subject}' at level: '{grade_level}' ---"
     logger.info(log_msg)
     await callback.send_update("progress", {"step": "start_ingestion", "status": "Starting data ingestion..."})
@@ -76,14 +160,21 @@ async def _ingest_data_for_subject(subject: str, grade_level: str, callback: Str
         hits = await web_searcher.perform_searches_and_get_hits(queries=text_queries, executor=executor, search_type='web')
     await callback.send_update("log", {"message": f"Initial web search found {len(hits)} potential documents."})
 
+    fetch = new_fetch_context()
+    dedup_stats = DedupStats()
     await callback.send_update("progress", {"step": "crawling", "status": "Discovering more links from search results..."})
-    discovered_urls = await crawler.discover_urls_from_hits(hits)
+    discovered_urls = await crawler.discover_urls_from_hits(hits, subject=subject, fetch=fetch)
     await callback.send_update("log", {"message": f"Discovered a total of {len(discovered_urls)} URLs for processing."})
 
     await callback.send_update("progress", {"step": "text_processing", "status": "Downloading and processing text content..."})
-    text_docs = await url_processor.process_urls(discovered_urls)
-    text_collection_name = vsm.get_collection_name(subject, "text")
-    text_chunks_ingested = vsm.add_documents(text_collection_name, text_docs)
+    text_collection_name = vsm.get_collection_name(subject, "text", run_id=run_id)
+    text_chunks_ingested = await vsm.aadd_document_stream(
+        text_collection_name,
+        url_processor.stream_processed_urls(discovered_urls, fetch=fetch),
+        prune_missing=True,
+        on_progress=_embedding_progress_reporter(callback),
+        dedup_stats=dedup_stats,
+    )
     await callback.send_update("log", {"message": f"Processed text content into {text_chunks_ingested} chunks."})
 
     # Image ingestion
@@ -94,6 +185,7 @@ async def _ingest_data_for_subject(subject: str, grade_level: str, callback: Str
     image_queries = image_query_result.get('queries', [])
     image_chunks_ingested = 0
     image_urls = []
+    images_collection_name = vsm.get_collection_name(subject, "images", run_id=run_id)
     if image_queries:
         await callback.send_update("log", {"message": f"Generated {len(image_queries)} image queries."})
         await callback.send_update("progress", {"step": "image_search", "status": "Searching for relevant images..."})
@@ -103,19 +195,36 @@ async def _ingest_data_for_subject(subject: str, grade_level: str, callback: Str
         if image_urls:
             await callback.send_update("log", {"message": f"Found {len(image_urls)} potential images."})
             await callback.send_update("progress", {"step": "image_processing", "status": "Downloading and processing images..."})
-            image_docs = await url_processor.process_urls(image_urls)
-            images_collection_name = vsm.get_collection_name(subject, "images")
-            image_chunks_ingested = vsm.add_documents(images_collection_name, image_docs)
+            image_chunks_ingested = await vsm.aadd_document_stream(
+                images_collection_name,
+                url_processor.stream_processed_urls(image_urls, fetch=fetch),
+                prune_missing=True,
+                on_progress=_embedding_progress_reporter(callback),
+                dedup_stats=dedup_stats,
+            )
             await callback.send_update("log", {"message": f"Processed images into {image_chunks_ingested} chunks."})
 
+    await callback.send_update("log", {"message": f"Downloads: {fetch.summary()}."})
+    await callback.send_update("log", {"message": f"Deduplication: {dedup_stats.summary()}."})
     verified_text_sources = vsm.get_collection_sources(text_collection_name)
-    verified_image_sources = vsm.get_collection_sources(vsm.get_collection_name(subject, "images"))
+    verified_image_sources = vsm.get_collection_sources(images_collection_name)
     return IngestionSummary(
         message=f"Ingestion complete for '{subject}'.",
         processed_sources_count=len(discovered_urls) + len(image_urls),
         total_chunks_ingested=text_chunks_ingested + image_chunks_ingested,
-        collections_created=[name for name, count in [(text_collection_name, text_chunks_ingested), (vsm.get_collection_name(subject, "images"), image_chunks_ingested)] if count > 0],
-        ingested_sources=sorted(list(set(verified_text_sources + verified_image_sources)))
+        collections_created=[name for name, count in [(text_collection_name, text_chunks_ingested), (images_collection_name, image_chunks_ingested)] if count > 0],
+        ingested_sources=sorted(list(set(verified_text_sources + verified_image_sources))),
+        duplicate_chunks_dropped=dedup_stats.duplicates_dropped,
+        dedup_ratio=dedup_stats.ratio,
+    )
+
+def _llm_cache_summary(stats: LLMCacheStats) -> LLMCacheSummary:
+    return LLMCacheSummary(
+        hits=stats.hits,
+        misses=stats.misses,
+        hit_rate=stats.hit_rate,
+        saved_prompt_tokens=stats.saved_prompt_tokens,
+        saved_completion_tokens=stats.saved_completion_tokens,
     )
 
 async def _orchestrate_exam_generation(
@@ -124,23 +233,29 @@ async def _orchestrate_exam_generation(
     exam_title: str,
     question_specs: List[QuestionSpec],
     ingestion_coroutine_factory: Callable[..., Coroutine],
-    callback: StreamCallbackHandler
+    callback: StreamCallbackHandler,
+    bypass_cache: bool = False,
 ) -> FullExam:
     exam_id = f"exam-{uuid.uuid4().hex}"
     
     await callback.send_update("log", {"message": f"Preparing environment for subject: '{subject}'."})
-    vsm.reset_collections(subject)
+    run_id = vsm.start_run(subject)
+    try:
+        with llm_cache_scope(bypass=bypass_cache) as llm_cache_stats:
+            ingestion_coroutine = ingestion_coroutine_factory(subject, grade_level, run_id, callback)
+            ingestion_summary = await ingestion_coroutine
 
-    ingestion_coroutine = ingestion_coroutine_factory(subject, grade_level, callback)
-    ingestion_summary = await ingestion_coroutine
-    
-    if ingestion_summary.total_chunks_ingested == 0:
-        raise HTTPException(status_code=404, detail="Could not find or process any source material. The file might be empty, corrupted, or of an unsupported format.")
-        
-    await callback.send_update("log", {"message": "Data ingestion complete. Starting exam generation."})
-    compiled_result, exam_questions = await run_exam_generation_pipeline(
-        subject=subject, grade_level=grade_level, question_specs=question_specs, vsm=vsm, callback=callback
-    )
+            if ingestion_summary.total_chunks_ingested == 0:
+                raise HTTPException(status_code=404, detail="Could not find or process any source material. The file might be empty, corrupted, or of an unsupported format.")
+
+            await callback.send_update("log", {"message": "Data ingestion complete. Starting exam generation."})
+            compiled_result, exam_questions = await run_exam_generation_pipeline(
+                subject=subject, grade_level=grade_level, question_specs=question_specs, vsm=vsm, callback=callback, run_id=run_id,
+                exam_title=exam_title,
+            )
+        await callback.send_update("log", {"message": f"LLM cache: {llm_cache_stats.summary()}."})
+    finally:
+        vsm.release_run(run_id)
     final_exam = FullExam(
         exam_id=exam_id,
         ingestion_summary=ingestion_summary,
@@ -148,71 +263,75 @@ async def _orchestrate_exam_generation(
         exam_paper_markdown=compiled_result['exam_paper'],
         answer_key_markdown=compiled_result['answer_key'],
         questions=exam_questions,
-        sources_used=ingestion_summary.ingested_sources
+        sources_used=ingestion_summary.ingested_sources,
+        llm_cache=_llm_cache_summary(llm_cache_stats),
     )
     ACTIVE_EXAMS[exam_id] = final_exam
+    EXAM_RUNS[exam_id] = run_id
     return final_exam
 
 @router.post("/from-topic", summary="Generate Exam from Topic (Streaming)")
-async def generate_exam_from_topic(request: ExamFromTopicRequest):
-    if api_lock.locked():
-        raise HTTPException(status_code=429, detail="A process is already running.")
-    
+async def generate_exam_from_topic(request: ExamFromTopicRequest, http_request: Request):
     callback = StreamCallbackHandler()
 
     async def generation_task():
-        async with api_lock:
-            try:
-                final_exam = await _orchestrate_exam_generation(
-                    subject=request.subject,
-                    grade_level=request.grade_level,
-                    exam_title=request.exam_title,
-                    question_specs=request.question_specs,
-                    ingestion_coroutine_factory=_ingest_data_for_subject,
-                    callback=callback
-                )
-                await callback.send_update("final_result", final_exam.model_dump())
-            except Exception as e:
-                logger.error(f"Error in /from-topic background task: {e}", exc_info=True)
-                detail = str(e) if not isinstance(e, HTTPException) else e.detail
-                await callback.send_update("error", {"detail": detail})
-            finally:
-                await callback.send_update("end_stream", {"message": "Stream ended."})
-
-    asyncio.create_task(generation_task())
+        try:
+            final_exam = await _orchestrate_exam_generation(
+                subject=request.subject,
+                grade_level=request.grade_level,
+                exam_title=request.exam_title,
+                question_specs=request.question_specs,
+                ingestion_coroutine_factory=_ingest_data_for_subject,
+                callback=callback,
+                bypass_cache=request.bypass_cache,
+            )
+            await callback.send_update("final_result", final_exam.model_dump())
+        except Exception as e:
+            logger.error(f"Error in /from-topic background task: {e}", exc_info=True)
+            detail = str(e) if not isinstance(e, HTTPException) else e.detail
+            await callback.send_update("error", {"detail": detail})
+        finally:
+            await callback.send_update("end_stream", {"message": "Stream ended."})
+
+    await _submit_job(generation_task, http_request, PRIORITY_NORMAL, callback=callback)
     return StreamingResponse(callback.stream_generator(), media_type="text/event-stream")
 
 @router.post("/from-file", summary="Generate Exam from an Uploaded File (Streaming)")
 async def generate_exam_from_file(
+    http_request: Request,
     exam_title: str = Form(..., description="The title for the generated exam paper.", examples=["Midterm Exam: English Comprehension"]),
     subject: str = Form(..., description="The general subject of the file, e.g., 'English Literature'.", examples=["English Literature"]),
     grade_level: str = Form(..., description="The target grade level for the exam.", examples=["High School Final Year"]),
     example_paper: UploadFile = File(..., description="The source PDF, DOCX, etc., file to be used as context."),
+    bypass_cache: bool = Form(False, description="Ignore cached LLM responses and don't cache new ones."),
 ):
-    if api_lock.locked():
-        raise HTTPException(status_code=429, detail="A process is already running.")
-    
     callback = StreamCallbackHandler()
-    file_content_bytes = await example_paper.read()
-    if not file_content_bytes:
+    upload_path, upload_size = await _spool_upload(example_paper)
+    if not upload_size:
+        _discard_upload(upload_path)
         raise HTTPException(status_code=400, detail="The uploaded file appears to be empty.")
 
     async def file_generation_task():
-        async with api_lock:
-            try:
-                # 1. Reset collections for a clean run
+        run_id = None
+        try:
+            with llm_cache_scope(bypass=bypass_cache) as llm_cache_stats:
+                # 1. Start an isolated run so concurrent jobs on the same subject don't share collections
                 await callback.send_update("log", {"message": f"Preparing environment for subject: '{subject}'."})
-                vsm.reset_collections(subject)
+                run_id = vsm.start_run(subject)
 
                 # 2. Process file and ingest into vector store
                 await callback.send_update("progress", {"step": "file_processing", "status": f"Processing uploaded file: '{example_paper.filename}'..."})
                 docs = await url_processor.process_local_file_content(
-                    content_bytes=file_content_bytes,
+                    content=upload_path,
                     filename=example_paper.filename,
-                    content_type=example_paper.content_type
+                    content_type=example_paper.content_type,
+                    on_progress=_partition_progress_reporter(callback),
+                )
+                text_collection_name = vsm.get_collection_name(subject, "text", run_id=run_id)
+                dedup_stats = DedupStats()
+                chunks_ingested = await vsm.aadd_documents(
+                    text_collection_name, docs, prune_missing=True, on_progress=_embedding_progress_reporter(callback), dedup_stats=dedup_stats
                 )
-                text_collection_name = vsm.get_collection_name(subject, "text")
-                chunks_ingested = vsm.add_documents(text_collection_name, docs)
                 await callback.send_update("log", {"message": f"Processed file into {chunks_ingested} chunks."})
 
                 ingestion_summary = IngestionSummary(
@@ -220,7 +339,9 @@ async def generate_exam_from_file(
                     processed_sources_count=1,
                     total_chunks_ingested=chunks_ingested,
                     collections_created=[text_collection_name] if chunks_ingested > 0 else [],
-                    ingested_sources=vsm.get_collection_sources(text_collection_name)
+                    ingested_sources=vsm.get_collection_sources(text_collection_name),
+                    duplicate_chunks_dropped=dedup_stats.duplicates_dropped,
+                    dedup_ratio=dedup_stats.ratio,
                 )
 
                 if ingestion_summary.total_chunks_ingested == 0:
@@ -228,23 +349,26 @@ async def generate_exam_from_file(
 
                 # 3. Generate question specifications from the ingested content
                 await callback.send_update("progress", {"step": "spec_generation", "status": "AI is analyzing the file to create an exam structure..."})
-                full_text = " ".join([doc.page_content for doc in docs])
-                context_for_spec_gen = (full_text[:12000] + '...') if len(full_text) > 12000 else full_text
-                
+                sampled_chunks = await asyncio.to_thread(
+                    vsm.sample_representative_chunks, text_collection_name, settings.SPEC_GENERATOR_CONTEXT_TOKENS
+                )
+                context_for_spec_gen = "\n\n...\n\n".join(chunk.page_content for chunk in sampled_chunks)
+            
                 spec_result = await spec_agent.chain.ainvoke({"context": context_for_spec_gen})
                 question_specs_dicts = spec_result.get('question_specs', [])
                 if not question_specs_dicts:
                     raise HTTPException(status_code=500, detail="AI agent failed to generate question specifications from the document content.")
-                
+            
                 question_specs = [QuestionSpec.model_validate(s) for s in question_specs_dicts]
                 await callback.send_update("log", {"message": f"AI generated exam structure: {len(question_specs)} section(s)."})
 
                 # 4. Run the core exam generation pipeline
                 exam_id = f"exam-{uuid.uuid4().hex}"
                 compiled_result, exam_questions = await run_exam_generation_pipeline(
-                    subject=subject, grade_level=grade_level, question_specs=question_specs, vsm=vsm, callback=callback
+                    subject=subject, grade_level=grade_level, question_specs=question_specs, vsm=vsm, callback=callback, run_id=run_id,
+                    exam_title=exam_title,
                 )
-                
+            
                 # 5. Assemble and send the final response object
                 final_exam = FullExam(
                     exam_id=exam_id,
@@ -253,25 +377,33 @@ async def generate_exam_from_file(
                     exam_paper_markdown=compiled_result['exam_paper'],
                     answer_key_markdown=compiled_result['answer_key'],
                     questions=exam_questions,
-                    sources_used=ingestion_summary.ingested_sources
+                    sources_used=ingestion_summary.ingested_sources,
+                    llm_cache=_llm_cache_summary(llm_cache_stats),
                 )
                 ACTIVE_EXAMS[exam_id] = final_exam
+                EXAM_RUNS[exam_id] = run_id
+                await callback.send_update("log", {"message": f"LLM cache: {llm_cache_stats.summary()}."})
                 await callback.send_update("final_result", final_exam.model_dump())
 
-            except Exception as e:
-                logger.error(f"Error in /from-file background task: {e}", exc_info=True)
-                detail = str(e) if not isinstance(e, HTTPException) else e.detail
-                await callback.send_update("error", {"detail": detail})
-            finally:
-                await callback.send_update("end_stream", {"message": "Stream ended."})
+        except Exception as e:
+            logger.error(f"Error in /from-file background task: {e}", exc_info=True)
+            detail = str(e) if not isinstance(e, HTTPException) else e.detail
+            await callback.send_update("error", {"detail": detail})
+        finally:
+            if run_id:
+                vsm.release_run(run_id)
+            _discard_upload(upload_path)
+            await callback.send_update("end_stream", {"message": "Stream ended."})
 
-    asyncio.create_task(file_generation_task())
+    try:
+        await _submit_job(file_generation_task, http_request, PRIORITY_NORMAL, callback=callback)
+    except HTTPException:
+        _discard_upload(upload_path)
+        raise
     return StreamingResponse(callback.stream_generator(), media_type="text/event-stream")
             
 @router.post("/regenerate-question/{exam_id}/{question_id}", response_model=ExamQuestion, summary="Regenerate a Single Question")
-async def regenerate_single_question(exam_id: str, question_id: str):
-    if api_lock.locked():
-        raise HTTPException(status_code=429, detail="A process is already running.")
+async def regenerate_single_question(exam_id: str, question_id: str, http_request: Request, bypass_cache: bool = False):
     exam = ACTIVE_EXAMS.get(exam_id)
     if not exam: raise HTTPException(status_code=404, detail=f"Exam with ID '{exam_id}' not found.")
     original_question = next((q for q in exam.questions if q.id == question_id), None)
@@ -281,15 +413,27 @@ async def regenerate_single_question(exam_id: str, question_id: str):
     class DummyCallback:
         async def send_update(self, *args, **kwargs): pass
     
-    async with api_lock:
+    expired = HTTPException(status_code=410, detail="The source material for this exam has expired. Please generate a new exam.")
+    run_id = EXAM_RUNS.get(exam_id)
+    if not run_id:
+        raise expired
+
+    async def regeneration_task() -> Optional[ExamQuestion]:
+        # The run may be swept while the job is queued. That is expected, so report it
+        # through the result rather than as a failed job.
+        if not vsm.acquire_run(run_id):
+            return None
         try:
             spec = QuestionSpec(question_type=original_question.question_type, count=1, prompt="Generate a different version.")
             subject = exam.ingestion_summary.message.split("'")[1]
             grade_level = "N/A"
             # We don't have grade_level info here, so this might be suboptimal but will work
-            _, new_exam_questions = await run_exam_generation_pipeline(
-                subject, grade_level, [spec], vsm, callback=DummyCallback()
-            )
+            with llm_cache_scope(bypass=bypass_cache) as llm_cache_stats:
+                _, new_exam_questions = await run_exam_generation_pipeline(
+                    subject, grade_level, [spec], vsm, callback=DummyCallback(), run_id=run_id,
+                    retrieval_mode=settings.REGENERATE_RETRIEVAL_MODE,
+                )
+            logger.info(f"Regenerated question '{question_id}' of '{exam_id}'. LLM cache: {llm_cache_stats.summary()}.")
             if not new_exam_questions: raise HTTPException(status_code=500, detail="Failed to regenerate.")
             new_question = new_exam_questions[0]
             for i, q in enumerate(exam.questions):
@@ -299,6 +443,19 @@ async def regenerate_single_question(exam_id: str, question_id: str):
         except Exception as e:
             logger.error(f"Error during regeneration: {e}")
             raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            vsm.release_run(run_id)
+
+    job = await _submit_job(regeneration_task, http_request, PRIORITY_INTERACTIVE)
+    new_question = await job.future
+    if new_question is None:
+        raise expired
+    return new_question
+
+@app.get("/metrics/llm", summary="LLM Call Gate Metrics")
+async def llm_metrics():
+    """Per-model concurrency limit, queue wait times and rate-limit counts of the shared LLM gate."""
+    return get_llm_gate().metrics()
 
 app.include_router(router)
 
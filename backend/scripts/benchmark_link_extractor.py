@@ -0,0 +1,78 @@
+# scripts/benchmark_link_extractor.py
+"""
+Compares the crawler's link extractors on a synthetic portal page.
+
+Usage (from the backend directory):
+    python -m scripts.benchmark_link_extractor --links 20000 --repeat 5
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.deep_searcher.data_pipeline.link_extractor import STREAM_CHUNK_SIZE, StreamingLinkExtractor, extract_links_with_soup
+
+BASE_URL = "https://portal.example.edu/index.html"
+WORDS = ["biology", "cell", "photosynthesis", "chemistry", "atoms", "physics", "energy", "algebra", "history", "revision"]
+
+
+def build_page(num_links: int, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    parts = ["<html><head><title>Learning Portal</title></head><body><div id='nav'>"]
+    for i in range(num_links):
+        words = " ".join(rng.choice(WORDS) for _ in range(3))
+        href = f"/topics/{i}/{words.replace(' ', '-')}" if i % 5 else f"https://other.example.com/{i}"
+        parts.append(f"<div class='card'><p>{words} {words}</p><a href='{href}' title='{words}'><span>{words}</span></a></div>")
+    parts.append("</div></body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def run_soup(body: bytes, max_bytes: int, max_links: int) -> int:
+    return len(extract_links_with_soup(body, BASE_URL).links)
+
+
+def run_streaming(body: bytes, max_bytes: int, max_links: int) -> int:
+    extractor = StreamingLinkExtractor(BASE_URL, max_links=max_links)
+    limit = len(body) if max_bytes <= 0 else min(len(body), max_bytes)
+    # Feed network-sized chunks the way `stream_links_from_response` does.
+    for start in range(0, limit, STREAM_CHUNK_SIZE):
+        extractor.feed(body[start:min(start + STREAM_CHUNK_SIZE, limit)])
+        if extractor.done:
+            break
+    return len(extractor.close().links)
+
+
+def measure(name, func, body: bytes, repeat: int, max_bytes: int, max_links: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        links = func(body, max_bytes, max_links)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func(body, max_bytes, max_links)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best = min(timings)
+    print(f"{name:<28} links={links:<7} best={best * 1000:8.1f} ms  mean={sum(timings) / len(timings) * 1000:8.1f} ms  peak={peak / 1024 ** 2:7.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--links", type=int, default=20000, help="Number of anchors on the synthetic page.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-bytes", type=int, default=0, help="Body cap for the streaming extractor (0 = unlimited).")
+    parser.add_argument("--max-links", type=int, default=0, help="Link quota for the streaming extractor (0 = unlimited).")
+    args = parser.parse_args()
+
+    body = build_page(args.links)
+    print(f"Synthetic page: {len(body) / 1024 ** 2:.1f} MiB, {args.links} anchors")
+    measure("beautifulsoup (full tree)", run_soup, body, args.repeat, 0, 0)
+    measure("streaming (lxml pull parser)", run_streaming, body, args.repeat, args.max_bytes, args.max_links)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,24 +7,33 @@ from langchain_openai import ChatOpenAI
 
 from config.settings import settings
 from src.deep_searcher.utils.file_utils import load_prompt
+from src.deep_searcher.utils.llm_gate import gated
 from src.deep_searcher.models.exam_models import CompiledExam
 
 class ExamCompilerAgent:
-    """An agent that formats questions and solutions into final exam documents."""
+    """
+    An agent that formats questions and solutions into final exam documents.
+    Only used in the opt-in 'llm' EXAM_COMPILER_MODE; see `utils.exam_renderer` for the default.
+    """
     def __init__(self):
         self.llm = ChatOpenAI(
             model=settings.DEFAULT_LLM_MODEL,
             temperature=0.0,
-            openai_api_key=settings.OPENAI_API_KEY
+            openai_api_key=settings.OPENAI_API_KEY,
+            max_retries=0,  # Retried by the LLM gate, which needs to see 429s.
         )
         self.prompt_template = load_prompt("prompts/exam_compiler_agent/system.prompt")
         self.parser = JsonOutputParser(pydantic_object=CompiledExam)
 
         self.chain: Runnable = (
             RunnablePassthrough.assign(
-                exam_questions_json=lambda x: json.dumps([q.model_dump() for q in x["exam_questions"]], indent=2)
+                exam_questions_json=lambda x: json.dumps(
+                    [q.model_dump(exclude={"id"}, exclude_none=True) for q in x["exam_questions"]],
+                    separators=(",", ":"),
+                    ensure_ascii=False,
+                )
             )
             | ChatPromptTemplate.from_template(self.prompt_template)
-            | self.llm
+            | gated(self.llm, "exam_compile", cache_parser=self.parser)
             | self.parser
         )
\ No newline at end of file
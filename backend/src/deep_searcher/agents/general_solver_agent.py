@@ -1,4 +1,5 @@
 # src/deep_searcher/agents/general_solver_agent.py
+from typing import Any, Dict, List
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import Runnable
@@ -6,7 +7,9 @@ from langchain_openai import ChatOpenAI
 
 from config.settings import settings
 from src.deep_searcher.utils.file_utils import load_prompt
-from src.deep_searcher.models.exam_models import GeneratedSolution
+from src.deep_searcher.utils.llm_gate import gated
+from src.deep_searcher.agents.solver_batching import solve_in_batch
+from src.deep_searcher.models.exam_models import GeneratedSolution, GeneratedSolutionBatch
 
 class GeneralSolverAgent:
     """An agent that provides solutions for non-math questions."""
@@ -14,13 +17,27 @@ class GeneralSolverAgent:
         self.llm = ChatOpenAI(
             model=settings.DEFAULT_LLM_MODEL,
             temperature=0.0,
-            openai_api_key=settings.OPENAI_API_KEY
+            openai_api_key=settings.OPENAI_API_KEY,
+            max_retries=0,  # Retried by the LLM gate, which needs to see 429s.
         )
         self.prompt_template = load_prompt("prompts/general_solver_agent/system.prompt")
         self.parser = JsonOutputParser(pydantic_object=GeneratedSolution)
 
         self.chain: Runnable = (
             ChatPromptTemplate.from_template(self.prompt_template)
-            | self.llm
+            | gated(self.llm, "solve", cache_parser=self.parser)
             | self.parser
-        )
\ No newline at end of file
+        )
+
+        # Batch output is parsed leniently and validated per item by `solve_in_batch`.
+        self.batch_prompt_template = load_prompt("prompts/general_solver_agent/batch.prompt")
+        self.batch_parser = JsonOutputParser(pydantic_object=GeneratedSolutionBatch)
+        self.batch_chain: Runnable = (
+            ChatPromptTemplate.from_template(self.batch_prompt_template)
+            | gated(self.llm, "solve_batch", cache_parser=self.batch_parser)
+            | self.batch_parser
+        )
+
+    async def asolve_batch(self, questions: List[Dict[str, Any]]) -> List[Any]:
+        """Solves several questions (inputs of `chain`) in one call, falling back to single calls per failed item."""
+        return await solve_in_batch(self.batch_chain, self.chain, questions)
\ No newline at end of file
@@ -1,12 +1,15 @@
 # src/deep_searcher/agents/math_solver_agent.py
-from langchain_core.output_parsers import PydanticOutputParser
+from typing import Any, Dict, List
+from langchain_core.output_parsers import JsonOutputParser, PydanticOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import Runnable, RunnablePassthrough
 from langchain_openai import ChatOpenAI
 
 from config.settings import settings
 from src.deep_searcher.utils.file_utils import load_prompt
-from src.deep_searcher.models.exam_models import GeneratedSolution
+from src.deep_searcher.utils.llm_gate import gated
+from src.deep_searcher.agents.solver_batching import solve_in_batch
+from src.deep_searcher.models.exam_models import GeneratedSolution, GeneratedSolutionBatch
 
 class MathSolverAgent:
     """A specialized agent for solving math problems using DeepSeek-Math."""
@@ -15,7 +18,8 @@ class MathSolverAgent:
             # model=settings.MATH_LLM_MODEL,
             model=settings.DEFAULT_LLM_MODEL,
             temperature=0.0,
-            openai_api_key=settings.OPENAI_API_KEY
+            openai_api_key=settings.OPENAI_API_KEY,
+            max_retries=0,  # Retried by the LLM gate, which needs to see 429s.
             #api_key=settings.DEEPSEEK_API_KEY,
             #base_url=settings.DEEPSEEK_API_URL
         )
@@ -29,6 +33,22 @@ class MathSolverAgent:
                 format_instructions=lambda x: self.parser.get_format_instructions()
             )
             | ChatPromptTemplate.from_template(self.prompt_template)
-            | self.llm
+            | gated(self.llm, "math_solve", cache_parser=self.parser)
             | self.parser
-        )
\ No newline at end of file
+        )
+
+        # Batch output is parsed leniently and validated per item by `solve_in_batch`.
+        self.batch_prompt_template = load_prompt("prompts/math_solver_agent/batch.prompt")
+        self.batch_parser = JsonOutputParser(pydantic_object=GeneratedSolutionBatch)
+        self.batch_chain: Runnable = (
+            RunnablePassthrough.assign(
+                format_instructions=lambda x: self.batch_parser.get_format_instructions()
+            )
+            | ChatPromptTemplate.from_template(self.batch_prompt_template)
+            | gated(self.llm, "math_solve_batch", cache_parser=self.batch_parser)
+            | self.batch_parser
+        )
+
+    async def asolve_batch(self, questions: List[Dict[str, Any]]) -> List[Any]:
+        """Solves several problems (inputs of `chain`) in one call, falling back to single calls per failed item."""
+        return await solve_in_batch(self.batch_chain, self.chain, questions)
\ No newline at end of file
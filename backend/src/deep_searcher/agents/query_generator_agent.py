@@ -6,6 +6,7 @@ from langchain_openai import ChatOpenAI
 
 from config.settings import settings
 from src.deep_searcher.utils.file_utils import load_prompt
+from src.deep_searcher.utils.llm_gate import gated
 from src.deep_searcher.models.exam_models import GeneratedQueries
 
 class SearchQueryGeneratorAgent:
@@ -14,13 +15,14 @@ class SearchQueryGeneratorAgent:
         self.llm = ChatOpenAI(
             model=settings.DEFAULT_LLM_MODEL,
             temperature=0.2,
-            openai_api_key=settings.OPENAI_API_KEY
+            openai_api_key=settings.OPENAI_API_KEY,
+            max_retries=0,  # Retried by the LLM gate, which needs to see 429s.
         )
         self.prompt_template = load_prompt("prompts/query_generator/system.prompt")
         self.parser = JsonOutputParser(pydantic_object=GeneratedQueries)
 
         self.chain: Runnable = (
             ChatPromptTemplate.from_template(self.prompt_template)
-            | self.llm
+            | gated(self.llm, "query")
             | self.parser
         )
\ No newline at end of file
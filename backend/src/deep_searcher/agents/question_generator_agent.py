@@ -1,65 +1,96 @@
 # src/deep_searcher/agents/question_generator_agent.py
+import asyncio
 import logging
+from typing import Any, Dict, List, Optional
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import Runnable, RunnablePassthrough
+from langchain_core.runnables import Runnable, RunnableLambda, RunnablePassthrough
 from langchain.schema.retriever import BaseRetriever
 from langchain.schema.document import Document
 from langchain_openai import ChatOpenAI
 
 from config.settings import settings
+from src.deep_searcher.utils.context_packer import ContextPacker, ContextPackingStats
 from src.deep_searcher.utils.file_utils import load_prompt
+from src.deep_searcher.utils.llm_gate import gated
 from src.deep_searcher.models.exam_models import GeneratedQuestions
+from src.deep_searcher.vector_store.retrieval_session import RetrievalSession
 
 logger = logging.getLogger(__name__)
 
 class QuestionGeneratorAgent:
     """An agent that generates questions based on retrieved context."""
-    def __init__(self, retriever: BaseRetriever, image_retriever: BaseRetriever):
+    def __init__(self, retriever: BaseRetriever, image_retriever: BaseRetriever, retrieval: Optional[RetrievalSession] = None):
         self.retriever = retriever
         self.image_retriever = image_retriever
+        self.retrieval = retrieval or RetrievalSession()
         self.llm = ChatOpenAI(
             model=settings.DEFAULT_LLM_MODEL,
             temperature=0.3,
-            openai_api_key=settings.OPENAI_API_KEY
+            openai_api_key=settings.OPENAI_API_KEY,
+            max_retries=0,  # Retried by the LLM gate, which needs to see 429s.
         )
         self.prompt_template = load_prompt("prompts/question_generator/system.prompt")
         self.parser = JsonOutputParser(pydantic_object=GeneratedQuestions)
+        self.packer = ContextPacker(settings.DEFAULT_LLM_MODEL, settings.QUESTION_GENERATOR_CONTEXT_TOKENS, self._format_doc)
+        self.context_stats = ContextPackingStats()
 
         self.chain: Runnable = (
             RunnablePassthrough.assign(
-                context=lambda x: self._get_combined_context(x["subject"])
+                context=RunnableLambda(
+                    lambda x: self._get_combined_context(self.retrieval_query(x)),
+                    afunc=lambda x: self._aget_combined_context(self.retrieval_query(x)),
+                )
             )
             | ChatPromptTemplate.from_template(self.prompt_template)
-            | self.llm
+            | gated(self.llm, "question")
             | self.parser
         )
 
-    def _format_docs(self, docs: list[Document]) -> str:
-        """Formats retrieved documents into a single string."""
-        if not docs:
-            return "No documents found."
-        
-        formatted_docs = []
-        for doc in docs:
-            source = doc.metadata.get('source', 'N/A')
-            content = doc.page_content
-            header = f"[Source: {source}]"
-            # Add image source directly if content is a description
-            if "description of an image" in content.lower() or content.startswith("Image of"):
-                 header = f"[Image Source: {source}]"
+    @staticmethod
+    def _format_doc(doc: Document, content: str) -> str:
+        """Formats one retrieved document, with its (possibly trimmed) content, for the prompt."""
+        source = doc.metadata.get('source', 'N/A')
+        header = f"[Source: {source}]"
+        # Add image source directly if content is a description
+        if "description of an image" in content.lower() or content.startswith("Image of"):
+             header = f"[Image Source: {source}]"
+        return f"{header}\n{content}"
 
-            formatted_docs.append(f"{header}\n{content}")
-            
-        return "\n\n---\n\n".join(formatted_docs)
+    @staticmethod
+    def retrieval_query(inputs: Dict[str, Any]) -> str:
+        """The query used to retrieve context for one chain input; defaults to the subject."""
+        return inputs.get("retrieval_query") or inputs["subject"]
+
+    async def prefetch_context(self, queries: List[str]):
+        """Retrieves the context of every query up front, embedding them in one batch."""
+        await self.retrieval.prefetch([self.retriever, self.image_retriever], queries)
+
+    def _combine_context(self, topic: str, text_docs: List[Document], image_docs: List[Document]) -> str:
+        """Packs the image and then the text documents into the context token budget."""
+        image_budget = min(settings.QUESTION_GENERATOR_IMAGE_CONTEXT_TOKENS, self.packer.budget_tokens)
+        images = self.packer.pack(image_docs, budget_tokens=image_budget)
+        text = self.packer.pack(text_docs, budget_tokens=self.packer.budget_tokens - images.used_tokens)
+        self.context_stats.add(self.packer.budget_tokens, text, images)
+        used = text.used_tokens + images.used_tokens
+        logger.info(
+            f"Context for '{topic}': {used}/{self.packer.budget_tokens} tokens used, {self.packer.budget_tokens - used} available "
+            f"({text.included} text, {images.included} image chunks; "
+            f"{text.duplicates + images.duplicates} overlapping and {text.over_budget + images.over_budget} over budget dropped)."
+        )
+        return f"Textual Content:\n{text.text}\n\nAvailable Images:\n{images.text}"
 
     def _get_combined_context(self, topic: str) -> str:
         """Retrieves and formats both text and image context."""
         logger.info(f"Retrieving context for topic: {topic}")
         text_docs = self.retriever.invoke(topic)
         image_docs = self.image_retriever.invoke(topic)
-        
-        text_context = self._format_docs(text_docs)
-        image_context = self._format_docs(image_docs)
+        return self._combine_context(topic, text_docs, image_docs)
 
-        return f"Textual Content:\n{text_context}\n\nAvailable Images:\n{image_context}"
\ No newline at end of file
+    async def _aget_combined_context(self, topic: str) -> str:
+        """Async variant of `_get_combined_context`: memoized per run, text and images retrieved concurrently."""
+        text_docs, image_docs = await asyncio.gather(
+            self.retrieval.aretrieve(self.retriever, topic),
+            self.retrieval.aretrieve(self.image_retriever, topic),
+        )
+        return self._combine_context(topic, text_docs, image_docs)
\ No newline at end of file
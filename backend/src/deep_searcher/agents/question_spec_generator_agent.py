@@ -7,6 +7,7 @@ from langchain_openai import ChatOpenAI
 
 from config.settings import settings
 from src.deep_searcher.utils.file_utils import load_prompt
+from src.deep_searcher.utils.llm_gate import gated
 from src.deep_searcher.models.exam_models import GeneratedQuestionSpecs
 
 logger = logging.getLogger(__name__)
@@ -17,13 +18,14 @@ class QuestionSpecGeneratorAgent:
         self.llm = ChatOpenAI(
             model=settings.DEFAULT_LLM_MODEL,
             temperature=0.2, # Low temp for deterministic structure
-            openai_api_key=settings.OPENAI_API_KEY
+            openai_api_key=settings.OPENAI_API_KEY,
+            max_retries=0,  # Retried by the LLM gate, which needs to see 429s.
         )
         self.prompt_template = load_prompt("prompts/question_spec_generator/system.prompt")
         self.parser = JsonOutputParser(pydantic_object=GeneratedQuestionSpecs)
 
         self.chain: Runnable = (
             ChatPromptTemplate.from_template(self.prompt_template)
-            | self.llm
+            | gated(self.llm, "question_spec", cache_parser=self.parser)
             | self.parser
         )
\ No newline at end of file
@@ -0,0 +1,67 @@
+# src/deep_searcher/agents/solver_batching.py
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from langchain_core.runnables import Runnable
+from pydantic import ValidationError
+
+from src.deep_searcher.models.exam_models import GeneratedSolution
+
+logger = logging.getLogger(__name__)
+
+
+def format_question_batch(questions: List[Dict[str, Any]]) -> str:
+    """Renders solver inputs as numbered question blocks for a batch prompt."""
+    blocks = []
+    for number, question in enumerate(questions, start=1):
+        lines = [f"### Question {number}"]
+        if question.get("question_type"):
+            lines.append(f"**Type:** {question['question_type']}")
+        lines.append(f"**Text:** {question['question_text']}")
+        if question.get("options"):
+            lines.append(f"**Options (for MCQ):** {question['options']}")
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+def _validate_item(item: Any, question: Dict[str, Any]) -> Optional[GeneratedSolution]:
+    try:
+        solution = GeneratedSolution.model_validate(item)
+    except ValidationError:
+        return None
+    options = question.get("options")
+    if options and (solution.correct_option_index is None or not 0 <= solution.correct_option_index < len(options)):
+        return None
+    return solution
+
+
+async def solve_in_batch(batch_chain: Runnable, single_chain: Runnable, questions: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Solves several questions with one call to `batch_chain`, which must return
+    {"solutions": [{"question_number": n, ...}]}. Each item is validated on its own;
+    questions whose item is missing or invalid are re-solved one by one with `single_chain`.
+    Returns the solutions in question order.
+    """
+    if len(questions) == 1:
+        return [await single_chain.ainvoke(questions[0])]
+
+    solutions: List[Optional[Any]] = [None] * len(questions)
+    try:
+        result = await batch_chain.ainvoke({"questions": format_question_batch(questions), "count": len(questions)})
+        items = result.get("solutions", []) if isinstance(result, dict) else []
+        for item in items:
+            number = item.get("question_number") if isinstance(item, dict) else None
+            if isinstance(number, int) and 1 <= number <= len(questions) and solutions[number - 1] is None:
+                solutions[number - 1] = _validate_item(item, questions[number - 1])
+    except Exception as e:
+        logger.warning(f"Batched solve of {len(questions)} questions failed, solving them one by one: {e}")
+
+    missing = [i for i, solution in enumerate(solutions) if solution is None]
+    if missing:
+        if len(missing) < len(questions):
+            logger.info(f"Re-solving {len(missing)}/{len(questions)} questions whose batched solution was missing or invalid.")
+        fallbacks = await asyncio.gather(*(single_chain.ainvoke(questions[i]) for i in missing))
+        for i, solution in zip(missing, fallbacks):
+            solutions[i] = solution
+    return solutions
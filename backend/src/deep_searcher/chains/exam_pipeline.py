@@ -2,14 +2,17 @@
 import asyncio
 import uuid
 import logging
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 
+from config.settings import settings
 from src.deep_searcher.models.exam_models import QuestionSpec, ExamQuestion, CompiledExam
 from src.deep_searcher.agents.question_generator_agent import QuestionGeneratorAgent
 from src.deep_searcher.agents.math_solver_agent import MathSolverAgent
 from src.deep_searcher.agents.general_solver_agent import GeneralSolverAgent
 from src.deep_searcher.agents.exam_compiler_agent import ExamCompilerAgent
 from src.deep_searcher.vector_store.manager import VectorStoreManager
+from src.deep_searcher.vector_store.retrieval_session import RetrievalSession
+from src.deep_searcher.utils.exam_renderer import render_exam
 from src.deep_searcher.utils.streaming_utils import StreamCallbackHandler
 
 logger = logging.getLogger(__name__)
@@ -21,89 +24,138 @@ async def run_exam_generation_pipeline(
     question_specs: List[QuestionSpec],
     vsm: VectorStoreManager,
     callback: StreamCallbackHandler,
+    run_id: Optional[str] = None,
+    retrieval_mode: Optional[str] = None,
+    exam_title: Optional[str] = None,
 ) -> Tuple[CompiledExam, List[ExamQuestion]]:
-    """Orchestrates the parallel generation of an exam, sending progress updates."""
+    """
+    Orchestrates the parallel generation of an exam, sending progress updates.
+    Each spec's questions are solved as soon as they are generated, and every solved
+    question is streamed as a 'partial_result' event before the exam is compiled.
+    """
     
     # 1. Prepare retrievers
-    text_retriever = vsm.create_retriever(topic_name=subject, collection_type="text")
-    image_retriever = vsm.create_retriever(topic_name=subject, collection_type="images")
+    text_retriever = vsm.create_retriever(topic_name=subject, collection_type="text", run_id=run_id, mode=retrieval_mode)
+    image_retriever = vsm.create_retriever(topic_name=subject, collection_type="images", run_id=run_id, mode=retrieval_mode)
 
     # 2. Instantiate agents
-    question_agent = QuestionGeneratorAgent(retriever=text_retriever, image_retriever=image_retriever)
+    retrieval = RetrievalSession(vsm.embedding_function)
+    question_agent = QuestionGeneratorAgent(retriever=text_retriever, image_retriever=image_retriever, retrieval=retrieval)
     math_solver = MathSolverAgent()
     general_solver = GeneralSolverAgent()
-    compiler = ExamCompilerAgent()
 
-    # 3. Generate all questions in parallel
+    # 3. Generate questions and solve each spec's questions as soon as they arrive
     total_questions_to_generate = sum(spec.count for spec in question_specs)
     log_msg = f"Generating {total_questions_to_generate} questions across {len(question_specs)} specifications..."
     logger.info(log_msg)
     await callback.send_update("progress", {"step": "question_generation", "status": log_msg})
 
-    question_gen_tasks = []
-    for spec in question_specs:
-        task = question_agent.chain.ainvoke({
+    retrieval_queries = [
+        f"{subject} {spec.prompt}" if settings.RETRIEVAL_QUERY_INCLUDES_PROMPT and spec.prompt else subject
+        for spec in question_specs
+    ]
+    # One batched embedding and one lookup per distinct query; the chains below read from the memo.
+    await question_agent.prefetch_context(retrieval_queries)
+    logger.info(f"Context retrieval: {retrieval.summary()}.")
+
+    async def generate(spec_index: int) -> Tuple[int, List[Dict]]:
+        spec = question_specs[spec_index]
+        result = await question_agent.chain.ainvoke({
             "subject": subject,
+            "retrieval_query": retrieval_queries[spec_index],
             "grade_level": grade_level,
             "question_type": spec.question_type,
             "count": spec.count,
             "user_prompt": spec.prompt or "None"
         })
-        question_gen_tasks.append((task, spec.question_type))
-    
-    question_results_with_type = await asyncio.gather(*(t for t, _ in question_gen_tasks))
-    
-    all_generated_questions = []
-    for i, result in enumerate(question_results_with_type):
-        q_type = question_gen_tasks[i][1]
-        for q_data in result.get('questions', []):
-            all_generated_questions.append((q_data, q_type))
+        return spec_index, result.get('questions', [])
 
-    log_msg = f"--- Generated a total of {len(all_generated_questions)} questions ---"
-    logger.info(log_msg)
-    await callback.send_update("log", {"message": log_msg})
+    solved_count = 0
+    # Questions actually generated so far; the LLM may return more or fewer than a spec asked for.
+    question_count = 0
+    generation_complete = False
 
-    # 4. Solve all questions in parallel
-    log_msg = f"Starting parallel solution generation for {len(all_generated_questions)} questions..."
-    logger.info(log_msg)
-    await callback.send_update("progress", {"step": "solution_generation", "status": log_msg})
-
-    solution_gen_tasks = []
-    for q_data, q_type in all_generated_questions:
+    async def solve(batch: List[Dict], q_type: str) -> List[ExamQuestion]:
+        nonlocal solved_count
         if q_type == "Math Problem":
-            task = math_solver.chain.ainvoke({"question_text": q_data['question_text']})
+            solutions = await math_solver.asolve_batch([{"question_text": q_data['question_text']} for q_data in batch])
         else:
-            task = general_solver.chain.ainvoke({
+            solutions = await general_solver.asolve_batch([{
                 "question_type": q_type,
                 "question_text": q_data['question_text'],
                 "options": q_data.get('options')
+            } for q_data in batch])
+        exam_qs = []
+        for q_data, sol_data in zip(batch, solutions):
+            exam_q = ExamQuestion(
+                id=f"q-{uuid.uuid4().hex[:8]}",
+                question_type=q_type,
+                question_text=q_data['question_text'],
+                options=q_data.get('options'),
+                image_url=q_data.get('image_url'),
+                solution=sol_data
+            )
+            solved_count += 1
+            await callback.send_update("partial_result", {
+                "question": exam_q.model_dump(),
+                "completed": solved_count,
+                "total": question_count,
+                "final": generation_complete,
             })
-        solution_gen_tasks.append(task)
+            exam_qs.append(exam_q)
+        return exam_qs
+
+    generation_tasks = [asyncio.create_task(generate(i)) for i in range(len(question_specs))]
+    # (spec index, position of the batch within the spec) -> solver task, so the exam keeps the spec order.
+    solution_tasks: Dict[Tuple[int, int], asyncio.Task] = {}
+    try:
+        for next_generated in asyncio.as_completed(generation_tasks):
+            spec_index, questions = await next_generated
+            q_type = question_specs[spec_index].question_type
+            batch_size = max(1, settings.MATH_SOLVER_BATCH_SIZE if q_type == "Math Problem" else settings.SOLVER_BATCH_SIZE)
+            question_count += len(questions)
+            for start in range(0, len(questions), batch_size):
+                solution_tasks[(spec_index, start)] = asyncio.create_task(solve(questions[start:start + batch_size], q_type))
+            log_msg = f"Generated {len(questions)} '{q_type}' question(s); solving them now."
+            logger.info(log_msg)
+            await callback.send_update("log", {"message": log_msg})
+
+        generation_complete = True
+        log_msg = f"--- Generated a total of {question_count} questions ---"
+        logger.info(log_msg)
+        logger.info(f"Question generation context: {question_agent.context_stats.summary()}.")
+        await callback.send_update("log", {"message": log_msg})
 
-    solutions = await asyncio.gather(*solution_gen_tasks)
+        # 4. Wait for the remaining solutions
+        log_msg = f"Completing solution generation for {question_count} questions..."
+        logger.info(log_msg)
+        await callback.send_update("progress", {"step": "solution_generation", "status": log_msg})
+        await asyncio.gather(*solution_tasks.values())
+    finally:
+        for task in generation_tasks + list(solution_tasks.values()):
+            task.cancel()
     log_msg = "--- Completed solution generation ---"
     logger.info(log_msg)
     await callback.send_update("log", {"message": log_msg})
 
-    # 5. Combine questions and solutions into structured objects
-    exam_questions: List[ExamQuestion] = []
-    for (q_data, q_type), sol_data in zip(all_generated_questions, solutions):
-        exam_q = ExamQuestion(
-            id=f"q-{uuid.uuid4().hex[:8]}",
-            question_type=q_type,
-            question_text=q_data['question_text'],
-            options=q_data.get('options'),
-            image_url=q_data.get('image_url'),
-            solution=sol_data
-        )
-        exam_questions.append(exam_q)
-    
+    # 5. Collect the questions in spec order
+    exam_questions: List[ExamQuestion] = [q for key in sorted(solution_tasks) for q in solution_tasks[key].result()]
+
     # 6. Compile final exam and answer key
     log_msg = "--- Compiling final exam documents ---"
     logger.info(log_msg)
     await callback.send_update("progress", {"step": "compilation", "status": "Compiling final exam documents..."})
     
-    compiled_result = await compiler.chain.ainvoke({"exam_questions": exam_questions})
+    compiled_result = render_exam(exam_questions, title=exam_title)
+    if settings.EXAM_COMPILER_MODE == "llm":
+        try:
+            polished = await ExamCompilerAgent().chain.ainvoke({"exam_questions": exam_questions})
+            if polished.get("exam_paper") and polished.get("answer_key"):
+                compiled_result = polished
+            else:
+                logger.warning("LLM exam compiler returned incomplete documents; keeping the locally rendered exam.")
+        except Exception as e:
+            logger.warning(f"LLM exam compiler failed; keeping the locally rendered exam: {e}")
     
     log_msg = "--- Exam compilation complete ---"
     logger.info(log_msg)
@@ -1,16 +1,26 @@
 # src/deep_searcher/data_pipeline/crawler.py
 
 import asyncio
+import heapq
 import logging
+import os
 import re
-from urllib.parse import urljoin, urlparse
-from typing import List, Dict, Set
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+from typing import List, Dict, Optional, Set, Tuple
 
 import aiohttp
-from bs4 import BeautifulSoup
 
 from config.settings import settings
 from src.deep_searcher.utils.url_utils import normalize_url
+from src.deep_searcher.data_pipeline.fetcher import FetchContext, guess_content_type, new_fetch_context, response_content_type
+from src.deep_searcher.data_pipeline.http_cache import BodyRead
+from src.deep_searcher.data_pipeline.link_extractor import (
+    PageLinks, StreamingLinkExtractor, extract_links_with_soup, read_capped_body, stream_links_from_response,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,112 +28,261 @@ HEADERS = {
     'User-Agent': settings.CRAWLER_USER_AGENT
 }
 
-def _is_valid_url(url: str, base_domain: str) -> bool:
-    """Checks if a URL is valid and within the same domain."""
-    if not url or url.startswith(('#', 'mailto:', 'tel:')):
-        return False
-    
-    try:
-        parsed_url = urlparse(url)
-        # It's a relative URL, so it's valid for joining
-        if not parsed_url.scheme:
-            return True
-        # It's an absolute URL, check if it's http/https and from the same domain
-        if parsed_url.scheme in ['http', 'https'] and parsed_url.netloc == base_domain:
-            return True
-        return False
-    except Exception:
-        return False
-
-def _filter_urls(urls: Set[str]) -> Set[str]:
-    """Filters a set of URLs against the regex patterns in settings."""
-    if not settings.CRAWLER_EXCLUDE_PATTERNS:
+# Compiled once instead of re-parsing every pattern for every URL.
+EXCLUDE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in settings.CRAWLER_EXCLUDE_PATTERNS]
+
+# Relevance weights for the signals available about a link before it is fetched.
+ANCHOR_WEIGHT = 0.5
+URL_WEIGHT = 0.3
+PARENT_TITLE_WEIGHT = 0.2
+# Search hits were already ranked by the search engine, so they start ahead of discovered links.
+SEED_BONUS = 0.5
+# Each hop away from the search hits multiplies a link's score by this factor.
+DEPTH_DECAY = 0.8
+
+# Tokens are not filtered by length, so short subjects such as "AI", "Go" or "C#" still match.
+_STOPWORDS = {
+    "a", "an", "as", "at", "be", "by", "in", "is", "it", "of", "on", "or", "to", "vs",
+    "the", "and", "for", "with", "from", "into", "about", "this", "that", "what", "how", "are",
+    "www", "com", "org", "net", "edu", "html", "htm", "php", "aspx", "index", "http", "https",
+}
+
+# robots.txt parsers per scheme://host, with their expiry time. None means "no usable robots.txt".
+_robots_cache: Dict[str, Tuple[float, Optional[RobotFileParser]]] = {}
+_robots_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+
+def _tokenize(text: str) -> Set[str]:
+    return {t for t in re.findall(r"[a-z0-9]+", (text or "").lower()) if t not in _STOPWORDS}
+
+def _overlap(tokens: Set[str], subject_tokens: Set[str]) -> float:
+    """Fraction of the subject's tokens found in `tokens`."""
+    if not subject_tokens:
+        return 0.0
+    return len(tokens & subject_tokens) / len(subject_tokens)
+
+def _score_link(anchor_text: str, url: str, parent_title: str, depth: int, subject_tokens: Set[str]) -> float:
+    url_tokens = _tokenize(urlparse(url).path.replace("-", " ").replace("_", " "))
+    relevance = (
+        ANCHOR_WEIGHT * _overlap(_tokenize(anchor_text), subject_tokens)
+        + URL_WEIGHT * _overlap(url_tokens, subject_tokens)
+        + PARENT_TITLE_WEIGHT * _overlap(_tokenize(parent_title), subject_tokens)
+    )
+    return relevance * DEPTH_DECAY ** max(depth - 1, 0)
+
+def _score_seed(hit: Dict, url: str, subject_tokens: Set[str]) -> float:
+    title_tokens = _tokenize(hit.get("title", ""))
+    url_tokens = _tokenize(urlparse(url).path.replace("-", " ").replace("_", " "))
+    return SEED_BONUS + (1 - URL_WEIGHT) * _overlap(title_tokens, subject_tokens) + URL_WEIGHT * _overlap(url_tokens, subject_tokens)
+
+def _is_excluded(url: str) -> bool:
+    return any(pattern.search(url) for pattern in EXCLUDE_PATTERNS)
+
+
+def _origin(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+async def _robots_parser(fetch: FetchContext, url: str) -> Optional[RobotFileParser]:
+    origin = _origin(url)
+    async with _robots_locks[origin]:
+        cached = _robots_cache.get(origin)
+        if cached and cached[0] > time.time():
+            return cached[1]
+        parser = None
+        try:
+            response = await fetch.get(f"{origin}/robots.txt", headers=HEADERS, timeout=aiohttp.ClientTimeout(total=settings.DOWNLOADER_TIMEOUT))
+            if response.status == 200 and response.body:
+                parser = RobotFileParser()
+                parser.parse(response.body.decode("utf-8", errors="ignore").splitlines())
+            elif response.status in (401, 403):
+                # An access-restricted robots.txt means the whole site is off limits.
+                parser = RobotFileParser()
+                parser.disallow_all = True
+        except Exception as e:
+            logger.debug(f"Could not fetch robots.txt for {origin}: {e}")
+        _robots_cache[origin] = (time.time() + settings.CRAWLER_ROBOTS_CACHE_TTL_SECONDS, parser)
+        return parser
+
+async def _is_allowed_by_robots(fetch: FetchContext, url: str) -> bool:
+    if not settings.CRAWLER_RESPECT_ROBOTS_TXT:
+        return True
+    parser = await _robots_parser(fetch, url)
+    return parser is None or parser.can_fetch(settings.CRAWLER_USER_AGENT, url)
+
+async def _filter_allowed_by_robots(fetch: FetchContext, urls: List[str]) -> List[str]:
+    """Keeps the URLs robots.txt allows, fetching the robots.txt of every domain concurrently."""
+    if not settings.CRAWLER_RESPECT_ROBOTS_TXT:
         return urls
-    
-    filtered_urls = set()
-    for url in urls:
-        if not any(re.search(pattern, url, re.IGNORECASE) for pattern in settings.CRAWLER_EXCLUDE_PATTERNS):
-            filtered_urls.add(url)
-    return filtered_urls
-
-async def _fetch_and_extract_links(session: aiohttp.ClientSession, url: str) -> Set[str]:
-    """Fetches a single URL and extracts all valid, same-domain, absolute links."""
-    extracted_links = set()
+    url_by_origin = {_origin(url): url for url in urls}
+    parsers = dict(zip(url_by_origin, await asyncio.gather(*(_robots_parser(fetch, url) for url in url_by_origin.values()))))
+    return [url for url in urls if (parser := parsers[_origin(url)]) is None or parser.can_fetch(settings.CRAWLER_USER_AGENT, url)]
+
+
+class _DomainPoliteness:
+    """Limits concurrent requests per domain and spaces consecutive requests to a domain by a fixed delay."""
+
+    def __init__(self, concurrency: int, delay: float):
+        self._semaphores: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(max(1, concurrency)))
+        self._next_slot: Dict[str, float] = {}
+        self.delay = delay
+
+    @asynccontextmanager
+    async def slot(self, domain: str):
+        async with self._semaphores[domain]:
+            now = time.monotonic()
+            start = max(now, self._next_slot.get(domain, 0.0))
+            self._next_slot[domain] = start + self.delay
+            if start > now:
+                await asyncio.sleep(start - now)
+            yield
+
+
+async def _fetch_and_extract_links(fetch: FetchContext, url: str) -> PageLinks:
+    """
+    Fetches a single URL and extracts its title and all valid, same-domain, absolute links with their anchor text.
+    A complete body is kept on the fetch context so ingestion doesn't download it again.
+    """
+    streaming = settings.CRAWLER_LINK_EXTRACTOR == "streaming"
+    extractor = StreamingLinkExtractor(url, max_links=settings.CRAWLER_MAX_LINKS_PER_PAGE)
+    # Complete bodies are kept for ingestion, so never read more than a download may be.
+    max_body_bytes = settings.CRAWLER_MAX_BODY_BYTES or settings.DOWNLOAD_MAX_BYTES
+
+    async def read_body(resp: aiohttp.ClientResponse) -> BodyRead:
+        if 'text/html' not in response_content_type(resp):
+            # Documents have no links to follow; leave the download to ingestion instead of reading it here.
+            return BodyRead(complete=False)
+        if not streaming:
+            return await read_capped_body(resp, max_bytes=max_body_bytes)
+        return await stream_links_from_response(resp, extractor, max_bytes=max_body_bytes)
+
     try:
         # Reuse downloader timeout setting for individual requests
         timeout = aiohttp.ClientTimeout(total=settings.DOWNLOADER_TIMEOUT)
-        async with session.get(url, timeout=timeout, headers=HEADERS, ssl=False) as response:
-            if response.status != 200 or 'text/html' not in response.headers.get('Content-Type', ''):
-                logger.debug(f"Skipping non-HTML or failed request for {url} (Status: {response.status})")
-                return extracted_links
-
-            html = await response.text()
-            soup = BeautifulSoup(html, 'lxml')
-            base_domain = urlparse(url).netloc
-
-            for a_tag in soup.find_all('a', href=True):
-                href = a_tag['href']
-                absolute_url = normalize_url(urljoin(url, href.strip()))
-                
-                if _is_valid_url(absolute_url, base_domain):
-                    extracted_links.add(absolute_url)
-            
-            return extracted_links
+        response = await fetch.get(url, headers=HEADERS, timeout=timeout, reader=read_body, spool=True)
+        fetch.keep(url, response)
+        body = response.body
+        if response.body_path:
+            # Large cached bodies come back spooled; only the capped prefix matters for link extraction.
+            with open(response.body_path, "rb") as f:
+                body = f.read(max_body_bytes or -1)
+            os.unlink(response.body_path)
+        if response.status != 200 or 'text/html' not in response.content_type:
+            logger.debug(f"Skipping non-HTML or failed request for {url} (Status: {response.status})")
+            return PageLinks()
+
+        if not streaming:
+            return extract_links_with_soup(body, url)
+        if extractor.bytes_fed:
+            return extractor.close()
+        # Served from a cache: the body never went through the streaming reader.
+        return extractor.feed_body(body, max_bytes=max_body_bytes)
     except asyncio.TimeoutError:
         logger.warning(f"Timeout while trying to fetch {url}")
-        return extracted_links
+        return PageLinks()
     except Exception as e:
         logger.warning(f"Could not fetch or parse {url}. Reason: {e}")
-        return extracted_links
+        return PageLinks()
 
-async def discover_urls_from_hits(hits: List[Dict]) -> List[str]:
+async def discover_urls_from_hits(hits: List[Dict], subject: str = "", fetch: Optional[FetchContext] = None) -> List[str]:
     """
-    Takes initial search hits, crawls them to find more links, and returns a
-    unified list of relevant URLs, respecting the CRAWLER_MAX_DISCOVERED_URLS limit.
+    Takes initial search hits and crawls outward from them best-first, returning the
+    most relevant URLs for `subject`, respecting the CRAWLER_MAX_DISCOVERED_URLS limit.
+
+    The frontier is a priority queue scored by how well a link's anchor text, URL and
+    parent page title match the subject. Only pages shallower than CRAWLER_MAX_DEPTH are
+    fetched (at most CRAWLER_MAX_PAGES_TO_FETCH of them), with per-domain concurrency and
+    delay limits and robots.txt honoured. Pass the run's FetchContext so crawled pages are
+    reused during ingestion.
     """
     if not hits:
         return []
 
-    initial_urls = {normalize_url(hit['href']) for hit in hits if hit.get('href')}
-    logger.info(f"Step 1: Received {len(initial_urls)} unique initial URLs from search hits.")
+    fetch = fetch or new_fetch_context()
+    subject_tokens = _tokenize(subject)
+    max_depth = settings.CRAWLER_MAX_DEPTH
+    page_budget = settings.CRAWLER_MAX_PAGES_TO_FETCH
 
-    discovered_links = set()
-    # Reuse ingestion concurrency setting to limit simultaneous crawl requests
-    semaphore = asyncio.Semaphore(settings.INGESTION_CONCURRENT_DOWNLOADS)
+    # Best known score for every candidate URL; the final selection is made from these.
+    scores: Dict[str, float] = {}
+    frontier: List[Tuple[float, int, str, int]] = []
+    # Best score each URL is queued with. A URL re-scored higher is pushed again; the
+    # entries it supersedes, and those of URLs already crawled, are skipped when popped.
+    queued: Dict[str, float] = {}
+    crawled: Set[str] = set()
+    counter = 0
 
-    async def crawl_task_wrapper(url, session):
-        async with semaphore:
-            return await _fetch_and_extract_links(session, url)
+    def push(url: str, score: float, depth: int):
+        nonlocal counter
+        if not url or _is_excluded(url) or score <= scores.get(url, -1.0):
+            return
+        scores[url] = score
+        # Links whose extension says they are documents rather than pages have nothing to crawl.
+        if url not in crawled and depth < max_depth and guess_content_type(url) in (None, "text/html", "application/xhtml+xml"):
+            counter += 1
+            queued[url] = score
+            heapq.heappush(frontier, (-score, counter, url, depth))
 
-    async with aiohttp.ClientSession() as session:
-        logger.info(f"Step 2: Starting simple crawl on initial URLs...")
-        tasks = [crawl_task_wrapper(url, session) for url in initial_urls]
-        results = await asyncio.gather(*tasks)
-    
-    for link_set in results:
-        if link_set:
-            discovered_links.update(link_set)
-            
-    logger.info(f"Step 3: Discovered {len(discovered_links)} new links from crawling.")
+    def has_live_entry() -> bool:
+        while frontier and (frontier[0][2] in crawled or -frontier[0][0] < queued[frontier[0][2]]):
+            heapq.heappop(frontier)
+        return bool(frontier)
 
-    # Combine initial URLs with the newly discovered links
-    combined_urls = initial_urls.union(discovered_links)
+    for hit in hits:
+        url = normalize_url(hit.get('href', ''))
+        push(url, _score_seed(hit, url, subject_tokens), 0)
+    logger.info(f"Step 1: Received {len(scores)} unique initial URLs from search hits.")
 
-    # Filter the final list against exclude patterns
-    filtered_urls = _filter_urls(combined_urls)
-    initial_filtered_count = len(filtered_urls)
+    politeness = _DomainPoliteness(settings.CRAWLER_PER_DOMAIN_CONCURRENCY, settings.CRAWLER_PER_DOMAIN_DELAY_SECONDS)
+    pages_fetched = 0
+    in_flight = 0
+    frontier_changed = asyncio.Condition()
 
-    # Apply the new limit from settings
+    async def crawl_worker():
+        nonlocal pages_fetched, in_flight
+        while True:
+            async with frontier_changed:
+                await frontier_changed.wait_for(lambda: has_live_entry() or in_flight == 0 or pages_fetched >= page_budget)
+                if pages_fetched >= page_budget or not frontier:
+                    return
+                _, _, url, depth = heapq.heappop(frontier)
+                crawled.add(url)
+                pages_fetched += 1
+                in_flight += 1
+            page = PageLinks()
+            try:
+                if await _is_allowed_by_robots(fetch, url):
+                    async with politeness.slot(urlparse(url).netloc):
+                        page = await _fetch_and_extract_links(fetch, url)
+                else:
+                    logger.debug(f"robots.txt disallows crawling {url}")
+            finally:
+                # New links must be on the frontier before this page stops counting as in flight,
+                # otherwise idle workers could conclude the crawl is over.
+                async with frontier_changed:
+                    for link, anchor_text in page.links.items():
+                        push(link, _score_link(anchor_text, link, page.title, depth + 1, subject_tokens), depth + 1)
+                    in_flight -= 1
+                    frontier_changed.notify_all()
+
+    logger.info(f"Step 2: Crawling best-first up to depth {max_depth} (page budget: {page_budget})...")
+    await asyncio.gather(*(crawl_worker() for _ in range(max(1, settings.INGESTION_CONCURRENT_DOWNLOADS))))
+    logger.info(f"Step 3: Fetched {pages_fetched} pages and found {len(scores)} candidate URLs.")
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
     max_urls = settings.CRAWLER_MAX_DISCOVERED_URLS
-    if max_urls > 0 and initial_filtered_count > max_urls:
-        logger.warning(
-            f"Crawler discovered {initial_filtered_count} URLs, which exceeds the limit of {max_urls}. "
-            f"Truncating the list to the first {max_urls} URLs."
-        )
-        final_urls_list = sorted(list(filtered_urls))[:max_urls]
-    else:
-        final_urls_list = sorted(list(filtered_urls))
-    
+    final_urls_list: List[str] = []
+    position = 0
+    while position < len(ranked) and (max_urls <= 0 or len(final_urls_list) < max_urls):
+        # Check just enough of the best candidates to fill the limit, then more if robots.txt rejected some.
+        batch_size = max_urls - len(final_urls_list) if max_urls > 0 else len(ranked)
+        batch = [url for url, _ in ranked[position:position + batch_size]]
+        position += len(batch)
+        final_urls_list.extend(await _filter_allowed_by_robots(fetch, batch))
+
+    # Only the selected pages will be ingested; don't hold the others' bodies for the rest of the run.
+    fetch.retain_only(final_urls_list)
+
     limit_info = f"limit is {max_urls}" if max_urls > 0 else "limit is disabled"
-    logger.info(f"Discovery complete. Returning {len(final_urls_list)} unique and filtered URLs ({limit_info}).")
-    return final_urls_list
\ No newline at end of file
+    logger.info(f"Discovery complete. Returning {len(final_urls_list)} most relevant URLs ({limit_info}).")
+    return final_urls_list
@@ -0,0 +1,207 @@
+# src/deep_searcher/data_pipeline/fetcher.py
+import asyncio
+import logging
+import posixpath
+import os
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+from config.settings import settings
+from src.deep_searcher.utils.url_utils import normalize_url
+from src.deep_searcher.data_pipeline.http_cache import (
+    BodyRead, BodyReader, CachedResponse, HttpCacheStats, cached_get, new_spool_file, response_content_type,
+)
+
+logger = logging.getLogger(__name__)
+
+SPOOL_CHUNK_SIZE = 64 * 1024
+
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_fetch_session() -> aiohttp.ClientSession:
+    """
+    Returns the app-wide HTTP session shared by the crawler and the downloader.
+    The connector pools keep-alive connections, caps connections per host and
+    caches DNS lookups, so repeated requests to the same sites reuse sockets.
+    """
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        connector = aiohttp.TCPConnector(
+            limit=settings.FETCH_MAX_CONNECTIONS,
+            limit_per_host=settings.FETCH_MAX_CONNECTIONS_PER_HOST,
+            ttl_dns_cache=settings.FETCH_DNS_CACHE_TTL_SECONDS,
+            keepalive_timeout=settings.FETCH_KEEPALIVE_TIMEOUT_SECONDS,
+        )
+        _session = aiohttp.ClientSession(connector=connector)
+        _session_loop = loop
+        logger.info(
+            f"Shared fetch session created (max connections: {settings.FETCH_MAX_CONNECTIONS}, "
+            f"per host: {settings.FETCH_MAX_CONNECTIONS_PER_HOST})."
+        )
+    return _session
+
+
+async def close_fetch_session():
+    global _session, _session_loop
+    session, _session, _session_loop = _session, None, None
+    if session is not None and not session.closed:
+        await session.close()
+        logger.info("Shared fetch session closed.")
+
+
+class DownloadRejected(Exception):
+    """Raised by a body reader to abandon a download before (or while) its body is read."""
+
+
+# Extensions whose content type is unambiguous. Anything else is decided by the response headers.
+EXTENSION_CONTENT_TYPES: Dict[str, str] = {
+    ".html": "text/html",
+    ".htm": "text/html",
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".svg": "image/svg+xml",
+    ".zip": "application/zip",
+    ".gz": "application/gzip",
+    ".tar": "application/x-tar",
+    ".rar": "application/vnd.rar",
+    ".7z": "application/x-7z-compressed",
+    ".exe": "application/vnd.microsoft.portable-executable",
+    ".dmg": "application/x-apple-diskimage",
+    ".iso": "application/x-iso9660-image",
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".mp4": "video/mp4",
+    ".mov": "video/quicktime",
+    ".avi": "video/x-msvideo",
+    ".mkv": "video/x-matroska",
+    ".doc": "application/msword",
+    ".xls": "application/vnd.ms-excel",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".ppt": "application/vnd.ms-powerpoint",
+    ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+}
+
+
+def guess_content_type(url: str) -> Optional[str]:
+    """
+    Guesses a URL's content type from its path extension, or None when the extension says
+    nothing. Uses a fixed table rather than `mimetypes`, whose host-dependent entries
+    (e.g. .php, .pl) would make ordinary pages look like something else.
+    """
+    _, extension = posixpath.splitext(urlparse(url).path.lower())
+    return EXTENSION_CONTENT_TYPES.get(extension)
+
+
+def spooled_reader(accept: Callable[[str], bool]) -> BodyReader:
+    """
+    Returns a body reader that rejects unwanted content types and oversized bodies from the
+    response headers, before any of the body is read. Bodies stay in memory up to
+    DOWNLOAD_SPOOL_THRESHOLD_BYTES and are spilled to a temporary file beyond that, so
+    peak memory per download is bounded. Reading stops at DOWNLOAD_MAX_BYTES even when
+    the server sent no (or a wrong) Content-Length.
+    """
+    max_bytes = settings.DOWNLOAD_MAX_BYTES
+    threshold = settings.DOWNLOAD_SPOOL_THRESHOLD_BYTES
+
+    async def read(response: aiohttp.ClientResponse) -> BodyRead:
+        content_type = response_content_type(response)
+        if not accept(content_type):
+            raise DownloadRejected(f"unsupported content type '{content_type or 'unknown'}'")
+        if max_bytes > 0 and response.content_length and response.content_length > max_bytes:
+            raise DownloadRejected(f"Content-Length {response.content_length} exceeds the {max_bytes} byte limit")
+
+        chunks = []
+        size = 0
+        spool = None
+        try:
+            async for chunk in response.content.iter_chunked(SPOOL_CHUNK_SIZE):
+                size += len(chunk)
+                if max_bytes > 0 and size > max_bytes:
+                    raise DownloadRejected(f"body exceeds the {max_bytes} byte limit")
+                if spool is None and threshold > 0 and size > threshold:
+                    spool = new_spool_file()
+                    spool.writelines(chunks)
+                    chunks = []
+                if spool is not None:
+                    spool.write(chunk)
+                else:
+                    chunks.append(chunk)
+        except BaseException:
+            if spool is not None:
+                spool.close()
+                os.unlink(spool.name)
+            raise
+        if spool is None:
+            return BodyRead(body=b"".join(chunks))
+        spool.close()
+        logger.debug(f"Spooled {size} bytes from {response.url} to {spool.name}.")
+        return BodyRead(path=spool.name)
+
+    return read
+
+
+@dataclass
+class FetchContext:
+    """
+    Per-run view of the shared fetch layer. Pages downloaded while crawling are kept
+    in `prefetched` so the ingestion stage can partition them without fetching them again;
+    when the crawl ends, only the bodies of the URLs it selected are retained.
+    """
+    session: aiohttp.ClientSession
+    stats: HttpCacheStats = field(default_factory=HttpCacheStats)
+    prefetched: Dict[str, CachedResponse] = field(default_factory=dict)
+    reused: int = 0
+
+    async def get(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+        reader: Optional[BodyReader] = None,
+        spool: bool = False,
+    ) -> CachedResponse:
+        """
+        Returns a body handed over by an earlier stage of this run, or fetches it through the download cache.
+        With `spool`, large bodies may come back as a temporary file in `body_path`, which the caller deletes.
+        """
+        response = self.prefetched.pop(normalize_url(url), None)
+        if response is not None:
+            self.reused += 1
+            return response
+        timeout = timeout or aiohttp.ClientTimeout(total=settings.DOWNLOADER_TIMEOUT)
+        spool_threshold = settings.DOWNLOAD_SPOOL_THRESHOLD_BYTES if spool else 0
+        return await cached_get(
+            self.session, url, headers=headers, timeout=timeout, stats=self.stats, reader=reader, spool_threshold=spool_threshold
+        )
+
+    def keep(self, url: str, response: CachedResponse):
+        """Hands a successfully fetched body over to later stages of this run."""
+        if response.status == 200 and response.body and response.complete:
+            self.prefetched[normalize_url(url)] = response
+
+    def retain_only(self, urls: Iterable[str]):
+        """Drops kept bodies of every URL not in `urls`, e.g. crawled pages that were not selected for ingestion."""
+        wanted = {normalize_url(url) for url in urls}
+        dropped = [url for url in self.prefetched if url not in wanted]
+        for url in dropped:
+            del self.prefetched[url]
+        if dropped:
+            logger.debug(f"Released {len(dropped)} crawled bodies that were not selected for ingestion.")
+
+    def summary(self) -> str:
+        return f"{self.stats.summary()}, {self.reused} reused from crawl"
+
+
+def new_fetch_context() -> FetchContext:
+    return FetchContext(session=get_fetch_session())
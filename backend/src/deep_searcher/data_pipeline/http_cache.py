@@ -0,0 +1,324 @@
+# src/deep_searcher/data_pipeline/http_cache.py
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterator, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import aiohttp
+
+from config.settings import settings
+from src.deep_searcher.utils.url_utils import normalize_url
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+@dataclass
+class HttpCacheStats:
+    """Per-run counters for download cache activity."""
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+
+    def summary(self) -> str:
+        return f"{self.hits} hits, {self.revalidated} revalidated, {self.misses} misses"
+
+
+@dataclass
+class CachedResponse:
+    status: int
+    body: Optional[bytes]
+    content_type: str
+    from_cache: bool = False
+    # False when the body reader stopped early; such bodies are never cached or reused.
+    complete: bool = True
+    # Large bodies are spooled to this temporary file instead of `body`. The caller deletes it.
+    body_path: Optional[str] = None
+
+
+@dataclass
+class BodyRead:
+    """What a body reader got from a 200 response: in-memory bytes or a spooled temporary file."""
+    body: Optional[bytes] = None
+    path: Optional[str] = None
+    complete: bool = True
+
+
+BodyReader = Callable[[aiohttp.ClientResponse], Awaitable[BodyRead]]
+
+
+def new_spool_file() -> "tempfile._TemporaryFileWrapper":
+    """Creates a temporary file for a large body next to the caches, so cached blobs can be hard-linked into it."""
+    spool_dir = Path(settings.CACHE_DIR) / "spool"
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    return tempfile.NamedTemporaryFile(dir=spool_dir, suffix=".body", delete=False)
+
+
+def response_content_type(response: aiohttp.ClientResponse) -> str:
+    """The response's media type without parameters, lowercased (e.g. "text/html")."""
+    return response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+
+
+def sha256_of_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class _CacheEntry:
+    sha256: str
+    content_type: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+def cache_key_for_url(url: str) -> str:
+    """Normalizes a URL into a cache key: lowercase scheme/host, no default port, no fragment."""
+    cleaned = normalize_url(url)
+    try:
+        parts = urlsplit(cleaned)
+    except ValueError:
+        return cleaned
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    netloc = host
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parts.port}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+class HttpCache:
+    """
+    An on-disk HTTP response cache.
+
+    Entries are indexed by normalized URL in SQLite, while bodies are stored
+    content-addressed by their sha256 so identical documents served from
+    different mirrors are only kept once. Fresh entries (younger than the TTL)
+    are served without touching the network; stale entries are revalidated with
+    If-None-Match / If-Modified-Since. When the total size of stored bodies
+    exceeds the limit, the least recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir: str, ttl_seconds: int, max_bytes: int):
+        self.root = Path(cache_dir) / "http"
+        self.blob_dir = self.root / "blobs"
+        self.db_path = self.root / "index.sqlite3"
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " url TEXT PRIMARY KEY, sha256 TEXT NOT NULL, content_type TEXT NOT NULL,"
+                " etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS blobs (sha256 TEXT PRIMARY KEY, size INTEGER NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at)")
+        logger.info(f"HttpCache initialized at '{self.root}' (ttl={ttl_seconds}s, max={max_bytes} bytes)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _blob_path(self, sha256: str) -> Path:
+        return self.blob_dir / sha256[:2] / sha256
+
+    # --- Synchronous storage primitives (run off the event loop) ---
+    def _lookup(self, key: str) -> Optional[_CacheEntry]:
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT sha256, content_type, etag, last_modified, fetched_at FROM entries WHERE url = ?", (key,)
+            ).fetchone()
+        if not row:
+            return None
+        entry = _CacheEntry(*row)
+        # Entries written before content types were normalized may be mixed case.
+        entry.content_type = (entry.content_type or "").lower()
+        return entry
+
+    def _read_body(self, key: str, entry: _CacheEntry, spool_threshold: int = 0) -> Optional[BodyRead]:
+        """Reads a cached body, handing bodies over `spool_threshold` bytes out as a private temporary file."""
+        blob_path = self._blob_path(entry.sha256)
+        try:
+            if spool_threshold > 0 and blob_path.stat().st_size > spool_threshold:
+                with new_spool_file() as spool:
+                    spool_path = spool.name
+                # A hard link is free and survives eviction of the blob; fall back to a copy across filesystems.
+                os.unlink(spool_path)
+                try:
+                    os.link(blob_path, spool_path)
+                except OSError:
+                    shutil.copyfile(blob_path, spool_path)
+                read = BodyRead(path=spool_path)
+            else:
+                read = BodyRead(body=blob_path.read_bytes())
+        except FileNotFoundError:
+            return None
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE url = ?", (time.time(), key))
+        return read
+
+    def _refresh(self, key: str):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE entries SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, key))
+
+    def _store(self, key: str, read: BodyRead, content_type: str, etag: Optional[str], last_modified: Optional[str]):
+        sha256 = sha256_of_file(read.path) if read.path else hashlib.sha256(read.body).hexdigest()
+        size = os.path.getsize(read.path) if read.path else len(read.body)
+        blob_path = self._blob_path(sha256)
+        if not blob_path.exists():
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = blob_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            if read.path:
+                shutil.copyfile(read.path, tmp_path)
+            else:
+                tmp_path.write_bytes(read.body)
+            os.replace(tmp_path, blob_path)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR IGNORE INTO blobs (sha256, size) VALUES (?, ?)", (sha256, size))
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (url, sha256, content_type, etag, last_modified, fetched_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, sha256, content_type, etag, last_modified, now, now),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drops least recently used entries until stored bodies fit within max_bytes."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if self.max_bytes <= 0 or total <= self.max_bytes:
+            return
+        evicted = 0
+        for url, sha256 in conn.execute("SELECT url, sha256 FROM entries ORDER BY accessed_at ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+            evicted += 1
+            still_referenced = conn.execute("SELECT 1 FROM entries WHERE sha256 = ? LIMIT 1", (sha256,)).fetchone()
+            if still_referenced:
+                continue
+            size_row = conn.execute("SELECT size FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+            conn.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+            self._blob_path(sha256).unlink(missing_ok=True)
+            total -= size_row[0] if size_row else 0
+        logger.info(f"HttpCache evicted {evicted} entries; {total} bytes remain.")
+
+    # --- Async API ---
+    async def get(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        headers: Dict[str, str],
+        timeout: aiohttp.ClientTimeout,
+        stats: Optional[HttpCacheStats] = None,
+        reader: Optional[BodyReader] = None,
+        spool_threshold: int = 0,
+    ) -> CachedResponse:
+        """
+        Fetches a URL through the cache. Only complete 200 responses are stored; other
+        statuses are returned to the caller with no body. Network errors propagate.
+        `reader` replaces the default full read of a downloaded body. With a
+        `spool_threshold`, cached bodies larger than it are returned as a temporary
+        file in `body_path` rather than loaded into memory.
+        """
+        key = cache_key_for_url(url)
+        entry = await asyncio.to_thread(self._lookup, key)
+
+        if entry and time.time() - entry.fetched_at < self.ttl_seconds:
+            read = await asyncio.to_thread(self._read_body, key, entry, spool_threshold)
+            if read is not None:
+                if stats: stats.hits += 1
+                return CachedResponse(status=200, body=read.body, body_path=read.path, content_type=entry.content_type, from_cache=True)
+
+        request_headers = dict(headers)
+        if entry:
+            if entry.etag:
+                request_headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request_headers["If-Modified-Since"] = entry.last_modified
+
+        async with session.get(url, timeout=timeout, headers=request_headers, ssl=False) as resp:
+            if resp.status == 304 and entry:
+                read = await asyncio.to_thread(self._read_body, key, entry, spool_threshold)
+                if read is not None:
+                    await asyncio.to_thread(self._refresh, key)
+                    if stats: stats.revalidated += 1
+                    return CachedResponse(status=200, body=read.body, body_path=read.path, content_type=entry.content_type, from_cache=True)
+            content_type = response_content_type(resp)
+            if resp.status != 200:
+                if stats: stats.misses += 1
+                return CachedResponse(status=resp.status, body=None, content_type=content_type)
+            read = await reader(resp) if reader else BodyRead(body=await resp.read())
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+
+        if stats: stats.misses += 1
+        if read.complete:
+            try:
+                await asyncio.to_thread(self._store, key, read, content_type, etag, last_modified)
+            except Exception as e:
+                logger.warning(f"Failed to write {url} to the download cache: {e}")
+        return CachedResponse(status=200, body=read.body, body_path=read.path, content_type=content_type, complete=read.complete)
+
+
+_http_cache: Optional[HttpCache] = None
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    """Returns the process-wide download cache, or None when caching is disabled."""
+    global _http_cache
+    if not settings.HTTP_CACHE_ENABLED:
+        return None
+    if _http_cache is None:
+        _http_cache = HttpCache(
+            cache_dir=settings.CACHE_DIR,
+            ttl_seconds=settings.HTTP_CACHE_TTL_SECONDS,
+            max_bytes=settings.HTTP_CACHE_MAX_BYTES,
+        )
+    return _http_cache
+
+
+async def cached_get(
+    session: aiohttp.ClientSession,
+    url: str,
+    headers: Dict[str, str],
+    timeout: aiohttp.ClientTimeout,
+    stats: Optional[HttpCacheStats] = None,
+    reader: Optional[BodyReader] = None,
+    spool_threshold: int = 0,
+) -> CachedResponse:
+    """Fetches a URL through the download cache, or directly when caching is disabled."""
+    cache = get_http_cache()
+    if cache is not None:
+        return await cache.get(session, url, headers=headers, timeout=timeout, stats=stats, reader=reader, spool_threshold=spool_threshold)
+    async with session.get(url, timeout=timeout, headers=headers, ssl=False) as resp:
+        content_type = response_content_type(resp)
+        if stats: stats.misses += 1
+        if resp.status != 200:
+            return CachedResponse(status=resp.status, body=None, content_type=content_type)
+        read = await reader(resp) if reader else BodyRead(body=await resp.read())
+        return CachedResponse(status=200, body=read.body, body_path=read.path, content_type=content_type, complete=read.complete)
@@ -0,0 +1,169 @@
+# src/deep_searcher/data_pipeline/link_extractor.py
+import logging
+from dataclasses import dataclass, field
+from urllib.parse import urljoin, urlparse
+from typing import Dict
+
+import aiohttp
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from src.deep_searcher.utils.url_utils import normalize_url
+from src.deep_searcher.data_pipeline.http_cache import BodyRead
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class PageLinks:
+    title: str = ""
+    # Absolute URL -> concatenated anchor texts pointing at it.
+    links: Dict[str, str] = field(default_factory=dict)
+
+
+def _is_valid_url(url: str, base_domain: str) -> bool:
+    """Checks if a URL is valid and within the same domain."""
+    if not url or url.startswith(('#', 'mailto:', 'tel:')):
+        return False
+
+    try:
+        parsed_url = urlparse(url)
+        # It's a relative URL, so it's valid for joining
+        if not parsed_url.scheme:
+            return True
+        # It's an absolute URL, check if it's http/https and from the same domain
+        if parsed_url.scheme in ['http', 'https'] and parsed_url.netloc == base_domain:
+            return True
+        return False
+    except Exception:
+        return False
+
+def _add_link(page: PageLinks, base_url: str, base_domain: str, href: str, anchor_text: str):
+    absolute_url = normalize_url(urljoin(base_url, href.strip()))
+    if _is_valid_url(absolute_url, base_domain):
+        page.links[absolute_url] = f"{page.links.get(absolute_url, '')} {anchor_text}".strip()
+
+
+def extract_links_with_soup(body: bytes, base_url: str) -> PageLinks:
+    """Builds the full document tree with BeautifulSoup and collects the title and every same-domain link."""
+    page = PageLinks()
+    soup = BeautifulSoup(body, 'lxml')
+    base_domain = urlparse(base_url).netloc
+    if soup.title and soup.title.string:
+        page.title = soup.title.string.strip()
+    for a_tag in soup.find_all('a', href=True):
+        anchor_text = " ".join(filter(None, [a_tag.get_text(" ", strip=True), a_tag.get('title', '')]))
+        _add_link(page, base_url, base_domain, a_tag['href'], anchor_text)
+    return page
+
+
+class StreamingLinkExtractor:
+    """
+    Collects the title and same-domain links of an HTML page while its bytes arrive.
+
+    Bytes are fed to an lxml pull parser and every element is discarded as soon as it
+    has been closed, so memory stays proportional to the nesting depth rather than the
+    page size. With `max_links` > 0 the extractor reports `done` once that many
+    distinct links have been found, so the caller can stop reading the body.
+    """
+
+    def __init__(self, base_url: str, max_links: int = 0):
+        self.base_url = base_url
+        self.base_domain = urlparse(base_url).netloc
+        self.max_links = max_links
+        self.page = PageLinks()
+        self.bytes_fed = 0
+        self._parser = etree.HTMLPullParser(events=("end",))
+
+    @property
+    def done(self) -> bool:
+        return self.max_links > 0 and len(self.page.links) >= self.max_links
+
+    def feed(self, chunk: bytes):
+        if self.done or not chunk:
+            return
+        self.bytes_fed += len(chunk)
+        try:
+            self._parser.feed(chunk)
+        except etree.LxmlError as e:
+            logger.debug(f"Link extractor could not parse part of {self.base_url}: {e}")
+            return
+        self._consume_events()
+
+    def close(self) -> PageLinks:
+        if not self.done:
+            try:
+                self._parser.close()
+            except etree.LxmlError:
+                pass
+            self._consume_events()
+        return self.page
+
+    def _consume_events(self):
+        for _, element in self._parser.read_events():
+            tag = element.tag if isinstance(element.tag, str) else ""
+            if tag == "a":
+                href = element.get("href")
+                if href and not self.done:
+                    anchor_text = " ".join(filter(None, [" ".join("".join(element.itertext()).split()), element.get("title", "")]))
+                    _add_link(self.page, self.base_url, self.base_domain, href, anchor_text)
+            elif tag == "title" and not self.page.title and element.text:
+                self.page.title = element.text.strip()
+            if next(element.iterancestors("a"), None) is not None:
+                # Still needed for the enclosing anchor's text.
+                continue
+            # Drop the finished subtree and any earlier siblings; ancestors keep only empty shells.
+            element.clear(keep_tail=False)
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+    def feed_body(self, body: bytes, max_bytes: int = 0) -> PageLinks:
+        """Feeds an already downloaded body in chunks, honouring the same byte cap and link quota."""
+        limit = len(body) if max_bytes <= 0 else min(len(body), max_bytes)
+        for start in range(0, limit, STREAM_CHUNK_SIZE):
+            if self.done:
+                break
+            self.feed(body[start:min(start + STREAM_CHUNK_SIZE, limit)])
+        return self.close()
+
+
+async def read_capped_body(response: aiohttp.ClientResponse, max_bytes: int = 0) -> BodyRead:
+    """
+    Reads a response body in chunks, stopping after `max_bytes` (0 means unlimited).
+    Returns the bytes read and whether they are the complete body.
+    """
+    chunks = []
+    size = 0
+    async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+        if max_bytes > 0 and size + len(chunk) > max_bytes:
+            chunks.append(chunk[:max_bytes - size])
+            logger.debug(f"Stopped reading {response.url} after {max_bytes} bytes.")
+            return BodyRead(body=b"".join(chunks), complete=False)
+        size += len(chunk)
+        chunks.append(chunk)
+    return BodyRead(body=b"".join(chunks))
+
+
+async def stream_links_from_response(response: aiohttp.ClientResponse, extractor: StreamingLinkExtractor, max_bytes: int = 0) -> BodyRead:
+    """
+    Reads an HTML response in chunks, feeding each one to `extractor` as it arrives.
+    Stops after `max_bytes` (0 means unlimited) or once the extractor's link quota is met.
+    Returns the bytes read and whether they are the complete body.
+    """
+    chunks = []
+    size = 0
+    async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+        if max_bytes > 0 and size + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - size]
+            chunks.append(chunk)
+            extractor.feed(chunk)
+            logger.debug(f"Stopped reading {response.url} after {max_bytes} bytes.")
+            return BodyRead(body=b"".join(chunks), complete=False)
+        size += len(chunk)
+        chunks.append(chunk)
+        extractor.feed(chunk)
+        if extractor.done:
+            return BodyRead(body=b"".join(chunks), complete=False)
+    return BodyRead(body=b"".join(chunks))
@@ -0,0 +1,156 @@
+# src/deep_searcher/data_pipeline/partition_cache.py
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from unstructured.__version__ import __version__ as UNSTRUCTURED_VERSION
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# A partitioned element reduced to its text and metadata dict.
+PartitionedElement = Tuple[str, Dict[str, Any]]
+
+# Metadata keys derived from the source name. They are stripped before caching and
+# re-attached on load so the same file fetched from two mirrors shares one entry.
+_SOURCE_KEYS = ("filename", "file_directory")
+
+
+# Every partition pool worker has its own PartitionCache and only counts its own writes.
+# Each one re-reads the real disk usage after writing this fraction of the limit, so the
+# shared directory overshoots by at most that much per process before someone evicts.
+RESCAN_FRACTION = 0.05
+
+
+def _source_metadata(source_name: str) -> Dict[str, str]:
+    # Mirrors how unstructured splits `metadata_filename` into directory and file name.
+    directory, filename = os.path.split(source_name)
+    metadata = {"filename": filename or source_name}
+    if directory:
+        metadata["file_directory"] = directory
+    return metadata
+
+
+class PartitionCache:
+    """
+    Caches unstructured partitioning results on disk.
+
+    Entries are keyed by the sha256 of the content bytes, the content type, the
+    partitioning strategy and the installed unstructured version, and are stored
+    as gzip-compressed JSON. File modification times track recency; once the
+    cache grows past its size limit the least recently used entries are deleted.
+    Several processes may share the directory (see RESCAN_FRACTION).
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.root = Path(cache_dir) / "partitions"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._approx_bytes = sum(size for _, size, _ in self._entries())
+        self._unscanned_bytes = 0
+        logger.info(f"PartitionCache initialized at '{self.root}' ({self._approx_bytes} bytes in use, max={max_bytes}).")
+
+    @staticmethod
+    def make_key(content_hash: str, content_type: str, strategy: str) -> str:
+        """Builds the cache key from the sha256 hex digest of the content bytes."""
+        return hashlib.sha256(f"{content_hash}|{content_type}|{strategy}|{UNSTRUCTURED_VERSION}".encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json.gz"
+
+    def get(self, key: str, source_name: str) -> Optional[List[PartitionedElement]]:
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                payload = json.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable partition cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        source_metadata = _source_metadata(source_name)
+        return [(text, {**metadata, **source_metadata}) for text, metadata in payload]
+
+    def put(self, key: str, elements: List[PartitionedElement]):
+        payload = [
+            [text, {k: v for k, v in metadata.items() if k not in _SOURCE_KEYS}]
+            for text, metadata in elements
+        ]
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+                json.dump(payload, f, separators=(",", ":"), default=str)
+            try:
+                replaced_size = path.stat().st_size
+            except FileNotFoundError:
+                replaced_size = 0
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write partition cache entry {path.name}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            added = path.stat().st_size - replaced_size
+            self._approx_bytes += added
+            self._unscanned_bytes += max(added, 0)
+            if self.max_bytes <= 0:
+                return
+            if self._unscanned_bytes >= self.max_bytes * RESCAN_FRACTION:
+                # Pick up what other processes wrote (or evicted) since the last scan.
+                self._approx_bytes = sum(size for _, size, _ in self._entries())
+                self._unscanned_bytes = 0
+            if self._approx_bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        """Returns (modification time, size, path) for every entry on disk."""
+        entries = []
+        for path in self.root.glob("*/*.json.gz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        """Deletes least recently used entries until the cache is back under 90% of its limit."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+        self._approx_bytes = total
+        self._unscanned_bytes = 0
+        logger.info(f"PartitionCache evicted {evicted} entries; {total} bytes remain.")
+
+
+_partition_cache: Optional[PartitionCache] = None
+
+
+def get_partition_cache() -> Optional[PartitionCache]:
+    """Returns the process-wide partition cache, or None when caching is disabled."""
+    global _partition_cache
+    if not settings.PARTITION_CACHE_ENABLED:
+        return None
+    if _partition_cache is None:
+        _partition_cache = PartitionCache(cache_dir=settings.CACHE_DIR, max_bytes=settings.PARTITION_CACHE_MAX_BYTES)
+    return _partition_cache
@@ -0,0 +1,81 @@
+# src/deep_searcher/data_pipeline/partition_pool.py
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _initialize_worker(preload_models: bool):
+    """Runs once in every worker process so the first document doesn't pay the import/model load cost."""
+    # Importing url_processor pulls in all unstructured partitioners.
+    from src.deep_searcher.data_pipeline import url_processor  # noqa: F401
+
+    if not preload_models:
+        return
+    try:
+        from unstructured_inference.models.base import get_model
+        get_model()
+        logger.info(f"Partition worker {os.getpid()} preloaded the layout detection model.")
+    except Exception as e:
+        logger.warning(f"Partition worker {os.getpid()} could not preload layout models: {e}")
+
+
+def _warmup() -> int:
+    return os.getpid()
+
+
+def partition_pool_size() -> int:
+    return settings.PARTITION_POOL_WORKERS or os.cpu_count() or 1
+
+
+def get_partition_executor() -> ProcessPoolExecutor:
+    """Returns the app-wide process pool used for CPU-bound document partitioning, creating it if needed."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            max_tasks = settings.PARTITION_POOL_MAX_TASKS_PER_CHILD or None
+            _executor = ProcessPoolExecutor(
+                max_workers=partition_pool_size(),
+                # 'spawn' is required for max_tasks_per_child and avoids forking a process with live threads.
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_initialize_worker,
+                initargs=(settings.PARTITION_POOL_PRELOAD_MODELS,),
+                max_tasks_per_child=max_tasks,
+            )
+            logger.info(f"Partition process pool created with {partition_pool_size()} workers (max tasks per child: {max_tasks}).")
+        return _executor
+
+
+def start_partition_pool():
+    """Creates the pool and starts every worker so models are loaded before the first request."""
+    executor = get_partition_executor()
+    for _ in range(partition_pool_size()):
+        executor.submit(_warmup)
+
+
+def reset_partition_pool():
+    """Discards a broken pool (e.g. after a worker was OOM-killed); the next call creates a fresh one."""
+    global _executor
+    with _executor_lock:
+        broken, _executor = _executor, None
+    if broken is not None:
+        broken.shutdown(wait=False, cancel_futures=True)
+        logger.warning("Partition process pool was reset.")
+
+
+def shutdown_partition_pool():
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+        logger.info("Partition process pool shut down.")
@@ -0,0 +1,85 @@
+# src/deep_searcher/data_pipeline/pdf_pages.py
+import logging
+from dataclasses import dataclass
+from io import BytesIO
+from typing import BinaryIO, List, Optional, Tuple
+
+from pypdf import PdfReader, PdfWriter
+
+logger = logging.getLogger(__name__)
+
+# Zero-based [first, last) page indexes of a PDF.
+PageRange = Tuple[int, int]
+
+
+@dataclass
+class PagePlan:
+    """A run of consecutive pages partitioned together with one strategy."""
+    first_page: int
+    last_page: int
+    strategy: str
+
+    @property
+    def page_range(self) -> PageRange:
+        return self.first_page, self.last_page
+
+    @property
+    def page_count(self) -> int:
+        return self.last_page - self.first_page
+
+
+def open_pdf(content: bytes | str) -> BinaryIO:
+    """Opens PDF content given as bytes or as a file path."""
+    return open(content, "rb") if isinstance(content, str) else BytesIO(content)
+
+
+def text_layer_chars(content: bytes | str) -> Optional[List[int]]:
+    """
+    Counts the non-whitespace characters in each page's text layer with pypdf, which is
+    far cheaper than layout analysis. Returns None if the PDF cannot be read at all.
+    """
+    try:
+        with open_pdf(content) as file:
+            reader = PdfReader(file)
+            counts = []
+            for index, page in enumerate(reader.pages):
+                try:
+                    text = page.extract_text() or ""
+                except Exception as e:
+                    logger.debug(f"Could not extract the text layer of page {index + 1}: {e}")
+                    text = ""
+                counts.append(sum(not c.isspace() for c in text))
+            return counts
+    except Exception as e:
+        logger.warning(f"Could not read the text layer of a PDF: {e}")
+        return None
+
+
+def plan_pages(chars_per_page: List[int], min_chars: int, text_strategy: str, scanned_strategy: str, max_pages: int) -> List[PagePlan]:
+    """
+    Assigns `text_strategy` to pages with at least `min_chars` characters of text layer
+    and `scanned_strategy` to the others, then groups consecutive pages with the same
+    strategy into runs of at most `max_pages` pages.
+    """
+    plans: List[PagePlan] = []
+    max_pages = max(1, max_pages)
+    for index, chars in enumerate(chars_per_page):
+        strategy = text_strategy if chars >= min_chars else scanned_strategy
+        last = plans[-1] if plans else None
+        if last and last.strategy == strategy and last.page_count < max_pages:
+            last.last_page = index + 1
+        else:
+            plans.append(PagePlan(index, index + 1, strategy))
+    return plans
+
+
+def extract_page_range(content: bytes | str, page_range: PageRange) -> bytes:
+    """Copies a range of pages into a new in-memory PDF."""
+    with open_pdf(content) as file:
+        reader = PdfReader(file)
+        writer = PdfWriter()
+        for index in range(*page_range):
+            writer.add_page(reader.pages[index])
+        output = BytesIO()
+        writer.write(output)
+    return output.getvalue()
@@ -1,10 +1,13 @@
 # src/deep_searcher/data_pipeline/url_processor.py
 import asyncio
+import hashlib
 import logging
+import os
+import time
 from io import BytesIO
 from functools import partial
-from concurrent.futures import ThreadPoolExecutor
-from typing import Callable, Tuple, Dict, List
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Awaitable, Callable, Tuple, Dict, List, Optional
 
 import aiohttp
 from fastapi import UploadFile
@@ -17,6 +20,11 @@ from langchain_core.documents import Document
 
 from config.settings import settings
 from src.deep_searcher.utils.url_utils import normalize_url
+from src.deep_searcher.data_pipeline.fetcher import DownloadRejected, FetchContext, guess_content_type, new_fetch_context, spooled_reader
+from src.deep_searcher.data_pipeline.http_cache import new_spool_file, sha256_of_file
+from src.deep_searcher.data_pipeline.partition_cache import PartitionedElement, get_partition_cache
+from src.deep_searcher.data_pipeline.pdf_pages import PagePlan, PageRange, extract_page_range, plan_pages, text_layer_chars
+from src.deep_searcher.data_pipeline.partition_pool import get_partition_executor, partition_pool_size, reset_partition_pool
 
 logger = logging.getLogger(__name__)
 
@@ -34,9 +42,60 @@ PARTITION_DISPATCHER: Dict[str, Callable[..., List[UnstructuredElement]]] = {
     "application/vnd.openxmlformats-officedocument.wordprocessingml.document": partial(partition_docx, strategy="fast"),
 }
 
-def _partition_and_convert(content_bytes: bytes, content_type: str, source_name: str, pdf_strategy: str = "fast") -> List[Document]:
-    """Partitions content, allowing for a specific PDF strategy."""
-    if not content_bytes or not content_type:
+# Downloaded content is either in memory or, when large, the path of a spooled temporary file.
+Content = bytes | str
+ProgressCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+def _is_supported_content_type(content_type: str) -> bool:
+    return content_type in PARTITION_DISPATCHER or content_type == "application/pdf"
+
+def _content_sha256(content: Content) -> str:
+    return sha256_of_file(content) if isinstance(content, str) else hashlib.sha256(content).hexdigest()
+
+def _open_content(content: Content):
+    return open(content, "rb") if isinstance(content, str) else BytesIO(content)
+
+def _spool_bytes(content: bytes) -> str:
+    """Writes in-memory content to a temporary file and returns its path, which the caller deletes."""
+    with new_spool_file() as spool:
+        spool.write(content)
+    return spool.name
+
+def _partition_elements(content: Content, content_type: str, source_name: str, partition_func: Callable[..., List[UnstructuredElement]]) -> List[PartitionedElement]:
+    """Runs an unstructured partitioner and reduces its elements to (text, metadata) pairs."""
+    with _open_content(content) as file:
+        if content_type.startswith("image/"):
+             elements = partition_func(file=file, file_filename=source_name)
+        else:
+             elements = partition_func(file=file, metadata_filename=source_name)
+    return [(el.text or "", el.metadata.to_dict()) for el in elements]
+
+def _elements_to_documents(elements: List[PartitionedElement], content_type: str, source_name: str, content_hash: str) -> List[Document]:
+    # 'source_url' and 'content_sha256' identify the exact fetched content for incremental ingestion.
+    provenance = {"source_url": source_name, "content_sha256": content_hash, "fetched_at": time.time()}
+    docs = []
+    for text, metadata in elements:
+        if not text:
+            if content_type.startswith("image/"):
+                placeholder_text = f"An image from {source_name}"
+                metadata['source'] = metadata.get('filename', source_name)
+                docs.append(Document(page_content=placeholder_text, metadata={**metadata, **provenance}))
+            continue
+        metadata['source'] = metadata.get('filename', source_name)
+        docs.append(Document(page_content=text, metadata={**metadata, **provenance}))
+    return docs
+
+def _partition_and_convert(
+    content: Content, content_type: str, source_name: str, pdf_strategy: str = "fast",
+    page_range: Optional[PageRange] = None, content_hash: Optional[str] = None,
+) -> List[Document]:
+    """
+    Partitions content given as bytes or as a file path, allowing for a specific PDF strategy.
+    With `page_range`, only those pages of a PDF are partitioned (page numbers in the
+    metadata stay those of the whole document). Results are served from the partition
+    cache when possible.
+    """
+    if not content or not content_type:
         return []
 
     partition_func = None
@@ -44,87 +103,282 @@ def _partition_and_convert(content_bytes: bytes, content_type: str, source_name:
     if content_type == "application/pdf":
         logger.debug(f"Partitioning PDF '{source_name}' with strategy: '{pdf_strategy}'")
         partition_func = partial(partition_pdf, strategy=pdf_strategy, extract_images_in_pdf=False)
+        if page_range:
+            partition_func = partial(partition_func, starting_page_number=page_range[0] + 1)
     else:
         partition_func = PARTITION_DISPATCHER.get(content_type)
 
     if not partition_func:
         logger.warning(f"Skipping partitioning for unsupported content type: {content_type} from {source_name}")
         return []
+
+    content_hash = content_hash or _content_sha256(content)
+    cache = get_partition_cache()
+    cache_key = None
+    if cache is not None:
+        strategy = partition_func.keywords.get("strategy", "")
+        if page_range:
+            strategy = f"{strategy}|pages {page_range[0]}-{page_range[1]}"
+        cache_key = cache.make_key(content_hash, content_type, strategy)
+        cached_elements = cache.get(cache_key, source_name)
+        if cached_elements is not None:
+            logger.debug(f"Partition cache hit for {source_name} ({content_type}).")
+            return _elements_to_documents(cached_elements, content_type, source_name, content_hash)
             
     try:
-        file = BytesIO(content_bytes)
-        if content_type.startswith("image/"):
-             elements = partition_func(file=file, file_filename=source_name)
-        else:
-             elements = partition_func(file=file, metadata_filename=source_name)
-        
-        docs = []
-        for el in elements:
-            if not el.text:
-                if content_type.startswith("image/"):
-                    placeholder_text = f"An image from {source_name}"
-                    metadata = el.metadata.to_dict()
-                    metadata['source'] = metadata.get('filename', source_name)
-                    docs.append(Document(page_content=placeholder_text, metadata=metadata))
-                continue
-            metadata = el.metadata.to_dict()
-            metadata['source'] = metadata.get('filename', source_name)
-            docs.append(Document(page_content=el.text, metadata=metadata))
-        return docs
+        if page_range:
+            content = extract_page_range(content, page_range)
+        elements = _partition_elements(content, content_type, source_name, partition_func)
     except Exception as e:
-        logger.error(f"Failed to partition {source_name} ({content_type}): {e}")
+        pages = f" pages {page_range[0] + 1}-{page_range[1]}" if page_range else ""
+        logger.error(f"Failed to partition {source_name}{pages} ({content_type}): {e}")
         return []
 
-async def process_local_file_content(content_bytes: bytes, filename: str, content_type: str) -> List[Document]:
-    """Processes content from a locally uploaded file using 'auto' strategy for PDFs."""
-    logger.info(f"Processing local file: {filename} ({content_type})")
+    if cache is not None:
+        cache.put(cache_key, elements)
+    return _elements_to_documents(elements, content_type, source_name, content_hash)
+
+def _partition_to_payload(content: Content, content_type: str, source_name: str, pdf_strategy: str) -> List[PartitionedElement]:
+    """Process-pool entry point. Returns plain (text, metadata) pairs, which pickle far smaller than Documents."""
+    docs = _partition_and_convert(content, content_type, source_name, pdf_strategy=pdf_strategy)
+    return [(doc.page_content, doc.metadata) for doc in docs]
+
+def _partition_pages_to_payload(
+    content: Content, source_name: str, plan: PagePlan, whole_document: bool, content_hash: str,
+) -> Tuple[List[PartitionedElement], float]:
+    """Process-pool entry point for one run of PDF pages. Also returns the seconds spent partitioning it."""
+    started = time.perf_counter()
+    docs = _partition_and_convert(
+        content, "application/pdf", source_name, pdf_strategy=plan.strategy,
+        page_range=None if whole_document else plan.page_range, content_hash=content_hash,
+    )
+    return [(doc.page_content, doc.metadata) for doc in docs], time.perf_counter() - started
+
+async def _run_in_pool(func: Callable[[], Any], source_name: str, default: Any) -> Any:
+    """
+    Runs `func` on the shared process pool so CPU-bound work scales across cores.
+    Returns `default` if the worker died, after replacing the pool.
+    """
     loop = asyncio.get_running_loop()
-    with ThreadPoolExecutor() as executor:
-        docs = await loop.run_in_executor(
-            executor,
-            # Use 'auto' strategy for local files to enable full OCR
-            partial(_partition_and_convert, content_bytes, content_type, filename, pdf_strategy="auto")
+    try:
+        return await loop.run_in_executor(get_partition_executor(), func)
+    except BrokenProcessPool:
+        logger.error(f"Partition worker died while processing {source_name}; restarting the pool.")
+        reset_partition_pool()
+        return default
+
+async def _partition_in_pool(
+    content: Content, content_type: str, source_name: str, pdf_strategy: str, on_progress: Optional[ProgressCallback] = None,
+) -> List[Document]:
+    """
+    Partitions content on the shared process pool. Spooled content is passed as a path,
+    so large bodies are never pickled to the worker. PDFs are partitioned page by page
+    (see `_partition_pdf`); `pdf_strategy` is only used when that is disabled or the PDF
+    cannot be read.
+    """
+    if content_type == "application/pdf" and settings.PDF_PAGE_STRATEGY_ENABLED:
+        docs = await _partition_pdf(content, source_name, on_progress=on_progress)
+        if docs is not None:
+            return docs
+    payload = await _run_in_pool(partial(_partition_to_payload, content, content_type, source_name, pdf_strategy), source_name, [])
+    return [Document(page_content=text, metadata=metadata) for text, metadata in payload]
+
+async def _partition_pdf(content: Content, source_name: str, on_progress: Optional[ProgressCallback] = None) -> Optional[List[Document]]:
+    """
+    Partitions a PDF with a strategy chosen per page: pages whose text layer has at least
+    PDF_TEXT_LAYER_MIN_CHARS characters use PDF_TEXT_PAGE_STRATEGY, the others (scans)
+    PDF_SCANNED_PAGE_STRATEGY. Runs of pages sharing a strategy, of at most
+    PDF_PAGES_PER_PARTITION pages, are partitioned in parallel on the process pool and
+    merged in page order; `on_progress` is awaited after each run. Every document records
+    its page's strategy, text layer size and partitioning time per page.
+
+    Returns None when the PDF cannot be read.
+    """
+    started = time.perf_counter()
+    chars_per_page = await _run_in_pool(partial(text_layer_chars, content), source_name, None)
+    if not chars_per_page:
+        return None
+    plans = plan_pages(
+        chars_per_page, settings.PDF_TEXT_LAYER_MIN_CHARS, settings.PDF_TEXT_PAGE_STRATEGY,
+        settings.PDF_SCANNED_PAGE_STRATEGY, settings.PDF_PAGES_PER_PARTITION,
+    )
+    scanned_pages = sum(plan.page_count for plan in plans if plan.strategy == settings.PDF_SCANNED_PAGE_STRATEGY)
+    logger.info(
+        f"Classified {len(chars_per_page)} pages of {source_name} in {time.perf_counter() - started:.2f}s: "
+        f"{scanned_pages} without a usable text layer; partitioning them as {len(plans)} page runs."
+    )
+    content_hash = await asyncio.to_thread(_content_sha256, content)
+    whole_document = len(plans) == 1
+    spooled: Optional[str] = None
+    if isinstance(content, bytes) and not whole_document:
+        # Every run is a separate pool task; pass a path so the body isn't pickled once per run.
+        spooled = content = await asyncio.to_thread(_spool_bytes, content)
+
+    async def partition_plan(index: int) -> Tuple[int, List[Document], float]:
+        payload, seconds = await _run_in_pool(
+            partial(_partition_pages_to_payload, content, source_name, plans[index], whole_document, content_hash), source_name, ([], 0.0)
         )
+        return index, [Document(page_content=text, metadata=metadata) for text, metadata in payload], seconds
+
+    results: List[List[Document]] = [[] for _ in plans]
+    seconds_by_strategy: Dict[str, float] = {}
+    tasks = [asyncio.create_task(partition_plan(i)) for i in range(len(plans))]
+    try:
+        for completed, next_plan in enumerate(asyncio.as_completed(tasks), start=1):
+            index, docs, seconds = await next_plan
+            plan = plans[index]
+            seconds_by_strategy[plan.strategy] = seconds_by_strategy.get(plan.strategy, 0.0) + seconds
+            for doc in docs:
+                page_number = doc.metadata.get("page_number")
+                page_index = page_number - 1 if isinstance(page_number, int) and plan.first_page < page_number <= plan.last_page else plan.first_page
+                doc.metadata["page_strategy"] = plan.strategy
+                doc.metadata["page_text_layer_chars"] = chars_per_page[page_index]
+                doc.metadata["page_partition_seconds"] = round(seconds / plan.page_count, 3)
+            results[index] = docs
+            if on_progress:
+                await on_progress({
+                    "first_page": plan.first_page + 1,
+                    "last_page": plan.last_page,
+                    "strategy": plan.strategy,
+                    "documents": len(docs),
+                    "ranges_done": completed,
+                    "ranges_total": len(plans),
+                })
+    finally:
+        for task in tasks:
+            task.cancel()
+        if spooled:
+            _discard_spooled(spooled)
+    timings = ", ".join(f"{strategy} {seconds:.1f}s" for strategy, seconds in seconds_by_strategy.items())
+    logger.info(f"Partitioned {len(chars_per_page)} pages of {source_name} in {time.perf_counter() - started:.1f}s ({timings}).")
+    return [doc for docs in results for doc in docs]
+
+async def process_local_file_content(
+    content: Content, filename: str, content_type: str, on_progress: Optional[ProgressCallback] = None,
+) -> List[Document]:
+    """
+    Processes content from a locally uploaded file, given as bytes or a file path.
+    For PDFs, `on_progress` is awaited after each run of pages.
+    """
+    logger.info(f"Processing local file: {filename} ({content_type})")
+    # Use 'auto' strategy for local PDFs that can't be planned page by page, to enable full OCR
+    docs = await _partition_in_pool(content, content_type, filename, pdf_strategy="auto", on_progress=on_progress)
     logger.info(f"Generated {len(docs)} documents from local file {filename}.")
     return docs
 
-async def _download_content(session: aiohttp.ClientSession, url: str) -> Tuple[bytes | None, str | None]:
+async def _download_content(fetch: FetchContext, url: str) -> Tuple[Content | None, str | None]:
+    """
+    Downloads a URL for partitioning. Unsupported types are rejected from the URL extension
+    or the response headers before the body is read; large bodies are returned as the path
+    of a spooled temporary file, which the caller must delete.
+    """
+    guessed_type = guess_content_type(url)
+    if guessed_type and not _is_supported_content_type(guessed_type):
+        logger.info(f"Skipping {url}: its extension suggests unsupported content type {guessed_type}.")
+        return None, None
     try:
         timeout = aiohttp.ClientTimeout(total=settings.DOWNLOADER_TIMEOUT)
-        async with session.get(url, timeout=timeout, headers=HEADERS, ssl=False) as resp:
-            resp.raise_for_status()
-            content_bytes = await resp.read()
-            content_type = resp.headers.get("Content-Type", "").split(";")[0]
-            return content_bytes, content_type
+        response = await fetch.get(url, headers=HEADERS, timeout=timeout, reader=spooled_reader(_is_supported_content_type), spool=True)
+        if response.status != 200:
+            raise ValueError(f"HTTP status {response.status}")
+        return response.body_path or response.body, response.content_type
+    except DownloadRejected as e:
+        logger.info(f"Skipping {url}: {e}.")
+        return None, None
     except Exception as e:
         logger.warning(f"Failed to download {url}. Reason: {e}")
         return None, None
 
-async def process_urls(urls: List[str]) -> List[Document]:
-    """Processes URLs using 'fast' strategy for PDFs to prioritize speed and stability."""
-    normalized_urls = {normalize_url(u) for u in urls if u}
+def _discard_spooled(content: Content):
+    if isinstance(content, str):
+        try:
+            os.unlink(content)
+        except FileNotFoundError:
+            pass
+
+async def stream_processed_urls(urls: List[str], fetch: Optional[FetchContext] = None) -> AsyncIterator[List[Document]]:
+    """
+    Downloads and partitions URLs as bounded, overlapping stages and yields each
+    source's documents as soon as they are ready. Uses the 'fast' strategy for PDFs
+    to prioritize speed and stability. Memory is bounded by the queue sizes rather
+    than by the number of URLs. Bodies already fetched by the crawler on the same
+    FetchContext are partitioned without being downloaded again.
+    """
+    normalized_urls = [u for u in dict.fromkeys(normalize_url(u) for u in urls if u) if u]
     logger.info(f"Processing {len(normalized_urls)} unique, normalized URLs.")
-    all_processed_docs: List[Document] = []
-    semaphore = asyncio.Semaphore(settings.INGESTION_CONCURRENT_DOWNLOADS)
-    
-    async def process_single_url(url: str, session: aiohttp.ClientSession, executor: ThreadPoolExecutor, loop):
-        async with semaphore:
-            content_bytes, content_type = await _download_content(session, url)
-            if content_bytes and content_type:
-                return await loop.run_in_executor(
-                    executor,
-                    # Use 'fast' strategy for web URLs
-                    partial(_partition_and_convert, content_bytes, content_type, url, pdf_strategy="fast")
-                )
-        return []
+    if not normalized_urls:
+        return
+
+    fetch = fetch or new_fetch_context()
+    url_queue: asyncio.Queue = asyncio.Queue()
+    for url in normalized_urls:
+        url_queue.put_nowait(url)
+    download_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.INGESTION_QUEUE_SIZE)
+    output_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.INGESTION_QUEUE_SIZE)
+    download_workers = min(settings.INGESTION_CONCURRENT_DOWNLOADS, len(normalized_urls))
+    partition_workers = min(partition_pool_size(), len(normalized_urls))
+
+    async def downloader():
+        while True:
+            try:
+                url = url_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            content, content_type = await _download_content(fetch, url)
+            if content and content_type:
+                await download_queue.put((url, content, content_type))
 
-    async with aiohttp.ClientSession() as session:
-        with ThreadPoolExecutor() as executor:
-            loop = asyncio.get_running_loop()
-            tasks = [process_single_url(url, session, executor, loop) for url in normalized_urls if url]
-            results = await asyncio.gather(*tasks)
-            for doc_list in results:
-                if doc_list: all_processed_docs.extend(doc_list)
+    async def partitioner():
+        while True:
+            item = await download_queue.get()
+            if item is None:
+                return
+            url, content, content_type = item
+            try:
+                # Use 'fast' strategy for web URLs
+                docs = await _partition_in_pool(content, content_type, url, pdf_strategy="fast")
+            except Exception as e:
+                logger.error(f"Failed to partition {url}: {e}")
+                continue
+            finally:
+                _discard_spooled(content)
+            if docs:
+                await output_queue.put(docs)
+
+    async def run_stages():
+        partition_tasks = [asyncio.create_task(partitioner()) for _ in range(partition_workers)]
+        try:
+            await asyncio.gather(*(downloader() for _ in range(download_workers)))
+            for _ in partition_tasks:
+                await download_queue.put(None)
+            await asyncio.gather(*partition_tasks)
+        finally:
+            for task in partition_tasks:
+                task.cancel()
+            # Delete spooled bodies that were downloaded but never partitioned (e.g. on cancellation).
+            while not download_queue.empty():
+                item = download_queue.get_nowait()
+                if item is not None:
+                    _discard_spooled(item[1])
+            await output_queue.put(None)
 
-    logger.info(f"URL processing complete. Generated {len(all_processed_docs)} documents.")
-    return all_processed_docs
\ No newline at end of file
+    producer = asyncio.create_task(run_stages())
+    total_docs = 0
+    try:
+        while True:
+            docs = await output_queue.get()
+            if docs is None:
+                break
+            total_docs += len(docs)
+            yield docs
+        await producer
+    finally:
+        producer.cancel()
+    logger.info(f"URL processing complete. Generated {total_docs} documents.")
+
+async def process_urls(urls: List[str], fetch: Optional[FetchContext] = None) -> List[Document]:
+    """Processes URLs and returns all documents at once. Prefer `stream_processed_urls` for large inputs."""
+    all_processed_docs: List[Document] = []
+    async for docs in stream_processed_urls(urls, fetch=fetch):
+        all_processed_docs.extend(docs)
+    return all_processed_docs
@@ -12,6 +12,8 @@ class IngestionSummary(BaseModel):
     total_chunks_ingested: int
     collections_created: List[str]
     ingested_sources: List[str] = Field(description="A list of unique source URLs verified to be in the vector store.")
+    duplicate_chunks_dropped: int = Field(0, description="Chunks dropped before embedding as near-duplicates of another chunk.")
+    dedup_ratio: float = Field(0.0, description="Fraction of new chunks dropped as near-duplicates.")
 
 # --- API Input Models ---
 class QuestionSpec(BaseModel):
@@ -31,6 +33,7 @@ class ExamFromTopicRequest(BaseModel):
             {"question_type": "MCQ", "count": 5, "prompt": "Test understanding of key definitions."}
         ]
     )
+    bypass_cache: bool = Field(False, description="Ignore cached LLM responses and don't cache new ones.")
 
 
 # --- Agent I/O Models ---
@@ -50,6 +53,12 @@ class GeneratedSolution(BaseModel):
     final_answer: Optional[str] = None
     correct_option_index: Optional[int] = None
 
+class NumberedSolution(GeneratedSolution):
+    question_number: int = Field(description="The 1-based number of the question this solution answers.")
+
+class GeneratedSolutionBatch(BaseModel):
+    solutions: List[NumberedSolution]
+
 class ExamQuestion(BaseModel):
     id: str = Field(description="A unique identifier for this question.")
     question_type: str
@@ -63,6 +72,13 @@ class CompiledExam(BaseModel):
     answer_key: str
 
 # --- API Output Models ---
+class LLMCacheSummary(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    hit_rate: float = 0.0
+    saved_prompt_tokens: int = 0
+    saved_completion_tokens: int = 0
+
 class FullExam(BaseModel):
     exam_id: str
     ingestion_summary: IngestionSummary
@@ -70,4 +86,5 @@ class FullExam(BaseModel):
     exam_paper_markdown: str
     answer_key_markdown: str
     questions: List[ExamQuestion]
-    sources_used: List[str]
\ No newline at end of file
+    sources_used: List[str]
+    llm_cache: LLMCacheSummary = Field(default_factory=LLMCacheSummary, description="LLM response cache activity while generating this exam.")
\ No newline at end of file
@@ -0,0 +1,144 @@
+# src/deep_searcher/utils/context_packer.py
+import logging
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+import tiktoken
+from langchain.schema.document import Document
+
+logger = logging.getLogger(__name__)
+
+# Encoding used for models tiktoken does not know (e.g. non-OpenAI models).
+DEFAULT_ENCODING = "o200k_base"
+# Overlap between two chunks is only detected when at least this many characters are shared.
+MIN_OVERLAP_CHARS = 64
+SEPARATOR = "\n\n---\n\n"
+
+
+@lru_cache(maxsize=None)
+def get_token_counter(model: str) -> Callable[[str], int]:
+    """
+    Returns a function counting the tokens of a text for `model`. If the tiktoken
+    encoding cannot be loaded (it is downloaded on first use), tokens are estimated
+    at four characters each.
+    """
+    try:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        logger.warning(f"Could not load a tiktoken encoding for '{model}', estimating token counts instead: {e}")
+        return lambda text: math.ceil(len(text) / 4)
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def _trim_overlap(text: str, kept: str) -> Optional[str]:
+    """
+    Removes the part of `text` that overlaps `kept`. Returns None when `text` is
+    contained in `kept`, and `text` unchanged when they do not overlap.
+    """
+    if text in kept:
+        return None
+    # `text` continues `kept`, as consecutive chunks of the text splitter do.
+    head = text[:MIN_OVERLAP_CHARS]
+    start = kept.find(head) if len(head) == MIN_OVERLAP_CHARS else -1
+    while start >= 0:
+        if text.startswith(kept[start:]):
+            return text[len(kept) - start:].lstrip()
+        start = kept.find(head, start + 1)
+    # `text` precedes `kept`.
+    head = kept[:MIN_OVERLAP_CHARS]
+    start = text.find(head) if len(head) == MIN_OVERLAP_CHARS else -1
+    while start >= 0:
+        if kept.startswith(text[start:]):
+            return text[:start].rstrip()
+        start = text.find(head, start + 1)
+    return text
+
+
+@dataclass
+class PackedContext:
+    text: str
+    used_tokens: int
+    budget_tokens: int
+    included: int
+    duplicates: int
+    over_budget: int
+
+    @property
+    def available_tokens(self) -> int:
+        return max(0, self.budget_tokens - self.used_tokens)
+
+
+@dataclass
+class ContextPackingStats:
+    """Running totals over every context packed by one agent."""
+    calls: int = 0
+    used_tokens: int = 0
+    budget_tokens: int = 0
+    included: int = 0
+    duplicates: int = 0
+    over_budget: int = 0
+    max_used_tokens: int = 0
+
+    def add(self, budget_tokens: int, *parts: PackedContext):
+        """Records one prompt's context, packed from one or more parts sharing `budget_tokens`."""
+        used = sum(part.used_tokens for part in parts)
+        self.calls += 1
+        self.used_tokens += used
+        self.budget_tokens += budget_tokens
+        self.included += sum(part.included for part in parts)
+        self.duplicates += sum(part.duplicates for part in parts)
+        self.over_budget += sum(part.over_budget for part in parts)
+        self.max_used_tokens = max(self.max_used_tokens, used)
+
+    def summary(self) -> str:
+        if not self.calls:
+            return "no context packed"
+        return (
+            f"{self.calls} contexts, {self.used_tokens // self.calls} tokens on average (max {self.max_used_tokens}) "
+            f"of {self.budget_tokens // self.calls} budgeted; {self.included} chunks kept, "
+            f"{self.duplicates} overlapping and {self.over_budget} over budget dropped"
+        )
+
+
+class ContextPacker:
+    """
+    Packs retrieved documents into a prompt context of at most `budget_tokens`.
+    Documents are taken in the order given (the retrievers' relevance order); overlap
+    with documents already taken is cut out, duplicates are dropped, and documents that
+    no longer fit are skipped in favour of smaller, less relevant ones.
+    """
+
+    def __init__(self, model: str, budget_tokens: int, format_doc: Callable[[Document, str], str]):
+        self.count_tokens = get_token_counter(model)
+        self.budget_tokens = budget_tokens
+        self.format_doc = format_doc
+        self.separator_tokens = self.count_tokens(SEPARATOR)
+
+    def pack(self, docs: List[Document], budget_tokens: Optional[int] = None, empty_text: str = "No documents found.") -> PackedContext:
+        budget = self.budget_tokens if budget_tokens is None else budget_tokens
+        kept: List[Tuple[str, str]] = []  # (page content, formatted block)
+        used = duplicates = over_budget = 0
+        for doc in docs:
+            content: Optional[str] = doc.page_content.strip()
+            for kept_content, _ in kept:
+                content = _trim_overlap(content, kept_content)
+                if not content:
+                    break
+            if not content:
+                duplicates += 1
+                continue
+            block = self.format_doc(doc, content)
+            cost = self.count_tokens(block) + (self.separator_tokens if kept else 0)
+            if used + cost > budget:
+                over_budget += 1
+                continue
+            kept.append((content, block))
+            used += cost
+
+        text = SEPARATOR.join(block for _, block in kept) if kept else empty_text
+        return PackedContext(text, used, budget, len(kept), duplicates, over_budget)
@@ -0,0 +1,63 @@
+# src/deep_searcher/utils/exam_renderer.py
+import string
+from itertools import groupby
+from typing import Dict, List, Optional
+
+from src.deep_searcher.models.exam_models import ExamQuestion
+
+# Section headers for the question types the spec generator produces; others use the type name.
+SECTION_TITLES = {
+    "MCQ": "Multiple Choice Questions",
+    "Open-Ended": "Open-Ended Questions",
+    "Math Problem": "Math Problems",
+}
+
+
+def _option_label(index: int) -> str:
+    return string.ascii_uppercase[index] if index < len(string.ascii_uppercase) else str(index + 1)
+
+
+def _section_title(section_index: int, question_type: str) -> str:
+    return f"## Section {_option_label(section_index)}: {SECTION_TITLES.get(question_type, question_type)}"
+
+
+def _render_question(number: int, question: ExamQuestion) -> str:
+    lines = [f"**{number}.** {question.question_text.strip()}"]
+    if question.image_url:
+        lines += ["", f"![Figure for question {number}]({question.image_url})"]
+    if question.options:
+        # Trailing double spaces force a line break between options in markdown.
+        lines += ["", "  \n".join(f"{_option_label(i)}. {option}" for i, option in enumerate(question.options))]
+    return "\n".join(lines)
+
+
+def _render_answer(number: int, question: ExamQuestion) -> str:
+    solution = question.solution
+    lines = [f"**{number}.**"]
+    index = solution.correct_option_index
+    if question.options and index is not None and 0 <= index < len(question.options):
+        lines.append(f"**Answer:** {_option_label(index)}. {question.options[index]}")
+    elif solution.final_answer:
+        lines.append(f"**Answer:** {solution.final_answer.strip()}")
+    lines.append(f"**Explanation:** {solution.explanation.strip()}")
+    return "  \n".join(lines)
+
+
+def render_exam(exam_questions: List[ExamQuestion], title: Optional[str] = None) -> Dict[str, str]:
+    """
+    Builds the exam paper and answer key as markdown. Questions are numbered in
+    order across the whole exam, with a section header wherever the question type
+    changes. Returns a dict shaped like `CompiledExam`.
+    """
+    paper = [f"# {title}" if title else "# Exam Paper"]
+    key = [f"# {title}: Answer Key" if title else "# Answer Key"]
+    number = 0
+    for section_index, (question_type, questions) in enumerate(groupby(exam_questions, key=lambda q: q.question_type)):
+        header = _section_title(section_index, question_type)
+        paper.append(header)
+        key.append(header)
+        for question in questions:
+            number += 1
+            paper.append(_render_question(number, question))
+            key.append(_render_answer(number, question))
+    return {"exam_paper": "\n\n".join(paper) + "\n", "answer_key": "\n\n".join(key) + "\n"}
@@ -0,0 +1,186 @@
+# src/deep_searcher/utils/job_scheduler.py
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from src.deep_searcher.utils.streaming_utils import StreamCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+# Lower values are dispatched first.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 1
+
+
+class JobRejectedError(Exception):
+    """Raised when a job cannot be queued because a scheduler limit was reached."""
+
+
+@dataclass
+class Job:
+    job_id: str
+    client_id: str
+    priority: int
+    factory: Callable[[], Awaitable[Any]]
+    callback: Optional[StreamCallbackHandler]
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+
+
+class JobScheduler:
+    """
+    Runs long-lived exam jobs on a bounded pool of asyncio workers.
+
+    Jobs are queued per priority level and, within a level, per client. Clients
+    are served round-robin so a single caller submitting many jobs cannot starve
+    everyone else, while each client's own jobs still run in FIFO order.
+    Queued jobs that carry a StreamCallbackHandler receive a 'progress' event
+    whenever their queue position changes.
+    """
+
+    def __init__(self, max_workers: int, max_queue_size: int, max_jobs_per_client: int):
+        self.max_workers = max(1, max_workers)
+        self.max_queue_size = max_queue_size
+        self.max_jobs_per_client = max_jobs_per_client
+        self._queues: Dict[int, "OrderedDict[str, Deque[Job]]"] = {}
+        self._running: Dict[str, Job] = {}
+        self._condition = asyncio.Condition()
+        self._workers: List[asyncio.Task] = []
+
+    # --- Lifecycle ---
+    def start(self):
+        if self._workers:
+            return
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.max_workers)]
+        logger.info(f"JobScheduler started with {self.max_workers} workers (queue limit: {self.max_queue_size}, per-client limit: {self.max_jobs_per_client}).")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for job in self._queued_jobs_in_order():
+            if not job.future.done():
+                job.future.cancel()
+        self._queues.clear()
+        logger.info("JobScheduler stopped.")
+
+    # --- Submission ---
+    async def submit(
+        self,
+        factory: Callable[[], Awaitable[Any]],
+        client_id: str,
+        priority: int = PRIORITY_NORMAL,
+        callback: Optional[StreamCallbackHandler] = None,
+    ) -> Job:
+        """
+        Queues a job for execution and returns it. Await `job.future` for the result.
+
+        Raises:
+            JobRejectedError: If the global queue or the client's job quota is full.
+        """
+        async with self._condition:
+            queued_count = sum(len(q) for level in self._queues.values() for q in level.values())
+            if self.max_queue_size > 0 and queued_count >= self.max_queue_size:
+                raise JobRejectedError("The server is at capacity. Please try again shortly.")
+            if self.max_jobs_per_client > 0 and self._client_job_count(client_id) >= self.max_jobs_per_client:
+                raise JobRejectedError(f"You already have {self.max_jobs_per_client} job(s) queued or running.")
+
+            job = Job(
+                job_id=f"job-{uuid.uuid4().hex[:12]}",
+                client_id=client_id,
+                priority=priority,
+                factory=factory,
+                callback=callback,
+                future=asyncio.get_running_loop().create_future(),
+            )
+            level = self._queues.setdefault(priority, OrderedDict())
+            level.setdefault(client_id, deque()).append(job)
+            logger.info(f"Queued {job.job_id} for client '{client_id}' (priority {priority}). Queue depth: {queued_count + 1}.")
+            self._condition.notify()
+
+        await self._broadcast_positions()
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        queued = sum(len(q) for level in self._queues.values() for q in level.values())
+        return {"workers": self.max_workers, "running": len(self._running), "queued": queued}
+
+    # --- Internals ---
+    def _client_job_count(self, client_id: str) -> int:
+        queued = sum(len(level.get(client_id, ())) for level in self._queues.values())
+        running = sum(1 for job in self._running.values() if job.client_id == client_id)
+        return queued + running
+
+    def _queued_jobs_in_order(self) -> List[Job]:
+        """Returns queued jobs in the exact order the workers will dispatch them."""
+        ordered: List[Job] = []
+        for priority in sorted(self._queues):
+            client_queues = [list(q) for q in self._queues[priority].values()]
+            depth = max((len(q) for q in client_queues), default=0)
+            for round_index in range(depth):
+                ordered.extend(q[round_index] for q in client_queues if round_index < len(q))
+        return ordered
+
+    def _pop_next_job(self) -> Optional[Job]:
+        for priority in sorted(self._queues):
+            level = self._queues[priority]
+            if not level:
+                continue
+            client_id, client_queue = next(iter(level.items()))
+            job = client_queue.popleft()
+            # Rotate the client to the back of the line so other clients go next.
+            del level[client_id]
+            if client_queue:
+                level[client_id] = client_queue
+            if not level:
+                del self._queues[priority]
+            return job
+        return None
+
+    async def _broadcast_positions(self):
+        queued = self._queued_jobs_in_order()
+        for position, job in enumerate(queued, start=1):
+            if job.callback is None:
+                continue
+            await job.callback.send_update("progress", {
+                "step": "queued",
+                "status": f"Waiting for a free worker (position {position} of {len(queued)} in queue)...",
+                "queue_position": position,
+                "queue_length": len(queued),
+            })
+
+    async def _worker(self, worker_index: int):
+        while True:
+            async with self._condition:
+                job = self._pop_next_job()
+                while job is None:
+                    await self._condition.wait()
+                    job = self._pop_next_job()
+                job.started_at = time.monotonic()
+                self._running[job.job_id] = job
+
+            wait_seconds = job.started_at - job.enqueued_at
+            logger.info(f"Worker {worker_index} starting {job.job_id} for client '{job.client_id}' after {wait_seconds:.1f}s in queue.")
+            await self._broadcast_positions()
+            try:
+                if not job.future.cancelled():
+                    result = await job.factory()
+                    if not job.future.done():
+                        job.future.set_result(result)
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    job.future.cancel()
+                raise
+            except Exception as e:
+                logger.error(f"Job {job.job_id} failed: {e}", exc_info=True)
+                if not job.future.done():
+                    job.future.set_exception(e)
+            finally:
+                self._running.pop(job.job_id, None)
+                logger.info(f"Worker {worker_index} finished {job.job_id} in {time.monotonic() - job.started_at:.1f}s.")
@@ -0,0 +1,171 @@
+# src/deep_searcher/utils/llm_cache.py
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LLMCacheStats:
+    """Per-request counters for LLM response cache activity."""
+    hits: int = 0
+    misses: int = 0
+    saved_prompt_tokens: int = 0
+    saved_completion_tokens: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.hits}/{self.hits + self.misses} LLM calls served from cache ({self.hit_rate:.0%}), "
+            f"saving {self.saved_prompt_tokens} prompt and {self.saved_completion_tokens} completion tokens"
+        )
+
+
+@dataclass
+class _CacheScope:
+    bypass: bool = False
+    stats: LLMCacheStats = field(default_factory=LLMCacheStats)
+
+
+_current_scope: ContextVar[Optional[_CacheScope]] = ContextVar("llm_cache_scope", default=None)
+
+
+@contextmanager
+def llm_cache_scope(bypass: bool = False) -> Iterator[LLMCacheStats]:
+    """
+    Collects cache statistics for every LLM call made in this context, including
+    tasks it spawns. With `bypass`, cached responses are neither read nor written.
+    """
+    scope = _CacheScope(bypass=bypass)
+    token = _current_scope.set(scope)
+    try:
+        yield scope.stats
+    finally:
+        _current_scope.reset(token)
+
+
+def current_cache_scope() -> Optional[_CacheScope]:
+    return _current_scope.get()
+
+
+@dataclass
+class CachedLLMResponse:
+    content: str
+    prompt_tokens: int
+    completion_tokens: int
+
+
+class LLMResponseCache:
+    """
+    Exact-match cache of LLM responses in a local SQLite database, keyed by
+    (model, temperature, sha256 of the rendered prompt). Entries older than the TTL
+    are ignored and deleted; past the size limit the least recently used are evicted.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: int, max_bytes: int):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, model TEXT NOT NULL, content TEXT NOT NULL,"
+                " prompt_tokens INTEGER NOT NULL, completion_tokens INTEGER NOT NULL,"
+                " size INTEGER NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+            self._approx_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        logger.info(f"LLM response cache initialized at '{self.db_path}' ({self._approx_bytes} bytes in use, max={max_bytes}).")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(model: str, temperature: Optional[float], prompt: str) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{model}|{temperature}|{prompt_hash}".encode()).hexdigest()
+
+    def lookup(self, key: str) -> Optional[CachedLLMResponse]:
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT content, prompt_tokens, completion_tokens, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            content, prompt_tokens, completion_tokens, created_at = row
+            if self.ttl_seconds > 0 and now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        return CachedLLMResponse(content, prompt_tokens, completion_tokens)
+
+    def store(self, key: str, model: str, response: CachedLLMResponse):
+        now = time.time()
+        size = len(response.content.encode("utf-8"))
+        with self._lock, self._connect() as conn:
+            replaced = conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, content, prompt_tokens, completion_tokens, size, created_at, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model, response.content, response.prompt_tokens, response.completion_tokens, size, now, now),
+            )
+            self._approx_bytes += size - (replaced[0] if replaced else 0)
+            if self.max_bytes > 0 and self._approx_bytes > self.max_bytes:
+                self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Deletes expired entries, then least recently used ones until the cache is under 90% of its limit."""
+        if self.ttl_seconds > 0:
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+            if total <= target:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self._approx_bytes = total
+        logger.info(f"LLM response cache evicted {evicted} entries; {total} bytes remain.")
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Returns the process-wide LLM response cache, or None when caching is disabled."""
+    global _llm_cache
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    if _llm_cache is None:
+        _llm_cache = LLMResponseCache(
+            db_path=str(Path(settings.CACHE_DIR) / "llm_responses.sqlite3"),
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+            max_bytes=settings.LLM_CACHE_MAX_BYTES,
+        )
+    return _llm_cache
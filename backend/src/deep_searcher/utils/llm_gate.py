@@ -0,0 +1,264 @@
+# src/deep_searcher/utils/llm_gate.py
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+import openai
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.output_parsers import BaseOutputParser
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+
+from config.settings import settings
+from src.deep_searcher.utils.llm_cache import CachedLLMResponse, current_cache_scope, get_llm_cache
+from src.deep_searcher.vector_store.rate_limiter import RETRYABLE_ERRORS, retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+# Smoothing factors for the recent and the baseline latency averages.
+RECENT_LATENCY_ALPHA = 0.3
+BASELINE_LATENCY_ALPHA = 0.05
+LATENCY_DECREASE_FACTOR = 0.8
+RATE_LIMIT_DECREASE_FACTOR = 0.5
+
+
+class _ModelGate:
+    """
+    AIMD concurrency limit for one model. Every successful call that was not
+    unusually slow raises the limit by 1/limit (about +1 per round of calls); a 429
+    halves it and a latency spike cuts it by a fifth. Signals from calls started
+    before the last decrease are ignored so one burst of 429s only counts once.
+    Latency is tracked per call kind, since e.g. a batched solve is always far slower
+    than a single one and must not read as congestion for the short calls.
+    """
+
+    def __init__(self, model: str, max_limit: int, min_limit: int, latency_tolerance: float):
+        self.model = model
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.latency_tolerance = latency_tolerance
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_decrease = 0.0
+        # (recent, baseline) average latency per call kind.
+        self._latencies: Dict[str, Tuple[float, float]] = {}
+        self._queue_waits: Deque[float] = deque(maxlen=500)
+        self.calls = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.max_queue_wait = 0.0
+
+    def _get_condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self.in_flight = self.waiting = 0
+        return self._condition
+
+    async def acquire(self) -> float:
+        """Waits for a slot and returns the time spent queued."""
+        condition = self._get_condition()
+        queued_at = time.monotonic()
+        async with condition:
+            self.waiting += 1
+            try:
+                await condition.wait_for(lambda: self.in_flight < int(self.limit))
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+        wait = time.monotonic() - queued_at
+        self._queue_waits.append(wait)
+        self.max_queue_wait = max(self.max_queue_wait, wait)
+        return wait
+
+    async def release(self):
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            condition.notify_all()
+
+    def _decrease(self, factor: float, started_at: float, reason: str):
+        if started_at < self._last_decrease:
+            return
+        previous = self.limit
+        self.limit = max(float(self.min_limit), self.limit * factor)
+        self._last_decrease = time.monotonic()
+        if int(self.limit) != int(previous):
+            logger.warning(f"LLM concurrency for '{self.model}' lowered to {int(self.limit)} ({reason}).")
+
+    def on_success(self, started_at: float, latency: float, kind: str):
+        self.calls += 1
+        recent, baseline = self._latencies.get(kind, (latency, latency))
+        recent += RECENT_LATENCY_ALPHA * (latency - recent)
+        baseline += BASELINE_LATENCY_ALPHA * (latency - baseline)
+        self._latencies[kind] = (recent, baseline)
+        if self.latency_tolerance > 0 and recent > baseline * self.latency_tolerance:
+            self._decrease(LATENCY_DECREASE_FACTOR, started_at, f"{kind} latency {recent:.1f}s vs {baseline:.1f}s typical")
+        else:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+    def on_rate_limited(self, started_at: float):
+        self.rate_limited += 1
+        self._decrease(RATE_LIMIT_DECREASE_FACTOR, started_at, "rate limited")
+
+    def on_error(self):
+        self.errors += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        waits = sorted(self._queue_waits)
+        return {
+            "limit": int(self.limit),
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "calls": self.calls,
+            "rate_limited": self.rate_limited,
+            "errors": self.errors,
+            # Average and p95 are over the recent window; the maximum is all-time.
+            "queue_wait_avg_seconds": round(sum(waits) / len(waits), 3) if waits else 0.0,
+            "queue_wait_p95_seconds": round(waits[int(0.95 * (len(waits) - 1))], 3) if waits else 0.0,
+            "queue_wait_max_seconds": round(self.max_queue_wait, 3),
+            "latency_seconds": {
+                kind: {"recent": round(recent, 3), "baseline": round(baseline, 3)}
+                for kind, (recent, baseline) in self._latencies.items()
+            },
+        }
+
+
+class LLMGate:
+    """
+    Shared gate for LLM calls with one adaptive concurrency limit per model.
+    Each model starts at, and never exceeds, EXAM_GENERATION_MAX_CONCURRENCY (or its
+    LLM_MODEL_MAX_CONCURRENCY override). Retryable errors are retried with
+    exponential backoff (honoring Retry-After) without holding a slot while waiting.
+    """
+
+    def __init__(self, default_limit: int, model_limits: Dict[str, int], min_limit: int, latency_tolerance: float, max_retries: int,
+                 base_delay: float = 1.0, max_delay: float = 60.0):
+        self.default_limit = default_limit
+        self.model_limits = model_limits
+        self.min_limit = min_limit
+        self.latency_tolerance = latency_tolerance
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._gates: Dict[str, _ModelGate] = {}
+
+    def _gate(self, model: str) -> _ModelGate:
+        gate = self._gates.get(model)
+        if gate is None:
+            gate = _ModelGate(model, self.model_limits.get(model, self.default_limit), self.min_limit, self.latency_tolerance)
+            self._gates[model] = gate
+        return gate
+
+    async def run(self, model: str, call: Callable[[], Awaitable[Any]], kind: str = "default") -> Any:
+        gate = self._gate(model)
+        for attempt in range(self.max_retries + 1):
+            await gate.acquire()
+            started_at = time.monotonic()
+            try:
+                result = await call()
+            except RETRYABLE_ERRORS as e:
+                # Only rate limiting is treated as a congestion signal.
+                if isinstance(e, openai.RateLimitError):
+                    gate.on_rate_limited(started_at)
+                else:
+                    gate.on_error()
+                if attempt >= self.max_retries:
+                    raise
+                delay = (retry_after_seconds(e) if isinstance(e, openai.RateLimitError) else None) \
+                    or min(self.max_delay, self.base_delay * 2 ** attempt) * (0.5 + random.random())
+                logger.warning(f"LLM call to '{model}' failed with {type(e).__name__} (attempt {attempt + 1}/{self.max_retries + 1}); retrying in {delay:.1f}s.")
+            except Exception:
+                gate.on_error()
+                raise
+            else:
+                gate.on_success(started_at, time.monotonic() - started_at, kind)
+                return result
+            finally:
+                await gate.release()
+            await asyncio.sleep(delay)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {model: gate.metrics() for model, gate in self._gates.items()}
+
+
+def _prompt_text(prompt: Any) -> str:
+    return prompt.to_string() if hasattr(prompt, "to_string") else str(prompt)
+
+
+def _token_usage(message: BaseMessage) -> Tuple[int, int]:
+    usage = getattr(message, "usage_metadata", None) or {}
+    return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+
+
+def gated(llm: BaseChatModel, kind: str, cache_parser: Optional[BaseOutputParser] = None) -> Runnable:
+    """
+    Wraps a chat model so its async calls go through the shared LLM gate. The model
+    should be created with max_retries=0, so that rate limiting reaches the gate
+    instead of being retried inside the client. `kind` names the kind of call (e.g.
+    "solve" vs "solve_batch") whose latency the gate compares against its own baseline.
+
+    Sync calls are passed through ungated: the gate's slots are asyncio primitives
+    bound to the running event loop, and the app only invokes these chains async.
+
+    With `cache_parser`, async responses are also served from and stored in the LLM
+    response cache; only responses the parser accepts are stored, so a malformed
+    answer is never replayed. Use it only for deterministic (low temperature) agents.
+    """
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+    temperature = getattr(llm, "temperature", None)
+
+    async def call(prompt: Any, config: RunnableConfig) -> Any:
+        return await get_llm_gate().run(model, lambda: llm.ainvoke(prompt, config=config), kind=kind)
+
+    async def ainvoke(prompt: Any, config: RunnableConfig) -> Any:
+        cache = get_llm_cache() if cache_parser is not None else None
+        scope = current_cache_scope()
+        if cache is None or (scope and scope.bypass):
+            return await call(prompt, config)
+
+        key = cache.make_key(model, temperature, _prompt_text(prompt))
+        cached = await asyncio.to_thread(cache.lookup, key)
+        if cached is not None:
+            if scope:
+                scope.stats.hits += 1
+                scope.stats.saved_prompt_tokens += cached.prompt_tokens
+                scope.stats.saved_completion_tokens += cached.completion_tokens
+            return AIMessage(content=cached.content)
+
+        result = await call(prompt, config)
+        if scope:
+            scope.stats.misses += 1
+        try:
+            cache_parser.invoke(result)
+        except Exception:
+            return result
+        prompt_tokens, completion_tokens = _token_usage(result)
+        await asyncio.to_thread(cache.store, key, model, CachedLLMResponse(result.content, prompt_tokens, completion_tokens))
+        return result
+
+    return RunnableLambda(lambda prompt, config: llm.invoke(prompt, config=config), afunc=ainvoke, name=f"gated_{model}")
+
+
+_llm_gate: Optional[LLMGate] = None
+
+
+def get_llm_gate() -> LLMGate:
+    global _llm_gate
+    if _llm_gate is None:
+        _llm_gate = LLMGate(
+            default_limit=settings.EXAM_GENERATION_MAX_CONCURRENCY,
+            model_limits=settings.LLM_MODEL_MAX_CONCURRENCY,
+            min_limit=settings.LLM_MIN_CONCURRENCY,
+            latency_tolerance=settings.LLM_LATENCY_TOLERANCE,
+            max_retries=settings.LLM_MAX_RETRIES,
+        )
+    return _llm_gate
@@ -0,0 +1,107 @@
+# src/deep_searcher/vector_store/dedup.py
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+# Metadata keys written on stored chunks.
+FINGERPRINT_KEY = "simhash"
+DUPLICATE_SOURCES_KEY = "duplicate_sources"
+DUPLICATE_SOURCES_SEPARATOR = "|"
+
+_BIT_WEIGHTS = (1 << np.arange(FINGERPRINT_BITS, dtype=np.uint64)).astype(np.uint64)
+
+
+@dataclass
+class DedupStats:
+    """Per-ingestion counters for near-duplicate elimination."""
+    chunks_seen: int = 0
+    duplicates_dropped: int = 0
+
+    @property
+    def ratio(self) -> float:
+        return self.duplicates_dropped / self.chunks_seen if self.chunks_seen else 0.0
+
+    def summary(self) -> str:
+        return f"{self.duplicates_dropped}/{self.chunks_seen} chunks dropped as near-duplicates ({self.ratio:.1%})"
+
+
+def simhash(text: str, min_tokens: int = 0) -> Optional[int]:
+    """
+    64-bit SimHash of a text over word shingles. Similar texts get fingerprints with a
+    small Hamming distance. Returns None for texts shorter than `min_tokens` words,
+    which are too short to fingerprint reliably.
+    """
+    tokens = re.findall(r"\w+", text.lower())
+    if not tokens or len(tokens) < min_tokens:
+        return None
+    if len(tokens) < SHINGLE_SIZE:
+        shingles = [" ".join(tokens)]
+    else:
+        shingles = [" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)]
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little") for s in shingles],
+        dtype=np.uint64,
+    )
+    # Each shingle votes +1/-1 on every bit; the fingerprint keeps the bits with a positive total.
+    bits = (hashes[:, None] & _BIT_WEIGHTS) != 0
+    votes = bits.sum(axis=0) * 2 - len(shingles)
+    return int(_BIT_WEIGHTS[votes > 0].sum())
+
+
+class NearDuplicateIndex:
+    """
+    Finds near-duplicate chunks by SimHash fingerprint.
+
+    A similarity threshold t means fingerprints may differ in at most (1 - t) * 64 bits.
+    Fingerprints are split into one more band than that distance, so by the pigeonhole
+    principle any two fingerprints within it share at least one identical band; only
+    chunks sharing a band are compared bit by bit.
+    """
+
+    def __init__(self, similarity_threshold: float, min_tokens: int):
+        self.max_distance = max(0, round((1.0 - similarity_threshold) * FINGERPRINT_BITS))
+        self.min_tokens = min_tokens
+        num_bands = min(FINGERPRINT_BITS, self.max_distance + 1)
+        self._band_width = FINGERPRINT_BITS // num_bands
+        self._num_bands = num_bands
+        self._buckets: List[Dict[int, List[str]]] = [{} for _ in range(num_bands)]
+        self._fingerprints: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def _bands(self, fingerprint: int) -> List[int]:
+        mask = (1 << self._band_width) - 1
+        return [(fingerprint >> (i * self._band_width)) & mask for i in range(self._num_bands)]
+
+    def add(self, chunk_id: str, fingerprint: int):
+        if chunk_id in self._fingerprints:
+            return
+        self._fingerprints[chunk_id] = fingerprint
+        for bucket, band in zip(self._buckets, self._bands(fingerprint)):
+            bucket.setdefault(band, []).append(chunk_id)
+
+    def find(self, fingerprint: int) -> Optional[str]:
+        """Returns the ID of an indexed chunk within the distance threshold, if any."""
+        checked: Set[str] = set()
+        for bucket, band in zip(self._buckets, self._bands(fingerprint)):
+            for candidate in bucket.get(band, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                if bin(self._fingerprints[candidate] ^ fingerprint).count("1") <= self.max_distance:
+                    return candidate
+        return None
+
+
+def merge_duplicate_sources(existing: Optional[str], sources: Set[str]) -> str:
+    merged = set(filter(None, (existing or "").split(DUPLICATE_SOURCES_SEPARATOR))) | sources
+    return DUPLICATE_SOURCES_SEPARATOR.join(sorted(merged))
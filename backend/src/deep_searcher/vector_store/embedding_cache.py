@@ -0,0 +1,127 @@
+# src/deep_searcher/vector_store/embedding_cache.py
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of bound parameters per statement.
+_LOOKUP_BATCH_SIZE = 500
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an embedding model with a local SQLite cache keyed by (model name, sha256 of text).
+
+    Vectors are stored as float32 blobs and shared across collections and runs.
+    Only texts that are not cached yet are sent to the underlying model, and
+    duplicate texts within a request are embedded once.
+    """
+
+    def __init__(self, underlying: Embeddings, model_name: str, db_path: str):
+        self.underlying = underlying
+        self.model_name = model_name
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL,"
+                " PRIMARY KEY (model, text_hash))"
+            )
+        logger.info(f"Embedding cache for '{model_name}' initialized at '{self.db_path}'")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # --- Storage ---
+    def _lookup(self, hashes: Sequence[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        unique_hashes = list(dict.fromkeys(hashes))
+        with self._lock, self._connect() as conn:
+            for i in range(0, len(unique_hashes), _LOOKUP_BATCH_SIZE):
+                batch = unique_hashes[i:i + _LOOKUP_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    (self.model_name, *batch),
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def _store(self, vectors: Dict[str, List[float]]):
+        rows = [(self.model_name, text_hash, np.asarray(vector, dtype=np.float32).tobytes()) for text_hash, vector in vectors.items()]
+        with self._lock, self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)", rows)
+
+    def _split_misses(self, texts: List[str], cached: Dict[str, List[float]], hashes: List[str]) -> Dict[str, str]:
+        """Returns {hash: text} for every distinct text that still needs embedding."""
+        return {h: t for h, t in zip(hashes, texts) if h not in cached}
+
+    def _log_usage(self, total: int, misses: int):
+        if total:
+            logger.info(f"Embedding cache: {total - misses}/{total} texts served from cache, {misses} sent to '{self.model_name}'.")
+
+    # --- Embeddings interface ---
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes = [_text_hash(t) for t in texts]
+        cached = self._lookup(hashes)
+        misses = self._split_misses(texts, cached, hashes)
+        if misses:
+            new_vectors = self.underlying.embed_documents(list(misses.values()))
+            fresh = dict(zip(misses.keys(), new_vectors))
+            self._store(fresh)
+            cached.update(fresh)
+        self._log_usage(len(texts), len(misses))
+        return [cached[h] for h in hashes]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes = [_text_hash(t) for t in texts]
+        cached = await asyncio.to_thread(self._lookup, hashes)
+        misses = self._split_misses(texts, cached, hashes)
+        if misses:
+            new_vectors = await self.underlying.aembed_documents(list(misses.values()))
+            fresh = dict(zip(misses.keys(), new_vectors))
+            await asyncio.to_thread(self._store, fresh)
+            cached.update(fresh)
+        self._log_usage(len(texts), len(misses))
+        return [cached[h] for h in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        text_hash = _text_hash(text)
+        cached = self._lookup([text_hash])
+        if text_hash in cached:
+            return cached[text_hash]
+        vector = self.underlying.embed_query(text)
+        self._store({text_hash: vector})
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        text_hash = _text_hash(text)
+        cached = await asyncio.to_thread(self._lookup, [text_hash])
+        if text_hash in cached:
+            return cached[text_hash]
+        vector = await self.underlying.aembed_query(text)
+        await asyncio.to_thread(self._store, {text_hash: vector})
+        return vector
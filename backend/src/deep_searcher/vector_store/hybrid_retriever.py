@@ -0,0 +1,117 @@
+# src/deep_searcher/vector_store/hybrid_retriever.py
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain.schema.document import Document
+from langchain.schema.retriever import BaseRetriever
+from langchain_community.vectorstores.utils import maximal_marginal_relevance
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+
+from src.deep_searcher.vector_store.lexical_index import LexicalIndex
+
+logger = logging.getLogger(__name__)
+
+RETRIEVAL_MODES = ("vector", "lexical", "hybrid")
+
+Ranking = List[Tuple[str, Document]]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Retrieves chunks from one collection by vector similarity, BM25, or both.
+
+    In hybrid mode the two rankings are fused with reciprocal rank fusion, so a chunk
+    ranked highly by either method surfaces. Vector candidates can be diversified with
+    maximal marginal relevance, computed on the embeddings Chroma returns with the
+    query results. Lexical mode never embeds the query.
+    """
+
+    collection: Any
+    embeddings: Any
+    lexical_index: Optional[LexicalIndex] = None
+    k: int = 10
+    mode: str = "hybrid"
+    fetch_k: int = 30
+    use_mmr: bool = True
+    mmr_lambda: float = 0.5
+    rrf_k: int = 60
+
+    def _effective_mode(self) -> str:
+        if self.mode in ("lexical", "hybrid") and (self.lexical_index is None or len(self.lexical_index) == 0):
+            if self.mode == "lexical":
+                logger.warning(f"No lexical index for '{self.collection.name}'; falling back to vector retrieval.")
+            return "vector"
+        return self.mode
+
+    def _lexical_ranking(self, query: str, limit: int) -> Ranking:
+        return [(chunk_id, doc) for chunk_id, doc, _ in self.lexical_index.search(query, limit)]
+
+    def _query_collection(self, query_embedding: List[float]) -> Dict[str, Any]:
+        count = self.collection.count()
+        if count == 0:
+            return {}
+        include = ["documents", "metadatas"] + (["embeddings"] if self.use_mmr else [])
+        return self.collection.query(
+            query_embeddings=[query_embedding], n_results=min(max(self.fetch_k, self.k), count), include=include
+        )
+
+    def _vector_ranking(self, query_embedding: List[float], results: Dict[str, Any]) -> Ranking:
+        if not results or not results.get("ids") or not results["ids"][0]:
+            return []
+        ids = results["ids"][0]
+        docs = [
+            Document(page_content=text or "", metadata=dict(metadata or {}))
+            for text, metadata in zip(results["documents"][0], results["metadatas"][0])
+        ]
+        if self.use_mmr and results.get("embeddings") is not None:
+            order = maximal_marginal_relevance(
+                np.array(query_embedding, dtype=np.float32),
+                results["embeddings"][0],
+                lambda_mult=self.mmr_lambda,
+                k=min(self.k, len(ids)),
+            )
+        else:
+            order = range(len(ids))
+        return [(ids[i], docs[i]) for i in order]
+
+    def _fuse(self, rankings: List[Ranking]) -> List[Document]:
+        scores: Dict[str, float] = {}
+        docs: Dict[str, Document] = {}
+        for ranking in rankings:
+            for rank, (chunk_id, doc) in enumerate(ranking):
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (self.rrf_k + rank + 1)
+                docs.setdefault(chunk_id, doc)
+        best = sorted(scores, key=scores.get, reverse=True)[:self.k]
+        return [docs[chunk_id] for chunk_id in best]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        mode = self._effective_mode()
+        if mode == "lexical":
+            return self._fuse([self._lexical_ranking(query, self.k)])
+        query_embedding = self.embeddings.embed_query(query)
+        rankings = [self._vector_ranking(query_embedding, self._query_collection(query_embedding))]
+        if mode == "hybrid":
+            rankings.append(self._lexical_ranking(query, self.fetch_k))
+        return self._fuse(rankings)
+
+    @property
+    def needs_query_embedding(self) -> bool:
+        return self._effective_mode() != "lexical"
+
+    async def aretrieve(self, query: str, query_embedding: Optional[List[float]] = None) -> List[Document]:
+        """Async retrieval that can reuse a query embedding computed elsewhere (e.g. in a batch)."""
+        mode = self._effective_mode()
+        if mode == "lexical":
+            return self._fuse([await asyncio.to_thread(self._lexical_ranking, query, self.k)])
+        if query_embedding is None:
+            query_embedding = await self.embeddings.aembed_query(query)
+        results = await asyncio.to_thread(self._query_collection, query_embedding)
+        rankings = [self._vector_ranking(query_embedding, results)]
+        if mode == "hybrid":
+            rankings.append(await asyncio.to_thread(self._lexical_ranking, query, self.fetch_k))
+        return self._fuse(rankings)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        return await self.aretrieve(query)
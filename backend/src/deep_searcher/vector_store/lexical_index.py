@@ -0,0 +1,108 @@
+# src/deep_searcher/vector_store/lexical_index.py
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from rank_bm25 import BM25Okapi
+from langchain.schema.document import Document
+
+logger = logging.getLogger(__name__)
+
+
+def tokenize(text: str) -> List[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+class LexicalIndex:
+    """BM25 index over the chunks of one collection, keyed by the same chunk IDs as Chroma."""
+
+    def __init__(self, ids: List[str], texts: List[str], metadatas: List[Dict]):
+        self.ids = ids
+        self.texts = texts
+        self.metadatas = metadatas
+        # BM25Okapi cannot be built from an empty corpus.
+        self._bm25 = BM25Okapi([tokenize(t) for t in texts]) if texts else None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(self, query: str, k: int) -> List[Tuple[str, Document, float]]:
+        """Returns up to k (chunk_id, document, score) triples for chunks sharing a term with the query, best first."""
+        if self._bm25 is None or k <= 0:
+            return []
+        query_tokens = set(tokenize(query))
+        if not query_tokens:
+            return []
+        scores = self._bm25.get_scores(list(query_tokens))
+        results = []
+        # Scores alone can't tell matches apart: on small corpora a term in most chunks gets a non-positive IDF.
+        for i in np.argsort(scores)[::-1]:
+            if query_tokens.isdisjoint(self._bm25.doc_freqs[i]):
+                continue
+            results.append((self.ids[i], Document(page_content=self.texts[i], metadata=dict(self.metadatas[i] or {})), float(scores[i])))
+            if len(results) == k:
+                break
+        return results
+
+
+class LexicalIndexStore:
+    """
+    Persists one gzip-compressed JSON corpus per collection under `root` and keeps
+    loaded indexes in memory until the file on disk changes.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._loaded: Dict[str, Tuple[float, LexicalIndex]] = {}
+
+    def _path(self, collection_name: str) -> Path:
+        return self.root / f"{collection_name}.json.gz"
+
+    def save(self, collection_name: str, ids: List[str], texts: List[str], metadatas: List[Dict]) -> LexicalIndex:
+        path = self._path(collection_name)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+            json.dump({"ids": ids, "texts": texts, "metadatas": metadatas}, f, separators=(",", ":"), default=str)
+        os.replace(tmp_path, path)
+        index = LexicalIndex(ids, texts, metadatas)
+        with self._lock:
+            self._loaded[collection_name] = (path.stat().st_mtime, index)
+        return index
+
+    def exists(self, collection_name: str) -> bool:
+        return self._path(collection_name).exists()
+
+    def load(self, collection_name: str) -> Optional[LexicalIndex]:
+        path = self._path(collection_name)
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            cached = self._loaded.get(collection_name)
+            if cached and cached[0] == mtime:
+                return cached[1]
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                payload = json.load(f)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable lexical index for '{collection_name}': {e}")
+            path.unlink(missing_ok=True)
+            return None
+        index = LexicalIndex(payload["ids"], payload["texts"], payload["metadatas"])
+        with self._lock:
+            self._loaded[collection_name] = (mtime, index)
+        return index
+
+    def drop(self, collection_name: str):
+        with self._lock:
+            self._loaded.pop(collection_name, None)
+        self._path(collection_name).unlink(missing_ok=True)
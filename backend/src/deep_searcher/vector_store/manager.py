@@ -1,7 +1,13 @@
 # src/deep_searcher/vector_store/manager.py
+import asyncio
+import hashlib
 import logging
+import re
+import os
+import threading
+import time
 import uuid
-from typing import List
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
 
 import chromadb
 from langchain_chroma import Chroma
@@ -12,76 +18,638 @@ from langchain.schema.retriever import BaseRetriever
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
 from config.settings import settings
+from src.deep_searcher.utils.context_packer import get_token_counter
 from src.deep_searcher.utils.sanitizers import sanitize_for_collection_name
+from src.deep_searcher.vector_store.dedup import (
+    DUPLICATE_SOURCES_KEY, DUPLICATE_SOURCES_SEPARATOR, FINGERPRINT_KEY, DedupStats, NearDuplicateIndex, merge_duplicate_sources, simhash,
+)
+from src.deep_searcher.vector_store.embedding_cache import CachedEmbeddings
+from src.deep_searcher.vector_store.hybrid_retriever import RETRIEVAL_MODES, HybridRetriever
+from src.deep_searcher.vector_store.lexical_index import LexicalIndexStore
+from src.deep_searcher.vector_store.manifest import ManifestEntry, SourceManifest
+from src.deep_searcher.vector_store.rate_limiter import RateLimitedEmbeddings, RateLimiter
+from src.deep_searcher.vector_store.representative_sampler import sample_representative
 
 logger = logging.getLogger(__name__)
 
+# Run-scoped collections are named '<topic>_r<run_id>_<type>'.
+RUN_ID_LENGTH = 10
+RUN_COLLECTION_PATTERN = re.compile(rf"^(?P<topic>.+)_r(?P<run_id>[0-9a-f]{{{RUN_ID_LENGTH}}})_(?P<type>[a-z]+)$")
+DUMMY_COLLECTION_PREFIX = "dummy_"
+
+def _position(metadata: Optional[Dict[str, Any]], key: str) -> int:
+    value = (metadata or {}).get(key)
+    return value if isinstance(value, int) else 0
+
 class VectorStoreManager:
     """Manages all interactions with the ChromaDB vector store."""
 
     def __init__(self):
         self.embedding_function = OpenAIEmbeddings(
-            model="text-embedding-3-small",
-            openai_api_key=settings.OPENAI_API_KEY
+            model=settings.EMBEDDING_MODEL,
+            openai_api_key=settings.OPENAI_API_KEY,
+            max_retries=0,  # Retried by RateLimitedEmbeddings, which needs to see 429s and transient errors.
+        )
+        self.embedding_function = RateLimitedEmbeddings(
+            underlying=self.embedding_function,
+            limiter=RateLimiter(settings.EMBEDDING_REQUESTS_PER_MINUTE, settings.EMBEDDING_TOKENS_PER_MINUTE),
+            max_retries=settings.EMBEDDING_MAX_RETRIES,
         )
+        if settings.EMBEDDING_CACHE_ENABLED:
+            self.embedding_function = CachedEmbeddings(
+                underlying=self.embedding_function,
+                model_name=settings.EMBEDDING_MODEL,
+                db_path=os.path.join(settings.CACHE_DIR, "embeddings.sqlite3"),
+            )
         self.client = chromadb.PersistentClient(path=settings.CHROMA_PERSIST_DIR)
+        # Kept next to the Chroma data so both are always wiped together.
+        self.manifest = SourceManifest(os.path.join(settings.CHROMA_PERSIST_DIR, "source_manifest.sqlite3"))
+        self.lexical_indexes = LexicalIndexStore(os.path.join(settings.CHROMA_PERSIST_DIR, "lexical"))
+        # run_id -> [active references, last time a reference was taken or released]
+        self._runs: Dict[str, List[float]] = {}
+        self._runs_lock = threading.Lock()
         logger.info(f"VectorStoreManager initialized with ChromaDB client at '{settings.CHROMA_PERSIST_DIR}'")
 
     def get_sanitized_name(self, name: str) -> str:
         return sanitize_for_collection_name(name)
 
-    def get_collection_name(self, topic_name: str, collection_type: str) -> str:
+    def get_collection_name(self, topic_name: str, collection_type: str, run_id: Optional[str] = None) -> str:
         sanitized_topic = self.get_sanitized_name(topic_name)
-        return f"{sanitized_topic}_{collection_type}"
+        if run_id is None:
+            return f"{sanitized_topic}_{collection_type}"
+        # Trim the topic so the run suffix still fits within Chroma's 63-character limit.
+        trimmed_topic = sanitized_topic[:40].rstrip('_.') or "topic"
+        return f"{trimmed_topic}_r{run_id}_{collection_type}"
 
-    def reset_collections(self, topic_name: str):
-        sanitized_topic = self.get_sanitized_name(topic_name)
-        logger.warning(f"Resetting all collections for topic: '{topic_name}' (sanitized: '{sanitized_topic}')...")
-        all_collections = self.client.list_collections()
-        collections_to_delete = [c.name for c in all_collections if c.name.startswith(f"{sanitized_topic}_")]
-        if not collections_to_delete:
-            logger.info(f"No collections found for topic '{topic_name}' to delete.")
-            return
-        for collection_name in collections_to_delete:
+    # --- Run Lifecycle ---
+    def start_run(self, topic_name: str) -> str:
+        """Registers a new ingestion run and returns its id. The caller holds one reference until `release_run`."""
+        run_id = uuid.uuid4().hex[:RUN_ID_LENGTH]
+        with self._runs_lock:
+            self._runs[run_id] = [1, time.time()]
+        logger.info(f"Started run '{run_id}' for topic '{topic_name}'.")
+        return run_id
+
+    def acquire_run(self, run_id: str) -> bool:
+        """Takes another reference on a run. Returns False if the run is unknown or has already been swept."""
+        with self._runs_lock:
+            entry = self._runs.get(run_id)
+            if entry is None:
+                return False
+            entry[0] += 1
+            entry[1] = time.time()
+            return True
+
+    def release_run(self, run_id: str):
+        with self._runs_lock:
+            entry = self._runs.get(run_id)
+            if entry is None:
+                return
+            entry[0] = max(0, entry[0] - 1)
+            entry[1] = time.time()
+
+    def sweep_expired_runs(self, ttl_seconds: Optional[int] = None) -> int:
+        """
+        Deletes run-scoped collections that have no active references and have not
+        been used for longer than the TTL. Runs unknown to this process (e.g. left
+        over from a previous server instance) expire based on their creation time.
+        Returns the number of deleted collections.
+        """
+        ttl = settings.RUN_COLLECTION_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        now = time.time()
+        deleted = 0
+        # Runs whose entry was removed by this sweep; their remaining collections are deleted too.
+        swept_runs: Set[str] = set()
+        for collection in self.client.list_collections():
+            name = collection.name
+            match = RUN_COLLECTION_PATTERN.match(name)
+            if not match and not name.startswith(DUMMY_COLLECTION_PREFIX):
+                continue
+            run_id = match.group("run_id") if match else None
+            if run_id not in swept_runs:
+                with self._runs_lock:
+                    entry = self._runs.get(run_id) if run_id else None
+                    if entry is not None and entry[0] > 0:
+                        continue
+                    last_used = entry[1] if entry is not None else (collection.metadata or {}).get("created_at", 0)
+                    if now - last_used < ttl:
+                        continue
+                    if entry is not None:
+                        # Removed before deleting, so `acquire_run` can't hand out a run that is being deleted.
+                        del self._runs[run_id]
+                        swept_runs.add(run_id)
             try:
-                self.client.delete_collection(name=collection_name)
-                logger.info(f"  - Successfully deleted collection: {collection_name}")
+                self.client.delete_collection(name=name)
+                self.manifest.drop(name)
+                self.lexical_indexes.drop(name)
+                deleted += 1
+                logger.info(f"  - Swept expired collection: {name}")
             except Exception as e:
-                logger.error(f"  - Error deleting collection {collection_name}: {e}")
+                logger.error(f"  - Error sweeping collection {name}: {e}")
 
-    def add_documents(self, collection_name: str, documents: List[Document]) -> int:
-        if not documents:
-            logger.warning(f"No documents provided to add to collection '{collection_name}'.")
-            return 0
+        with self._runs_lock:
+            expired_runs = [rid for rid, (refs, last_used) in self._runs.items() if refs == 0 and now - last_used >= ttl]
+            for rid in expired_runs:
+                del self._runs[rid]
+        if deleted:
+            logger.info(f"Collection sweep removed {deleted} expired collection(s).")
+        return deleted
+
+    async def run_sweeper(self, interval_seconds: int):
+        """Periodically sweeps expired run collections off the request path. Runs until cancelled."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await asyncio.to_thread(self.sweep_expired_runs)
+            except Exception as e:
+                logger.error(f"Collection sweep failed: {e}", exc_info=True)
+
+    def _chunk_id(self, source: str, text: str) -> str:
+        return hashlib.sha256(f"{source}\x00{text}".encode("utf-8")).hexdigest()[:32]
+
+    def _collection_exists(self, collection_name: str) -> bool:
+        try:
+            self.client.get_collection(name=collection_name)
+            return True
+        except Exception:
+            return False
 
+    def _warm_start(self, collection_name: str) -> bool:
+        """
+        Seeds a new run-scoped collection with the chunks, vectors and manifest of the
+        most recent finished run for the same topic and collection type, so that
+        ingestion only has to process sources that changed since. Returns True if seeded.
+        """
+        match = RUN_COLLECTION_PATTERN.match(collection_name)
+        if not match:
+            return False
+        candidates = []
+        for collection in self.client.list_collections():
+            other = RUN_COLLECTION_PATTERN.match(collection.name)
+            if not other or collection.name == collection_name:
+                continue
+            if other.group("topic") != match.group("topic") or other.group("type") != match.group("type"):
+                continue
+            with self._runs_lock:
+                entry = self._runs.get(other.group("run_id"))
+                if entry is not None and entry[0] > 0:
+                    # Still being ingested or used by another job; its contents may be partial.
+                    continue
+            candidates.append(((collection.metadata or {}).get("created_at", 0), collection.name))
+        if not candidates:
+            return False
+
+        _, source_name = max(candidates)
+        try:
+            source = self.client.get_collection(name=source_name)
+            target = self.client.get_or_create_collection(
+                name=collection_name, embedding_function=None, metadata={"created_at": time.time()}
+            )
+            # Copy the manifest first: a source whose chunks fail to copy is then
+            # simply re-ingested instead of being skipped with missing chunks.
+            self.manifest.copy(source_name, collection_name)
+            copied = 0
+            total = source.count()
+            for offset in range(0, total, settings.CHROMA_BATCH_SIZE):
+                batch = source.get(include=["embeddings", "documents", "metadatas"], limit=settings.CHROMA_BATCH_SIZE, offset=offset)
+                if not batch["ids"]:
+                    break
+                target.upsert(ids=batch["ids"], embeddings=batch["embeddings"], documents=batch["documents"], metadatas=batch["metadatas"])
+                copied += len(batch["ids"])
+            logger.info(f"Warm-started '{collection_name}' with {copied} chunks from '{source_name}'.")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not warm-start '{collection_name}' from '{source_name}': {e}")
+            self.manifest.drop(collection_name)
+            return False
+
+    # --- Lexical index ---
+    def _rebuild_lexical_index(self, collection_name: str):
+        """Rebuilds the BM25 corpus of a collection from the chunks it stores, so the two never disagree."""
+        try:
+            collection = self.client.get_collection(name=collection_name)
+            ids, texts, metadatas = [], [], []
+            for offset in range(0, collection.count(), settings.CHROMA_BATCH_SIZE):
+                batch = collection.get(include=["documents", "metadatas"], limit=settings.CHROMA_BATCH_SIZE, offset=offset)
+                if not batch["ids"]:
+                    break
+                ids.extend(batch["ids"])
+                texts.extend(text or "" for text in batch["documents"])
+                metadatas.extend(metadata or {} for metadata in batch["metadatas"])
+            self.lexical_indexes.save(collection_name, ids, texts, metadatas)
+            logger.info(f"Rebuilt lexical index for '{collection_name}' with {len(ids)} chunks.")
+        except Exception as e:
+            logger.warning(f"Could not rebuild lexical index for '{collection_name}': {e}")
+
+    def _refresh_lexical_index(self, collection_name: str, changed: bool):
+        if changed or not self.lexical_indexes.exists(collection_name):
+            self._rebuild_lexical_index(collection_name)
+
+    # --- Ingestion ---
+    def _source_key(self, doc: Document) -> str:
+        return doc.metadata.get("source_url") or doc.metadata.get("source", "unknown")
+
+    def _open_collection(self, collection_name: str) -> Chroma:
+        """Opens a collection for ingestion, warm-starting new run collections from a previous run."""
+        if not self._collection_exists(collection_name) and not self._warm_start(collection_name):
+            # A brand-new collection must not inherit manifest rows from a deleted namesake.
+            self.manifest.drop(collection_name)
+        return Chroma(
+            client=self.client,
+            collection_name=collection_name,
+            embedding_function=self.embedding_function,
+            collection_metadata={"created_at": time.time()},
+        )
+
+    def _split_into_chunks(self, documents: List[Document]) -> Dict[str, Document]:
+        """Splits documents into chunks keyed by their deterministic chunk ID (duplicates collapse)."""
         text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=settings.CHUNK_SIZE,
             chunk_overlap=settings.CHUNK_OVERLAP,
+            # Records each chunk's offset within its element, used to restore document order.
+            add_start_index=True,
         )
-        chunked_docs = text_splitter.split_documents(documents)
-        
-        filtered_docs = filter_complex_metadata(chunked_docs)
-        total_docs = len(filtered_docs)
-        if total_docs == 0:
-            logger.warning(f"No processable chunks were generated for collection '{collection_name}'.")
+        chunks_by_id: Dict[str, Document] = {}
+        for chunk in filter_complex_metadata(text_splitter.split_documents(documents)):
+            source = self._source_key(chunk)
+            chunk.metadata["source_url"] = source
+            chunks_by_id.setdefault(self._chunk_id(source, chunk.page_content), chunk)
+        return chunks_by_id
+
+    def _delete_sources(self, vector_store: Chroma, sources: List[str]) -> List[str]:
+        """
+        Deletes every chunk of `sources`. Returns the other sources whose near-duplicate
+        chunks had been dropped in favour of the deleted ones; they must be re-ingested.
+        """
+        if not sources:
+            return []
+        orphaned: Set[str] = set()
+        if settings.DEDUP_ENABLED:
+            stored = vector_store._collection.get(where={"source_url": {"$in": sources}}, include=["metadatas"])
+            for metadata in stored.get("metadatas") or []:
+                duplicates = (metadata or {}).get(DUPLICATE_SOURCES_KEY)
+                if duplicates:
+                    orphaned.update(duplicates.split(DUPLICATE_SOURCES_SEPARATOR))
+        vector_store._collection.delete(where={"source_url": {"$in": sources}})
+        return sorted(orphaned - set(sources))
+
+    # --- Near-duplicate elimination ---
+    def _new_dedup_index(self) -> Optional[NearDuplicateIndex]:
+        if not settings.DEDUP_ENABLED:
+            return None
+        return NearDuplicateIndex(settings.DEDUP_SIMILARITY_THRESHOLD, settings.DEDUP_MIN_TOKENS)
+
+    def _index_stored_chunks(self, vector_store: Chroma, dedup: NearDuplicateIndex, sources: Optional[List[str]] = None):
+        """Adds the fingerprints of chunks already in the collection (optionally only those of `sources`) to the index."""
+        where = {"source_url": {"$in": sources}} if sources else None
+        offset = 0
+        while True:
+            batch = vector_store._collection.get(where=where, include=["metadatas"], limit=settings.CHROMA_BATCH_SIZE, offset=offset)
+            for chunk_id, metadata in zip(batch["ids"], batch.get("metadatas") or []):
+                fingerprint = (metadata or {}).get(FINGERPRINT_KEY)
+                if fingerprint:
+                    dedup.add(chunk_id, int(fingerprint, 16))
+            if len(batch["ids"]) < settings.CHROMA_BATCH_SIZE:
+                return
+            offset += settings.CHROMA_BATCH_SIZE
+
+    def _drop_near_duplicates(
+        self,
+        chunks_by_id: Dict[str, Document],
+        dedup: Optional[NearDuplicateIndex],
+        duplicate_of: Dict[str, Set[str]],
+        stats: Optional[DedupStats],
+    ) -> Dict[str, Document]:
+        """
+        Removes chunks that are near-duplicates of an indexed chunk, remembering in
+        `duplicate_of` which sources each kept chunk stands in for. Kept chunks are
+        fingerprinted and indexed so later chunks are compared against them too.
+        """
+        if stats:
+            stats.chunks_seen += len(chunks_by_id)
+        if dedup is None:
+            return chunks_by_id
+        kept: Dict[str, Document] = {}
+        for chunk_id, chunk in chunks_by_id.items():
+            fingerprint = simhash(chunk.page_content, dedup.min_tokens)
+            if fingerprint is None:
+                kept[chunk_id] = chunk
+                continue
+            original_id = dedup.find(fingerprint)
+            if original_id is not None:
+                duplicate_of.setdefault(original_id, set()).add(chunk.metadata["source_url"])
+                if stats:
+                    stats.duplicates_dropped += 1
+                continue
+            chunk.metadata[FINGERPRINT_KEY] = f"{fingerprint:016x}"
+            dedup.add(chunk_id, fingerprint)
+            kept[chunk_id] = chunk
+        return kept
+
+    def _record_duplicate_sources(self, vector_store: Chroma, duplicate_of: Dict[str, Set[str]]) -> List[str]:
+        """
+        Adds the sources of dropped duplicates to the 'duplicate_sources' metadata of the
+        chunks that were kept instead. Returns the sources whose duplicates point at a chunk
+        that never made it into the collection (e.g. a failed batch); they must be re-ingested.
+        """
+        orphaned: Set[str] = set()
+        chunk_ids = list(duplicate_of)
+        for i in range(0, len(chunk_ids), settings.CHROMA_BATCH_SIZE):
+            batch_ids = chunk_ids[i:i + settings.CHROMA_BATCH_SIZE]
+            stored = vector_store._collection.get(ids=batch_ids, include=["metadatas"])
+            found = dict(zip(stored["ids"], stored.get("metadatas") or []))
+            update_ids, update_metadatas = [], []
+            for chunk_id in batch_ids:
+                if chunk_id not in found:
+                    orphaned.update(duplicate_of[chunk_id])
+                    continue
+                metadata = dict(found[chunk_id] or {})
+                sources = duplicate_of[chunk_id] - {metadata.get("source_url")}
+                if not sources:
+                    continue
+                metadata[DUPLICATE_SOURCES_KEY] = merge_duplicate_sources(metadata.get(DUPLICATE_SOURCES_KEY), sources)
+                update_ids.append(chunk_id)
+                update_metadatas.append(metadata)
+            if update_ids:
+                vector_store._collection.update(ids=update_ids, metadatas=update_metadatas)
+        return sorted(orphaned)
+
+    def _record_source(self, collection_name: str, source: str, first_doc: Document, chunk_count: int):
+        self.manifest.upsert(collection_name, ManifestEntry(
+            source=source,
+            content_hash=first_doc.metadata.get("content_sha256"),
+            fetched_at=first_doc.metadata.get("fetched_at", time.time()),
+            chunk_count=chunk_count,
+        ))
+
+    def _is_unchanged(self, manifest: Dict[str, ManifestEntry], source: str, first_doc: Document) -> bool:
+        entry = manifest.get(source)
+        content_hash = first_doc.metadata.get("content_sha256")
+        return bool(entry and content_hash and entry.content_hash == content_hash)
+
+    def add_documents(
+        self,
+        collection_name: str,
+        documents: List[Document],
+        prune_missing: bool = False,
+        dedup_stats: Optional[DedupStats] = None,
+    ) -> int:
+        """
+        Incrementally ingests documents and returns how many chunks the given sources now have in the collection.
+
+        Sources are identified by their 'source_url' metadata and compared against the
+        collection's manifest: unchanged sources (same content hash) are skipped, changed
+        sources have their old chunks replaced, and with `prune_missing` any source in the
+        manifest that is absent from `documents` is deleted. Chunk IDs are derived from
+        (source, chunk text), so re-adding an existing chunk is an idempotent upsert.
+        Chunks that are near-duplicates of a chunk already in the collection (or earlier
+        in this batch) are dropped before embedding; see `_drop_near_duplicates`.
+        """
+        if not documents and not prune_missing:
+            logger.warning(f"No documents provided to add to collection '{collection_name}'.")
             return 0
 
-        logger.info(f"Adding {total_docs} document chunks to '{collection_name}' in batches of {settings.CHROMA_BATCH_SIZE}...")
-        vector_store = Chroma(
-            client=self.client,
-            collection_name=collection_name,
-            embedding_function=self.embedding_function
+        vector_store = self._open_collection(collection_name)
+        manifest = self.manifest.load(collection_name)
+
+        docs_by_source: Dict[str, List[Document]] = {}
+        for doc in documents:
+            docs_by_source.setdefault(self._source_key(doc), []).append(doc)
+
+        total_chunks = 0
+        changed_sources: Dict[str, List[Document]] = {}
+        for source, source_docs in docs_by_source.items():
+            if self._is_unchanged(manifest, source, source_docs[0]):
+                total_chunks += manifest[source].chunk_count
+                continue
+            changed_sources[source] = source_docs
+
+        stale_sources = [s for s in changed_sources if s in manifest]
+        removed_sources = [s for s in manifest if s not in docs_by_source] if prune_missing else []
+        # Sources whose duplicates pointed at deleted chunks are forgotten so the next run re-ingests them.
+        orphaned_sources = self._delete_sources(vector_store, stale_sources + removed_sources)
+        self.manifest.remove(collection_name, removed_sources + orphaned_sources)
+        logger.info(
+            f"Incremental ingestion into '{collection_name}': {len(docs_by_source) - len(changed_sources)} unchanged, "
+            f"{len(changed_sources) - len(stale_sources)} new, {len(stale_sources)} changed, {len(removed_sources)} removed source(s)."
         )
+        if not changed_sources:
+            self._refresh_lexical_index(collection_name, changed=bool(removed_sources))
+            return total_chunks
 
+        chunks_by_id = self._split_into_chunks([doc for docs in changed_sources.values() for doc in docs])
+        split_sources = {chunk.metadata["source_url"] for chunk in chunks_by_id.values()}
+        dedup = self._new_dedup_index()
+        if dedup is not None:
+            # Stale and removed sources are already gone, so everything stored will stay.
+            self._index_stored_chunks(vector_store, dedup)
+        duplicate_of: Dict[str, Set[str]] = {}
+        chunks_by_id = self._drop_near_duplicates(chunks_by_id, dedup, duplicate_of, dedup_stats)
+        chunk_ids = list(chunks_by_id.keys())
+        total_docs = len(chunk_ids)
+        if total_docs == 0 and not split_sources:
+            logger.warning(f"No processable chunks were generated for collection '{collection_name}'.")
+            self._refresh_lexical_index(collection_name, changed=True)
+            return total_chunks
+
+        logger.info(f"Adding {total_docs} document chunks to '{collection_name}' in batches of {settings.CHROMA_BATCH_SIZE}...")
+        failed_sources = set()
         for i in range(0, total_docs, settings.CHROMA_BATCH_SIZE):
-            batch = filtered_docs[i:i + settings.CHROMA_BATCH_SIZE]
+            batch_ids = chunk_ids[i:i + settings.CHROMA_BATCH_SIZE]
+            batch = [chunks_by_id[chunk_id] for chunk_id in batch_ids]
             try:
-                vector_store.add_documents(batch)
+                vector_store.add_documents(batch, ids=batch_ids)
             except Exception as e:
                 logger.error(f"Failed to ingest batch for collection {collection_name}: {e}")
-        
+                failed_sources.update(chunk.metadata["source_url"] for chunk in batch)
+
+        # Sources whose chunks were all near-duplicates are recorded with 0 chunks so they aren't re-split every run.
+        chunk_counts: Dict[str, int] = dict.fromkeys(split_sources, 0)
+        for chunk in chunks_by_id.values():
+            chunk_counts[chunk.metadata["source_url"]] += 1
+        for source, count in chunk_counts.items():
+            if source in failed_sources:
+                # Leave it out of the manifest so the next run retries it.
+                continue
+            self._record_source(collection_name, source, changed_sources[source][0], count)
+            total_chunks += count
+        if duplicate_of:
+            self.manifest.remove(collection_name, self._record_duplicate_sources(vector_store, duplicate_of))
+        self._refresh_lexical_index(collection_name, changed=True)
+
         logger.info(f"Successfully added {total_docs} chunks to collection '{collection_name}'.")
-        return total_docs
+        return total_chunks
+
+    async def aadd_document_stream(
+        self,
+        collection_name: str,
+        document_stream: AsyncIterator[List[Document]],
+        prune_missing: bool = False,
+        on_progress: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+        dedup_stats: Optional[DedupStats] = None,
+    ) -> int:
+        """
+        Streaming counterpart of `add_documents`. Each item of `document_stream` holds the
+        documents of one or more complete sources. Chunks are embedded and upserted in
+        micro-batches of EMBEDDING_BATCH_SIZE while later sources are still being
+        downloaded and partitioned, so memory stays flat regardless of corpus size.
+        Up to EMBEDDING_CONCURRENCY batches are embedded at once, subject to the
+        provider rate limiter; `on_progress` is awaited after every batch.
+        Near-duplicates are only checked against chunks that will remain in the collection:
+        those of this stream's unchanged and newly ingested sources.
+        Returns how many chunks the streamed sources now have in the collection.
+        """
+        vector_store = await asyncio.to_thread(self._open_collection, collection_name)
+        manifest = await asyncio.to_thread(self.manifest.load, collection_name)
+        batch_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.INGESTION_QUEUE_SIZE)
+        batch_size = max(1, settings.EMBEDDING_BATCH_SIZE)
+
+        seen_sources = set()
+        first_docs: Dict[str, Document] = {}
+        pending_chunks: Dict[str, int] = {}
+        chunk_totals: Dict[str, int] = {}
+        failed_sources = set()
+        dedup = self._new_dedup_index()
+        duplicate_of: Dict[str, Set[str]] = {}
+        stats = {"total_chunks": 0, "unchanged": 0, "changed": 0, "new": 0, "batches_done": 0, "chunks_embedded": 0}
+
+        async def upsert_worker():
+            while True:
+                batch = await batch_queue.get()
+                if batch is None:
+                    return
+                batch_ids = [chunk_id for chunk_id, _ in batch]
+                batch_docs = [chunk for _, chunk in batch]
+                try:
+                    embeddings = await self.embedding_function.aembed_documents([d.page_content for d in batch_docs])
+                    await asyncio.to_thread(
+                        vector_store._collection.upsert,
+                        ids=batch_ids,
+                        embeddings=embeddings,
+                        documents=[d.page_content for d in batch_docs],
+                        metadatas=[d.metadata for d in batch_docs],
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to ingest batch for collection {collection_name}: {e}")
+                    failed_sources.update(d.metadata["source_url"] for d in batch_docs)
+                else:
+                    stats["chunks_embedded"] += len(batch_docs)
+                stats["batches_done"] += 1
+                if on_progress:
+                    try:
+                        await on_progress({
+                            "collection": collection_name,
+                            "batches_done": stats["batches_done"],
+                            "chunks_embedded": stats["chunks_embedded"],
+                        })
+                    except Exception as e:
+                        logger.warning(f"Progress callback failed for collection {collection_name}: {e}")
+                for doc in batch_docs:
+                    source = doc.metadata["source_url"]
+                    pending_chunks[source] -= 1
+                    if pending_chunks[source] == 0 and source not in failed_sources:
+                        try:
+                            await asyncio.to_thread(self._record_source, collection_name, source, first_docs[source], chunk_totals[source])
+                        except Exception as e:
+                            # Left out of the manifest, so the next run re-ingests it.
+                            logger.error(f"Failed to record source {source} for collection {collection_name}: {e}")
+                            failed_sources.add(source)
+                        else:
+                            stats["total_chunks"] += chunk_totals[source]
+
+        async def put_batch(batch: Optional[List]):
+            """Queues `batch`, re-raising the error of any worker that died while waiting for room."""
+            put = asyncio.ensure_future(batch_queue.put(batch))
+            try:
+                while not put.done():
+                    running = [worker for worker in workers if not worker.done()]
+                    if not running:
+                        raise RuntimeError(f"Every ingestion worker for collection {collection_name} has stopped.")
+                    await asyncio.wait([put, *running], return_when=asyncio.FIRST_COMPLETED)
+                    for worker in workers:
+                        if worker.done():
+                            worker.result()
+            finally:
+                put.cancel()
+
+        workers = [asyncio.create_task(upsert_worker()) for _ in range(max(1, settings.EMBEDDING_CONCURRENCY))]
+        buffer: List = []
+        try:
+            async for documents in document_stream:
+                docs_by_source: Dict[str, List[Document]] = {}
+                for doc in documents:
+                    docs_by_source.setdefault(self._source_key(doc), []).append(doc)
+                for source, source_docs in docs_by_source.items():
+                    seen_sources.add(source)
+                    if self._is_unchanged(manifest, source, source_docs[0]):
+                        stats["unchanged"] += 1
+                        stats["total_chunks"] += manifest[source].chunk_count
+                        if dedup is not None:
+                            await asyncio.to_thread(self._index_stored_chunks, vector_store, dedup, [source])
+                        continue
+                    if source in manifest:
+                        stats["changed"] += 1
+                        orphaned_sources = await asyncio.to_thread(self._delete_sources, vector_store, [source])
+                        if orphaned_sources:
+                            # Their duplicates pointed at the deleted chunks: treat them as new from now on.
+                            await asyncio.to_thread(self.manifest.remove, collection_name, orphaned_sources)
+                            for orphan in orphaned_sources:
+                                manifest.pop(orphan, None)
+                    else:
+                        stats["new"] += 1
+                    chunks_by_id = self._split_into_chunks(source_docs)
+                    if not chunks_by_id:
+                        continue
+                    chunks_by_id = await asyncio.to_thread(self._drop_near_duplicates, chunks_by_id, dedup, duplicate_of, dedup_stats)
+                    if not chunks_by_id:
+                        # Every chunk was a near-duplicate; record it so it isn't re-split every run.
+                        await asyncio.to_thread(self._record_source, collection_name, source, source_docs[0], 0)
+                        continue
+                    first_docs[source] = source_docs[0]
+                    pending_chunks[source] = chunk_totals[source] = len(chunks_by_id)
+                    buffer.extend(chunks_by_id.items())
+                    while len(buffer) >= batch_size:
+                        await put_batch(buffer[:batch_size])
+                        buffer = buffer[batch_size:]
+            if buffer:
+                await put_batch(buffer)
+            for _ in workers:
+                await put_batch(None)
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+        if duplicate_of:
+            orphaned_sources = await asyncio.to_thread(self._record_duplicate_sources, vector_store, duplicate_of)
+            await asyncio.to_thread(self.manifest.remove, collection_name, orphaned_sources)
+        removed_sources = [s for s in manifest if s not in seen_sources] if prune_missing else []
+        if removed_sources:
+            orphaned_sources = await asyncio.to_thread(self._delete_sources, vector_store, removed_sources)
+            await asyncio.to_thread(self.manifest.remove, collection_name, removed_sources + orphaned_sources)
+        changed = bool(stats["changed"] or stats["new"] or removed_sources)
+        await asyncio.to_thread(self._refresh_lexical_index, collection_name, changed)
+        logger.info(
+            f"Streaming ingestion into '{collection_name}' complete: {stats['unchanged']} unchanged, {stats['new']} new, "
+            f"{stats['changed']} changed, {len(removed_sources)} removed source(s); {stats['total_chunks']} chunks available."
+        )
+        return stats["total_chunks"]
+
+    async def aadd_documents(
+        self,
+        collection_name: str,
+        documents: List[Document],
+        prune_missing: bool = False,
+        on_progress: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+        dedup_stats: Optional[DedupStats] = None,
+    ) -> int:
+        """Non-blocking `add_documents` for callers that already hold every document in memory."""
+        async def single_batch():
+            if documents:
+                yield documents
+        return await self.aadd_document_stream(
+            collection_name, single_batch(), prune_missing=prune_missing, on_progress=on_progress, dedup_stats=dedup_stats
+        )
 
     def get_collection_sources(self, collection_name: str) -> List[str]:
         try:
@@ -94,24 +662,70 @@ class VectorStoreManager:
         except Exception:
             return []
 
-    def create_retriever(self, topic_name: str, collection_type: str = "text") -> BaseRetriever:
-        collection_name = self.get_collection_name(topic_name, collection_type)
+    def sample_representative_chunks(self, collection_name: str, budget_tokens: int) -> List[Document]:
+        """
+        Returns chunks covering the whole collection within `budget_tokens`, chosen by
+        clustering the embeddings stored at ingestion. Chroma's storage order depends on
+        which embedding batch finished first, so rows are sorted by (page_number,
+        start_index, id) first; this keeps the sample, and the spec prompt built from it,
+        deterministic and in document order.
+        """
+        collection = self.client.get_collection(name=collection_name)
+        rows = []
+        for offset in range(0, collection.count(), settings.CHROMA_BATCH_SIZE):
+            batch = collection.get(include=["documents", "metadatas", "embeddings"], limit=settings.CHROMA_BATCH_SIZE, offset=offset)
+            if not len(batch["ids"]):
+                break
+            rows.extend(zip(batch["ids"], batch["documents"], batch["metadatas"], batch["embeddings"]))
+        if not rows:
+            return []
+        rows.sort(key=lambda row: (_position(row[2], "page_number"), _position(row[2], "start_index"), row[0]))
+        texts = [text or "" for _, text, _, _ in rows]
+        metadatas = [metadata or {} for _, _, metadata, _ in rows]
+        embeddings = [embedding for _, _, _, embedding in rows]
+        chosen = sample_representative(embeddings, texts, budget_tokens, get_token_counter(settings.DEFAULT_LLM_MODEL))
+        return [Document(page_content=texts[i], metadata=metadatas[i]) for i in chosen]
+
+    def create_retriever(
+        self,
+        topic_name: str,
+        collection_type: str = "text",
+        run_id: Optional[str] = None,
+        mode: Optional[str] = None,
+    ) -> BaseRetriever:
+        """
+        Returns a `HybridRetriever` over the collection. `mode` overrides RETRIEVAL_MODE;
+        "lexical" answers from the BM25 index alone, without embedding the query.
+        """
+        mode = mode or settings.RETRIEVAL_MODE
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{mode}'. Expected one of {RETRIEVAL_MODES}.")
+        collection_name = self.get_collection_name(topic_name, collection_type, run_id=run_id)
         k = settings.IMAGE_RETRIEVER_TOP_K if collection_type == "images" else settings.RETRIEVER_TOP_K
-        logger.info(f"Creating retriever with k={k} for collection: {collection_name}")
-        
+        logger.info(f"Creating {mode} retriever with k={k} for collection: {collection_name}")
+
+        lexical_index = None
         try:
-            self.client.get_collection(name=collection_name)
-            store = Chroma(
-                client=self.client,
-                collection_name=collection_name,
-                embedding_function=self.embedding_function,
-            )
-            return store.as_retriever(search_kwargs={"k": k})
+            collection = self.client.get_collection(name=collection_name)
+            if mode != "vector":
+                # Collections ingested before lexical indexing existed get their index built on first use.
+                self._refresh_lexical_index(collection_name, changed=False)
+                lexical_index = self.lexical_indexes.load(collection_name)
         except Exception:
             logger.warning(f"Collection '{collection_name}' not found. Retrieval for this type will yield no results.")
-            dummy_store = Chroma(
-                client=self.client,
-                collection_name=f"dummy_{uuid.uuid4().hex}",
-                embedding_function=self.embedding_function,
+            collection = self.client.get_or_create_collection(
+                name=f"{DUMMY_COLLECTION_PREFIX}{uuid.uuid4().hex}",
+                embedding_function=None,
+                metadata={"created_at": time.time()},
             )
-            return dummy_store.as_retriever(search_kwargs={"k": k})
\ No newline at end of file
+        return HybridRetriever(
+            collection=collection,
+            embeddings=self.embedding_function,
+            lexical_index=lexical_index,
+            k=k,
+            mode=mode,
+            fetch_k=settings.RETRIEVAL_FETCH_K,
+            use_mmr=settings.RETRIEVAL_USE_MMR,
+            mmr_lambda=settings.RETRIEVAL_MMR_LAMBDA,
+            rrf_k=settings.RETRIEVAL_RRF_K,
+        )
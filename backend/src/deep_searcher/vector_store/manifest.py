@@ -0,0 +1,83 @@
+# src/deep_searcher/vector_store/manifest.py
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ManifestEntry:
+    source: str
+    content_hash: Optional[str]
+    fetched_at: float
+    chunk_count: int
+
+
+class SourceManifest:
+    """
+    Records, per collection, which sources have been ingested, the hash of the
+    content they were ingested from, when it was fetched and how many chunks it
+    produced. Used to skip unchanged sources on re-ingestion.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS source_manifest ("
+                " collection TEXT NOT NULL, source TEXT NOT NULL, content_hash TEXT,"
+                " fetched_at REAL NOT NULL, chunk_count INTEGER NOT NULL,"
+                " PRIMARY KEY (collection, source))"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self, collection: str) -> Dict[str, ManifestEntry]:
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT source, content_hash, fetched_at, chunk_count FROM source_manifest WHERE collection = ?", (collection,)
+            ).fetchall()
+        return {row[0]: ManifestEntry(*row) for row in rows}
+
+    def upsert(self, collection: str, entry: ManifestEntry):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO source_manifest (collection, source, content_hash, fetched_at, chunk_count)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (collection, entry.source, entry.content_hash, entry.fetched_at or time.time(), entry.chunk_count),
+            )
+
+    def remove(self, collection: str, sources: Iterable[str]):
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "DELETE FROM source_manifest WHERE collection = ? AND source = ?",
+                [(collection, source) for source in sources],
+            )
+
+    def copy(self, from_collection: str, to_collection: str):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO source_manifest (collection, source, content_hash, fetched_at, chunk_count)"
+                " SELECT ?, source, content_hash, fetched_at, chunk_count FROM source_manifest WHERE collection = ?",
+                (to_collection, from_collection),
+            )
+
+    def drop(self, collection: str):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM source_manifest WHERE collection = ?", (collection,))
@@ -0,0 +1,148 @@
+# src/deep_searcher/vector_store/rate_limiter.py
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import List, Optional
+
+import openai
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# Errors worth retrying: rate limiting, connection errors and timeouts, and 5xx responses.
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+
+def estimate_tokens(texts: List[str]) -> int:
+    # Roughly four characters per token for English text; close enough for rate limiting.
+    return sum(len(t) for t in texts) // 4 + len(texts)
+
+
+class _TokenBucket:
+    def __init__(self, capacity_per_minute: float):
+        self.capacity = float(capacity_per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def seconds_until(self, amount: float) -> float:
+        self._refill()
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self.tokens -= amount
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for a provider's requests-per-minute and tokens-per-minute quotas.
+    Callers wait in FIFO order until both buckets have room. A limit of 0 disables that bucket.
+    Async callers and sync callers (e.g. Chroma embedding from a worker thread) share the buckets.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self._buckets = []
+        if requests_per_minute > 0:
+            self._request_bucket = _TokenBucket(requests_per_minute)
+            self._buckets.append((self._request_bucket, lambda tokens: 1))
+        if tokens_per_minute > 0:
+            self._token_bucket = _TokenBucket(tokens_per_minute)
+            # A single request larger than the whole per-minute budget must still be allowed through eventually.
+            self._buckets.append((self._token_bucket, lambda tokens: min(tokens, self._token_bucket.capacity)))
+        self._lock = asyncio.Lock()
+        self._sync_lock = threading.Lock()
+        self._bucket_lock = threading.Lock()
+
+    def _try_consume(self, tokens: int) -> float:
+        """Consumes the cost of a request if both buckets have room; otherwise returns the seconds to wait."""
+        with self._bucket_lock:
+            wait = max((bucket.seconds_until(cost(tokens)) for bucket, cost in self._buckets), default=0.0)
+            if wait <= 0:
+                for bucket, cost in self._buckets:
+                    bucket.consume(cost(tokens))
+            return wait
+
+    async def acquire(self, tokens: int):
+        async with self._lock:
+            while (wait := self._try_consume(tokens)) > 0:
+                await asyncio.sleep(wait)
+
+    def acquire_sync(self, tokens: int):
+        """Blocking variant of `acquire` for calls made outside the event loop."""
+        with self._sync_lock:
+            while (wait := self._try_consume(tokens)) > 0:
+                time.sleep(wait)
+
+
+def retry_after_seconds(error: openai.RateLimitError) -> Optional[float]:
+    try:
+        value = error.response.headers.get("retry-after")
+        return float(value) if value else None
+    except (AttributeError, ValueError):
+        return None
+
+
+class RateLimitedEmbeddings(Embeddings):
+    """
+    Wraps an embedding model so calls respect a shared RateLimiter and are retried
+    with exponential backoff (honoring Retry-After on 429s) on transient errors.
+    The underlying client should be created with max_retries=0, so that these errors
+    reach this wrapper instead of being retried inside the client.
+    """
+
+    def __init__(self, underlying: Embeddings, limiter: RateLimiter, max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.underlying = underlying
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        retry_after = retry_after_seconds(error) if isinstance(error, openai.RateLimitError) else None
+        delay = retry_after or min(self.max_delay, self.base_delay * 2 ** attempt) * (0.5 + random.random())
+        reason = "rate limited" if isinstance(error, openai.RateLimitError) else f"failed with {type(error).__name__}"
+        logger.warning(f"Embedding request {reason} (attempt {attempt + 1}/{self.max_retries + 1}); retrying in {delay:.1f}s.")
+        return delay
+
+    async def _call_with_retry(self, texts: List[str], call):
+        tokens = estimate_tokens(texts)
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire(tokens)
+            try:
+                return await call()
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(self._retry_delay(e, attempt))
+
+    def _call_with_retry_sync(self, texts: List[str], call):
+        tokens = estimate_tokens(texts)
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire_sync(tokens)
+            try:
+                return call()
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._retry_delay(e, attempt))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._call_with_retry_sync(texts, lambda: self.underlying.embed_documents(texts))
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._call_with_retry_sync([text], lambda: self.underlying.embed_query(text))
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self._call_with_retry(texts, lambda: self.underlying.aembed_documents(texts))
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self._call_with_retry([text], lambda: self.underlying.aembed_query(text))
@@ -0,0 +1,94 @@
+# src/deep_searcher/vector_store/representative_sampler.py
+import logging
+from typing import Callable, List, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+KMEANS_MAX_ITERATIONS = 25
+# Fixed seed, so the same document always yields the same sample (and the same cached spec prompt).
+KMEANS_SEED = 0
+
+
+def kmeans(vectors: np.ndarray, k: int, max_iterations: int = KMEANS_MAX_ITERATIONS, seed: int = KMEANS_SEED) -> np.ndarray:
+    """
+    Clusters the rows of `vectors` into `k` groups with k-means++ seeding and Lloyd
+    iterations, fully vectorized. Returns the centroids, shape (k, dim).
+    """
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    squared_norms = np.einsum("ij,ij->i", vectors, vectors)
+
+    def squared_distances(centroids: np.ndarray) -> np.ndarray:
+        distances = squared_norms[:, None] - 2.0 * vectors @ centroids.T + np.einsum("ij,ij->i", centroids, centroids)[None, :]
+        return np.maximum(distances, 0.0)
+
+    centroids = np.empty((k, vectors.shape[1]), dtype=vectors.dtype)
+    centroids[0] = vectors[rng.integers(n)]
+    closest = squared_distances(centroids[:1])[:, 0]
+    for i in range(1, k):
+        total = closest.sum()
+        index = rng.choice(n, p=closest / total) if total > 0 else rng.integers(n)
+        centroids[i] = vectors[index]
+        closest = np.minimum(closest, squared_distances(centroids[i:i + 1])[:, 0])
+
+    labels = np.full(n, -1)
+    for _ in range(max_iterations):
+        distances = squared_distances(centroids)
+        new_labels = distances.argmin(axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        counts = np.bincount(labels, minlength=k)
+        membership = np.zeros((k, n), dtype=vectors.dtype)
+        membership[labels, np.arange(n)] = 1.0
+        sums = membership @ vectors
+        for empty in np.flatnonzero(counts == 0):
+            # Re-seed an empty cluster with the point furthest from its centroid.
+            farthest = distances[np.arange(n), labels].argmax()
+            sums[empty], counts[empty] = vectors[farthest], 1
+            distances[farthest] = 0.0
+        centroids = sums / counts[:, None]
+    return centroids
+
+
+def sample_representative(
+    embeddings: Sequence[Sequence[float]],
+    texts: Sequence[str],
+    budget_tokens: int,
+    count_tokens: Callable[[str], int],
+) -> List[int]:
+    """
+    Picks chunks that together represent the whole document within `budget_tokens`.
+    If every chunk fits they are all returned. Otherwise the embeddings are clustered
+    into about as many groups as chunks fit in the budget, and the chunk nearest each
+    centroid is taken, largest clusters first, until the budget is used up.
+    Returns the chosen indexes in their original (document) order.
+    """
+    token_counts = np.array([count_tokens(text) for text in texts])
+    if token_counts.sum() <= budget_tokens:
+        return list(range(len(texts)))
+
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    k = int(min(len(texts), max(1, budget_tokens // max(1, int(token_counts.mean())))))
+    centroids = kmeans(vectors, k)
+    distances = 1.0 - vectors @ centroids.T
+    labels = distances.argmin(axis=1)
+    cluster_sizes = np.bincount(labels, minlength=k)
+
+    chosen: List[int] = []
+    used = 0
+    for cluster in np.argsort(-cluster_sizes, kind="stable"):
+        members = np.flatnonzero(labels == cluster)
+        if not len(members):
+            continue
+        # The member nearest the centroid that still fits.
+        for index in members[np.argsort(distances[members, cluster], kind="stable")]:
+            if used + token_counts[index] <= budget_tokens:
+                chosen.append(int(index))
+                used += int(token_counts[index])
+                break
+    logger.info(f"Sampled {len(chosen)} of {len(texts)} chunks from {k} clusters ({used}/{budget_tokens} tokens).")
+    return sorted(chosen)
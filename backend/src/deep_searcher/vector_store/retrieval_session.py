@@ -0,0 +1,83 @@
+# src/deep_searcher/vector_store/retrieval_session.py
+import asyncio
+import logging
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from langchain.schema.document import Document
+from langchain.schema.retriever import BaseRetriever
+from langchain_core.embeddings import Embeddings
+
+from src.deep_searcher.vector_store.hybrid_retriever import HybridRetriever
+
+logger = logging.getLogger(__name__)
+
+
+def _memo_key(retriever: BaseRetriever, query: str) -> Tuple[Hashable, str, Optional[int]]:
+    if isinstance(retriever, HybridRetriever):
+        return retriever.collection.name, query, retriever.k
+    return id(retriever), query, getattr(retriever, "search_kwargs", {}).get("k")
+
+
+class RetrievalSession:
+    """
+    Per-run memo of retrieval results keyed by (collection, query, k).
+
+    Concurrent requests for the same key share one lookup, so every question spec of an
+    exam costs one retrieval per distinct query rather than one per spec. `prefetch`
+    embeds all distinct queries in a single batch before they are looked up.
+    """
+
+    def __init__(self, embeddings: Optional[Embeddings] = None):
+        self.embeddings = embeddings
+        self._results: Dict[Tuple[Hashable, str, Optional[int]], asyncio.Task] = {}
+        self._query_embeddings: Dict[str, List[float]] = {}
+        self.lookups = 0
+        self.hits = 0
+
+    async def _embed_queries(self, queries: List[str]):
+        missing = [q for q in dict.fromkeys(queries) if q not in self._query_embeddings]
+        if not missing or self.embeddings is None:
+            return
+        try:
+            vectors = await self.embeddings.aembed_documents(missing)
+        except Exception as e:
+            logger.warning(f"Batch query embedding failed, falling back to per-query embedding: {e}")
+            return
+        self._query_embeddings.update(zip(missing, vectors))
+
+    async def _retrieve(self, retriever: BaseRetriever, query: str) -> List[Document]:
+        self.lookups += 1
+        if isinstance(retriever, HybridRetriever):
+            return await retriever.aretrieve(query, self._query_embeddings.get(query))
+        return await retriever.ainvoke(query)
+
+    async def aretrieve(self, retriever: BaseRetriever, query: str) -> List[Document]:
+        key = _memo_key(retriever, query)
+        task = self._results.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._retrieve(retriever, query))
+            self._results[key] = task
+        else:
+            self.hits += 1
+        try:
+            # Shielded so a cancelled caller doesn't cancel a lookup other callers are awaiting.
+            return list(await asyncio.shield(task))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Don't memoize failures; the next caller retries.
+            if self._results.get(key) is task:
+                del self._results[key]
+            raise
+
+    async def prefetch(self, retrievers: Iterable[BaseRetriever], queries: Iterable[str]):
+        """Embeds the distinct queries in one batch, then runs every (retriever, query) lookup concurrently."""
+        retrievers = list(retrievers)
+        queries = list(dict.fromkeys(queries))
+        if any(isinstance(r, HybridRetriever) and r.needs_query_embedding for r in retrievers):
+            await self._embed_queries(queries)
+        # Failures surface again (and are retried) when the lookup is requested for real.
+        await asyncio.gather(*(self.aretrieve(r, q) for r in retrievers for q in queries), return_exceptions=True)
+
+    def summary(self) -> str:
+        return f"{self.lookups} retrieval lookup(s), {self.hits} served from memo"
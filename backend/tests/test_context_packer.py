@@ -0,0 +1,73 @@
+# tests/test_context_packer.py
+import pytest
+from langchain.schema.document import Document
+
+from src.deep_searcher.utils import context_packer
+from src.deep_searcher.utils.context_packer import MIN_OVERLAP_CHARS, ContextPacker, ContextPackingStats, _trim_overlap
+
+# Long enough that any two consecutive windows overlap by more than MIN_OVERLAP_CHARS.
+TEXT = " ".join(f"sentence{i} about photosynthesis." for i in range(40))
+
+
+def _words(text: str) -> int:
+    return len(text.split())
+
+
+@pytest.fixture
+def packer(monkeypatch) -> ContextPacker:
+    # Count words, so budgets don't depend on downloading a tiktoken encoding.
+    monkeypatch.setattr(context_packer, "get_token_counter", lambda model: _words)
+    return ContextPacker("test-model", budget_tokens=100, format_doc=lambda doc, content: content)
+
+
+def test_contained_text_is_a_duplicate():
+    assert _trim_overlap(TEXT[100:300], TEXT) is None
+
+
+def test_continuation_keeps_only_the_new_part():
+    kept, text = TEXT[:400], TEXT[300:600]
+    assert _trim_overlap(text, kept) == TEXT[400:600].lstrip()
+
+
+def test_preceding_text_keeps_only_the_new_part():
+    kept, text = TEXT[300:600], TEXT[:400]
+    assert _trim_overlap(text, kept) == TEXT[:300].rstrip()
+
+
+def test_short_or_unrelated_overlap_is_left_alone():
+    assert _trim_overlap("completely different text", TEXT) == "completely different text"
+    # Sharing fewer than MIN_OVERLAP_CHARS characters does not count as overlap.
+    kept, text = TEXT[:200], TEXT[200 - (MIN_OVERLAP_CHARS - 1):400]
+    assert _trim_overlap(text, kept) == text
+
+
+def test_pack_drops_duplicates_and_trims_overlap(packer):
+    docs = [Document(page_content=TEXT[:200]), Document(page_content=TEXT[50:150]), Document(page_content=TEXT[100:300])]
+    packed = packer.pack(docs, budget_tokens=1000)
+    assert (packed.included, packed.duplicates, packed.over_budget) == (2, 1, 0)
+    assert packed.text == TEXT[:200] + context_packer.SEPARATOR + TEXT[200:300].lstrip()
+
+
+def test_pack_skips_documents_over_budget_for_smaller_ones(packer):
+    big, small = "word " * 80, "tiny text"
+    docs = [Document(page_content="first " * 50), Document(page_content=big), Document(page_content=small)]
+    packed = packer.pack(docs)
+    assert (packed.included, packed.over_budget) == (2, 1)
+    assert packed.used_tokens == 50 + packer.separator_tokens + 2
+    assert packed.used_tokens <= packed.budget_tokens
+    assert packed.available_tokens == packed.budget_tokens - packed.used_tokens
+
+
+def test_pack_without_documents_returns_the_empty_text(packer):
+    packed = packer.pack([], empty_text="Nothing here.")
+    assert (packed.text, packed.used_tokens, packed.included) == ("Nothing here.", 0, 0)
+
+
+def test_stats_add_up_every_part_of_a_prompt(packer):
+    stats = ContextPackingStats()
+    text = packer.pack([Document(page_content="alpha beta gamma")])
+    images = packer.pack([Document(page_content="delta")])
+    stats.add(100, text, images)
+    stats.add(100, packer.pack([Document(page_content="one two")]))
+    assert (stats.calls, stats.used_tokens, stats.budget_tokens, stats.included, stats.max_used_tokens) == (2, 6, 200, 3, 4)
+    assert stats.summary().startswith("2 contexts, 3 tokens on average (max 4) of 100 budgeted")
@@ -0,0 +1,77 @@
+# tests/test_dedup.py
+import random
+
+import pytest
+
+from src.deep_searcher.vector_store.dedup import FINGERPRINT_BITS, NearDuplicateIndex, merge_duplicate_sources, simhash
+
+
+def _flip_bits(fingerprint: int, count: int, rng: random.Random) -> int:
+    for bit in rng.sample(range(FINGERPRINT_BITS), count):
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+def _text(rng: random.Random, words: int = 150) -> str:
+    vocabulary = [f"word{i}" for i in range(1000)]
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+@pytest.mark.parametrize("threshold, expected_distance", [(1.0, 0), (0.95, 3), (0.9, 6), (0.8, 13)])
+def test_threshold_maps_to_hamming_distance(threshold, expected_distance):
+    assert NearDuplicateIndex(threshold, min_tokens=0).max_distance == expected_distance
+
+
+@pytest.mark.parametrize("threshold", [1.0, 0.95, 0.9, 0.8])
+def test_every_fingerprint_within_the_distance_is_found(threshold):
+    rng = random.Random(threshold)
+    index = NearDuplicateIndex(threshold, min_tokens=0)
+    for i in range(200):
+        original = rng.getrandbits(FINGERPRINT_BITS)
+        index.add(f"chunk-{i}", original)
+        # The bands guarantee a shared bucket for any distance up to max_distance.
+        assert index.find(_flip_bits(original, index.max_distance, rng)) == f"chunk-{i}"
+
+
+def test_fingerprints_beyond_the_distance_are_not_matched():
+    rng = random.Random(0)
+    index = NearDuplicateIndex(0.95, min_tokens=0)
+    original = rng.getrandbits(FINGERPRINT_BITS)
+    index.add("chunk", original)
+    assert index.find(_flip_bits(original, index.max_distance + 1, rng)) is None
+
+
+def test_adding_an_id_twice_keeps_the_first_fingerprint():
+    index = NearDuplicateIndex(1.0, min_tokens=0)
+    index.add("chunk", 1)
+    index.add("chunk", 2)
+    assert len(index) == 1
+    assert index.find(1) == "chunk"
+    assert index.find(2) is None
+
+
+def test_simhash_separates_near_duplicates_from_unrelated_text():
+    rng = random.Random(1)
+    text = _text(rng)
+    words = text.split()
+    words[10] = "changed"
+    near_duplicate = " ".join(words)
+    unrelated = _text(rng)
+    assert bin(simhash(text) ^ simhash(near_duplicate)).count("1") <= 6
+    assert bin(simhash(text) ^ simhash(unrelated)).count("1") > 13
+
+
+def test_simhash_ignores_case_and_punctuation():
+    assert simhash("The quick, brown fox jumps!") == simhash("the quick brown fox JUMPS")
+
+
+def test_simhash_skips_texts_shorter_than_min_tokens():
+    assert simhash("too short", min_tokens=5) is None
+    assert simhash("", min_tokens=0) is None
+    assert simhash("just long enough here now", min_tokens=5) is not None
+
+
+def test_merge_duplicate_sources_is_sorted_and_deduplicated():
+    assert merge_duplicate_sources(None, {"b", "a"}) == "a|b"
+    assert merge_duplicate_sources("c|a", {"b", "a"}) == "a|b|c"
+    assert merge_duplicate_sources("", set()) == ""
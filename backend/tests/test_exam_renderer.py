@@ -0,0 +1,72 @@
+# tests/test_exam_renderer.py
+from src.deep_searcher.models.exam_models import ExamQuestion, GeneratedSolution
+from src.deep_searcher.utils.exam_renderer import render_exam
+
+
+def _question(question_id: str, question_type: str, text: str, options=None, **solution) -> ExamQuestion:
+    return ExamQuestion(
+        id=question_id,
+        question_type=question_type,
+        question_text=text,
+        options=options,
+        solution=GeneratedSolution(**{"explanation": f"Because {question_id}.", **solution}),
+    )
+
+
+QUESTIONS = [
+    _question("q1", "MCQ", "Which is a noble gas?", ["Neon", "Sodium"], correct_option_index=0),
+    _question("q2", "MCQ", "Which is a metal?", ["Argon", "Iron"], correct_option_index=1),
+    _question("q3", "Open-Ended", "Explain ionic bonding.", final_answer="Electron transfer"),
+    _question("q4", "Lab Report", "Describe the titration."),
+]
+
+
+def test_paper_numbers_questions_across_sections():
+    paper = render_exam(QUESTIONS, title="Chemistry Midterm")["exam_paper"]
+    assert paper == (
+        "# Chemistry Midterm\n\n"
+        "## Section A: Multiple Choice Questions\n\n"
+        "**1.** Which is a noble gas?\n\nA. Neon  \nB. Sodium\n\n"
+        "**2.** Which is a metal?\n\nA. Argon  \nB. Iron\n\n"
+        "## Section B: Open-Ended Questions\n\n"
+        "**3.** Explain ionic bonding.\n\n"
+        "## Section C: Lab Report\n\n"
+        "**4.** Describe the titration.\n"
+    )
+
+
+def test_answer_key_uses_option_labels_then_final_answers():
+    key = render_exam(QUESTIONS, title="Chemistry Midterm")["answer_key"]
+    assert key.startswith("# Chemistry Midterm: Answer Key\n\n## Section A: Multiple Choice Questions\n\n")
+    assert "**1.**  \n**Answer:** A. Neon  \n**Explanation:** Because q1." in key
+    assert "**2.**  \n**Answer:** B. Iron  \n**Explanation:** Because q2." in key
+    assert "**3.**  \n**Answer:** Electron transfer  \n**Explanation:** Because q3." in key
+    assert "**4.**  \n**Explanation:** Because q4." in key
+
+
+def test_out_of_range_option_index_falls_back_to_final_answer():
+    question = _question("q1", "MCQ", "Pick", ["a", "b"], correct_option_index=5, final_answer="b")
+    assert "**Answer:** b" in render_exam([question])["answer_key"]
+
+
+def test_default_headings_without_a_title():
+    rendered = render_exam(QUESTIONS[:1])
+    assert rendered["exam_paper"].startswith("# Exam Paper\n\n")
+    assert rendered["answer_key"].startswith("# Answer Key\n\n")
+
+
+def test_a_type_that_recurs_later_starts_a_new_section():
+    questions = [QUESTIONS[0], QUESTIONS[2], QUESTIONS[1]]
+    paper = render_exam(questions)["exam_paper"]
+    assert "## Section C: Multiple Choice Questions\n\n**3.** Which is a metal?" in paper
+
+
+def test_image_is_embedded_under_its_question():
+    question = _question("q1", "Open-Ended", "Label the diagram.")
+    question.image_url = "https://example.com/cell.png"
+    paper = render_exam([question])["exam_paper"]
+    assert "**1.** Label the diagram.\n\n![Figure for question 1](https://example.com/cell.png)" in paper
+
+
+def test_rendering_is_deterministic():
+    assert render_exam(QUESTIONS, title="T") == render_exam(QUESTIONS, title="T")
@@ -0,0 +1,98 @@
+# tests/test_hybrid_retriever.py
+import asyncio
+from typing import Dict, List
+
+import pytest
+from langchain.schema.document import Document
+
+from src.deep_searcher.vector_store.hybrid_retriever import HybridRetriever
+from src.deep_searcher.vector_store.lexical_index import LexicalIndex
+
+
+class FakeCollection:
+    """Answers every query with the same chunks, in the given order."""
+
+    name = "fake"
+
+    def __init__(self, chunks: Dict[str, str]):
+        self.chunks = chunks
+
+    def count(self) -> int:
+        return len(self.chunks)
+
+    def query(self, query_embeddings, n_results, include):
+        ids = list(self.chunks)[:n_results]
+        return {
+            "ids": [ids],
+            "documents": [[self.chunks[i] for i in ids]],
+            "metadatas": [[{"id": i} for i in ids]],
+        }
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.calls = 0
+
+    def embed_query(self, text: str) -> List[float]:
+        self.calls += 1
+        return [1.0, 0.0]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return self.embed_query(text)
+
+
+def _ranking(*ids: str):
+    return [(chunk_id, Document(page_content=chunk_id)) for chunk_id in ids]
+
+
+def _retriever(**kwargs) -> HybridRetriever:
+    defaults = dict(collection=FakeCollection({}), embeddings=FakeEmbeddings(), use_mmr=False)
+    return HybridRetriever(**{**defaults, **kwargs})
+
+
+def test_fusion_favours_chunks_ranked_by_both_methods():
+    retriever = _retriever(k=3)
+    fused = retriever._fuse([_ranking("vector-only", "shared"), _ranking("lexical-only", "shared")])
+    assert [doc.page_content for doc in fused][0] == "shared"
+
+
+def test_fusion_scores_by_reciprocal_rank():
+    retriever = _retriever(k=4, rrf_k=60)
+    # c scores 1/62 + 1/62; a and d tie at 1/61 (the first seen wins); b gets 1/63.
+    fused = retriever._fuse([_ranking("a", "c", "b"), _ranking("d", "c")])
+    assert [doc.page_content for doc in fused] == ["c", "a", "d", "b"]
+
+
+def test_fusion_keeps_the_first_document_seen_and_caps_at_k():
+    retriever = _retriever(k=2)
+    first = [("x", Document(page_content="from vector"))]
+    second = [("x", Document(page_content="from lexical")), ("y", Document(page_content="y")), ("z", Document(page_content="z"))]
+    fused = retriever._fuse([first, second])
+    assert [doc.page_content for doc in fused] == ["from vector", "y"]
+
+
+def test_hybrid_retrieval_merges_vector_and_lexical_hits():
+    collection = FakeCollection({"v1": "unrelated text", "v2": "photosynthesis in plants"})
+    lexical = LexicalIndex(["v2", "l1"], ["photosynthesis in plants", "photosynthesis light reactions"], [{}, {}])
+    retriever = _retriever(collection=collection, lexical_index=lexical, k=3, mode="hybrid")
+    docs = asyncio.run(retriever.aretrieve("photosynthesis"))
+    assert docs[0].page_content == "photosynthesis in plants"
+    assert {doc.page_content for doc in docs} == {"unrelated text", "photosynthesis in plants", "photosynthesis light reactions"}
+
+
+def test_lexical_mode_never_embeds_the_query():
+    embeddings = FakeEmbeddings()
+    lexical = LexicalIndex(["a"], ["cell membrane"], [{}])
+    retriever = _retriever(embeddings=embeddings, lexical_index=lexical, mode="lexical")
+    assert not retriever.needs_query_embedding
+    docs = asyncio.run(retriever.aretrieve("membrane"))
+    assert [doc.page_content for doc in docs] == ["cell membrane"]
+    assert embeddings.calls == 0
+
+
+@pytest.mark.parametrize("lexical_index", [None, LexicalIndex([], [], [])])
+def test_falls_back_to_vector_without_a_lexical_index(lexical_index):
+    collection = FakeCollection({"v1": "only vector"})
+    retriever = _retriever(collection=collection, lexical_index=lexical_index, mode="lexical")
+    assert retriever.needs_query_embedding
+    assert [doc.page_content for doc in asyncio.run(retriever.aretrieve("query"))] == ["only vector"]
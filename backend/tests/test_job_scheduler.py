@@ -0,0 +1,105 @@
+# tests/test_job_scheduler.py
+import asyncio
+from typing import List
+
+import pytest
+
+from src.deep_searcher.utils.job_scheduler import PRIORITY_INTERACTIVE, PRIORITY_NORMAL, JobRejectedError, JobScheduler
+
+
+def _recording_job(order: List[str], name: str):
+    async def run():
+        order.append(name)
+        return name
+    return run
+
+
+async def _run_queued(scheduler: JobScheduler, jobs) -> None:
+    """Queues every job before starting the workers, so dispatch order alone decides execution order."""
+    futures = [(await scheduler.submit(factory, client_id=client, priority=priority)).future for client, priority, factory in jobs]
+    scheduler.start()
+    try:
+        await asyncio.gather(*futures)
+    finally:
+        await scheduler.stop()
+
+
+def test_clients_are_served_round_robin():
+    order: List[str] = []
+    scheduler = JobScheduler(max_workers=1, max_queue_size=0, max_jobs_per_client=0)
+    asyncio.run(_run_queued(scheduler, [
+        ("a", PRIORITY_NORMAL, _recording_job(order, "a1")),
+        ("a", PRIORITY_NORMAL, _recording_job(order, "a2")),
+        ("a", PRIORITY_NORMAL, _recording_job(order, "a3")),
+        ("b", PRIORITY_NORMAL, _recording_job(order, "b1")),
+        ("c", PRIORITY_NORMAL, _recording_job(order, "c1")),
+        ("b", PRIORITY_NORMAL, _recording_job(order, "b2")),
+    ]))
+    assert order == ["a1", "b1", "c1", "a2", "b2", "a3"]
+
+
+def test_interactive_jobs_run_before_normal_ones():
+    order: List[str] = []
+    scheduler = JobScheduler(max_workers=1, max_queue_size=0, max_jobs_per_client=0)
+    asyncio.run(_run_queued(scheduler, [
+        ("a", PRIORITY_NORMAL, _recording_job(order, "normal")),
+        ("b", PRIORITY_INTERACTIVE, _recording_job(order, "interactive")),
+    ]))
+    assert order == ["interactive", "normal"]
+
+
+def test_queued_order_matches_dispatch_order():
+    async def scenario():
+        scheduler = JobScheduler(max_workers=1, max_queue_size=0, max_jobs_per_client=0)
+        order: List[str] = []
+        for client, name in [("a", "a1"), ("a", "a2"), ("b", "b1")]:
+            await scheduler.submit(_recording_job(order, name), client_id=client)
+        queued = [job.client_id for job in scheduler._queued_jobs_in_order()]
+        scheduler.start()
+        await asyncio.sleep(0.05)
+        await scheduler.stop()
+        return queued, order
+
+    queued, order = asyncio.run(scenario())
+    assert queued == ["a", "b", "a"]
+    assert order == ["a1", "b1", "a2"]
+
+
+def test_per_client_limit_rejects_extra_jobs():
+    async def scenario():
+        scheduler = JobScheduler(max_workers=1, max_queue_size=0, max_jobs_per_client=2)
+        order: List[str] = []
+        await scheduler.submit(_recording_job(order, "a1"), client_id="a")
+        await scheduler.submit(_recording_job(order, "a2"), client_id="a")
+        await scheduler.submit(_recording_job(order, "b1"), client_id="b")
+        with pytest.raises(JobRejectedError):
+            await scheduler.submit(_recording_job(order, "a3"), client_id="a")
+
+    asyncio.run(scenario())
+
+
+def test_queue_limit_rejects_when_full():
+    async def scenario():
+        scheduler = JobScheduler(max_workers=1, max_queue_size=1, max_jobs_per_client=0)
+        await scheduler.submit(_recording_job([], "a1"), client_id="a")
+        with pytest.raises(JobRejectedError):
+            await scheduler.submit(_recording_job([], "b1"), client_id="b")
+
+    asyncio.run(scenario())
+
+
+def test_job_errors_reach_the_future():
+    async def failing():
+        raise ValueError("boom")
+
+    async def scenario():
+        scheduler = JobScheduler(max_workers=1, max_queue_size=0, max_jobs_per_client=0)
+        scheduler.start()
+        try:
+            job = await scheduler.submit(failing, client_id="a")
+            with pytest.raises(ValueError, match="boom"):
+                await job.future
+        finally:
+            await scheduler.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,70 @@
+# tests/test_pdf_pages.py
+from io import BytesIO
+
+from pypdf import PdfReader, PdfWriter
+
+from src.deep_searcher.data_pipeline.pdf_pages import PagePlan, extract_page_range, plan_pages, text_layer_chars
+
+
+def _plans(chars_per_page, max_pages=10):
+    return [(p.first_page, p.last_page, p.strategy) for p in plan_pages(chars_per_page, 100, "fast", "hi_res", max_pages)]
+
+
+def _blank_pdf(pages: int) -> bytes:
+    writer = PdfWriter()
+    for width in range(100, 100 + pages):
+        # Distinct widths let a test tell the pages apart.
+        writer.add_blank_page(width=width, height=200)
+    output = BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def test_consecutive_pages_with_one_strategy_form_a_run():
+    assert _plans([500, 400, 0, 0, 300]) == [(0, 2, "fast"), (2, 4, "hi_res"), (4, 5, "fast")]
+
+
+def test_threshold_is_inclusive():
+    assert _plans([100, 99]) == [(0, 1, "fast"), (1, 2, "hi_res")]
+
+
+def test_runs_are_split_at_max_pages():
+    assert _plans([500] * 7, max_pages=3) == [(0, 3, "fast"), (3, 6, "fast"), (6, 7, "fast")]
+
+
+def test_non_positive_max_pages_means_one_page_per_run():
+    assert _plans([0, 0], max_pages=0) == [(0, 1, "hi_res"), (1, 2, "hi_res")]
+
+
+def test_plans_cover_every_page_exactly_once():
+    chars = [0, 500, 500, 0, 500, 0, 0, 0, 500, 500, 500, 500]
+    plans = plan_pages(chars, 100, "fast", "hi_res", 2)
+    assert [p.first_page for p in plans[1:]] == [p.last_page for p in plans[:-1]]
+    assert (plans[0].first_page, plans[-1].last_page) == (0, len(chars))
+    assert all(1 <= p.page_count <= 2 for p in plans)
+
+
+def test_empty_document_has_no_plans():
+    assert plan_pages([], 100, "fast", "hi_res", 5) == []
+
+
+def test_page_plan_properties():
+    plan = PagePlan(3, 7, "fast")
+    assert (plan.page_range, plan.page_count) == ((3, 7), 4)
+
+
+def test_text_layer_of_blank_pages_is_empty(tmp_path):
+    content = _blank_pdf(3)
+    assert text_layer_chars(content) == [0, 0, 0]
+    path = tmp_path / "blank.pdf"
+    path.write_bytes(content)
+    assert text_layer_chars(str(path)) == [0, 0, 0]
+
+
+def test_unreadable_pdf_has_no_text_layer():
+    assert text_layer_chars(b"not a pdf") is None
+
+
+def test_extract_page_range_copies_only_those_pages():
+    extracted = PdfReader(BytesIO(extract_page_range(_blank_pdf(5), (1, 4))))
+    assert [int(page.mediabox.width) for page in extracted.pages] == [101, 102, 103]
@@ -0,0 +1,67 @@
+# tests/test_representative_sampler.py
+import numpy as np
+
+from src.deep_searcher.vector_store.representative_sampler import kmeans, sample_representative
+
+
+def _blobs(centers: int, per_center: int, dim: int = 8, seed: int = 0):
+    """`per_center` points tightly clustered around each of `centers` well-separated directions."""
+    rng = np.random.default_rng(seed)
+    directions = np.eye(dim)[:centers] * 10
+    points = np.concatenate([direction + rng.normal(scale=0.1, size=(per_center, dim)) for direction in directions])
+    labels = np.repeat(np.arange(centers), per_center)
+    return points.astype(np.float32), labels
+
+
+def _words(text: str) -> int:
+    return len(text.split())
+
+
+def test_kmeans_is_deterministic():
+    points, _ = _blobs(4, 25)
+    assert np.array_equal(kmeans(points, 4), kmeans(points.copy(), 4))
+
+
+def test_kmeans_finds_separated_clusters():
+    points, _ = _blobs(3, 20)
+    centroids = kmeans(points, 3)
+    nearest_direction = sorted(int(np.argmax(c)) for c in centroids)
+    assert nearest_direction == [0, 1, 2]
+
+
+def test_kmeans_with_more_clusters_than_distinct_points():
+    points = np.array([[1.0, 0.0]] * 5 + [[0.0, 1.0]] * 5, dtype=np.float32)
+    centroids = kmeans(points, 4)
+    assert centroids.shape == (4, 2)
+    assert np.isfinite(centroids).all()
+
+
+def test_everything_is_returned_when_it_fits():
+    texts = ["a b", "c d", "e f"]
+    assert sample_representative([[1.0, 0.0]] * 3, texts, budget_tokens=6, count_tokens=_words) == [0, 1, 2]
+
+
+def test_sample_covers_every_cluster_within_budget():
+    points, labels = _blobs(4, 10)
+    texts = ["one two three four"] * len(points)
+    chosen = sample_representative(points.tolist(), texts, budget_tokens=16, count_tokens=_words)
+    assert len(chosen) == 4
+    assert sorted(labels[chosen]) == [0, 1, 2, 3]
+    assert chosen == sorted(chosen)
+
+
+def test_sample_never_exceeds_the_budget():
+    points, _ = _blobs(5, 12, seed=3)
+    rng = np.random.default_rng(3)
+    texts = [" ".join(["w"] * int(n)) for n in rng.integers(1, 40, size=len(points))]
+    chosen = sample_representative(points.tolist(), texts, budget_tokens=60, count_tokens=_words)
+    assert chosen
+    assert sum(_words(texts[i]) for i in chosen) <= 60
+
+
+def test_sample_is_deterministic():
+    points, _ = _blobs(4, 15, seed=7)
+    texts = ["some words here"] * len(points)
+    first = sample_representative(points.tolist(), texts, budget_tokens=12, count_tokens=_words)
+    second = sample_representative(points.tolist(), texts, budget_tokens=12, count_tokens=_words)
+    assert first == second
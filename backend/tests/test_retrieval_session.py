@@ -0,0 +1,118 @@
+# tests/test_retrieval_session.py
+import asyncio
+from typing import List
+
+import pytest
+from langchain.schema.document import Document
+from langchain.schema.retriever import BaseRetriever
+
+from src.deep_searcher.vector_store.hybrid_retriever import HybridRetriever
+from src.deep_searcher.vector_store.retrieval_session import RetrievalSession
+
+
+class CountingRetriever(BaseRetriever):
+    """Returns one document echoing the query; fails the first `failures` calls."""
+
+    calls: int = 0
+    failures: int = 0
+
+    def _get_relevant_documents(self, query: str, *, run_manager) -> List[Document]:
+        raise NotImplementedError
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager) -> List[Document]:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.calls <= self.failures:
+            raise RuntimeError("lookup failed")
+        return [Document(page_content=query)]
+
+
+class FakeCollection:
+    name = "fake"
+
+    def count(self) -> int:
+        return 1
+
+    def query(self, query_embeddings, n_results, include):
+        return {"ids": [["a"]], "documents": [["text"]], "metadatas": [[{}]]}
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.batches: List[List[str]] = []
+        self.single_queries = 0
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.batches.append(list(texts))
+        return [[1.0, 0.0] for _ in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        self.single_queries += 1
+        return [1.0, 0.0]
+
+
+def test_concurrent_requests_for_one_query_share_a_lookup():
+    retriever = CountingRetriever()
+    session = RetrievalSession()
+
+    async def scenario():
+        return await asyncio.gather(*(session.aretrieve(retriever, "cells") for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert retriever.calls == 1
+    assert (session.lookups, session.hits) == (1, 4)
+    assert all(docs[0].page_content == "cells" for docs in results)
+
+
+def test_distinct_queries_are_retrieved_separately():
+    retriever = CountingRetriever()
+    session = RetrievalSession()
+
+    async def scenario():
+        await session.aretrieve(retriever, "cells")
+        await session.aretrieve(retriever, "atoms")
+        await session.aretrieve(retriever, "cells")
+
+    asyncio.run(scenario())
+    assert retriever.calls == 2
+    assert session.hits == 1
+
+
+def test_callers_get_their_own_result_list():
+    retriever = CountingRetriever()
+    session = RetrievalSession()
+
+    async def scenario():
+        first = await session.aretrieve(retriever, "cells")
+        first.clear()
+        return await session.aretrieve(retriever, "cells")
+
+    assert len(asyncio.run(scenario())) == 1
+
+
+def test_failures_are_not_memoized():
+    retriever = CountingRetriever(failures=1)
+    session = RetrievalSession()
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await session.aretrieve(retriever, "cells")
+        return await session.aretrieve(retriever, "cells")
+
+    assert asyncio.run(scenario())[0].page_content == "cells"
+    assert retriever.calls == 2
+
+
+def test_prefetch_embeds_distinct_queries_in_one_batch():
+    embeddings = CountingEmbeddings()
+    retriever = HybridRetriever(collection=FakeCollection(), embeddings=embeddings, mode="vector", use_mmr=False)
+    session = RetrievalSession(embeddings=embeddings)
+
+    async def scenario():
+        await session.prefetch([retriever], ["cells", "atoms", "cells"])
+        await session.aretrieve(retriever, "atoms")
+
+    asyncio.run(scenario())
+    assert embeddings.batches == [["cells", "atoms"]]
+    assert embeddings.single_queries == 0
+    assert (session.lookups, session.hits) == (2, 1)
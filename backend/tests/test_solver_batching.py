@@ -0,0 +1,91 @@
+# tests/test_solver_batching.py
+import asyncio
+from typing import Any, Dict, List
+
+from langchain_core.runnables import RunnableLambda
+
+from src.deep_searcher.agents.solver_batching import format_question_batch, solve_in_batch
+from src.deep_searcher.models.exam_models import GeneratedSolution
+
+QUESTIONS = [
+    {"question_type": "MCQ", "question_text": "Pick one", "options": ["a", "b", "c"]},
+    {"question_type": "Open-Ended", "question_text": "Explain"},
+    {"question_type": "Open-Ended", "question_text": "Describe"},
+]
+
+
+def _chains(batch_result: Any):
+    """A batch chain returning `batch_result` (or raising it) and a single chain recording what it solved."""
+    single_calls: List[Dict[str, Any]] = []
+
+    async def batch(inputs):
+        if isinstance(batch_result, Exception):
+            raise batch_result
+        return batch_result
+
+    async def single(question):
+        single_calls.append(question)
+        return {"explanation": f"single: {question['question_text']}"}
+
+    return RunnableLambda(lambda x: None, afunc=batch), RunnableLambda(lambda x: None, afunc=single), single_calls
+
+
+def _solution(number: int, **fields) -> Dict[str, Any]:
+    return {"question_number": number, "explanation": f"batch {number}", **fields}
+
+
+def test_format_question_batch_numbers_each_question():
+    text = format_question_batch(QUESTIONS[:2])
+    assert text == (
+        "### Question 1\n**Type:** MCQ\n**Text:** Pick one\n**Options (for MCQ):** ['a', 'b', 'c']"
+        "\n\n### Question 2\n**Type:** Open-Ended\n**Text:** Explain"
+    )
+
+
+def test_valid_batch_needs_no_single_calls():
+    batch, single, single_calls = _chains({"solutions": [_solution(3), _solution(1, correct_option_index=2), _solution(2)]})
+    solutions = asyncio.run(solve_in_batch(batch, single, QUESTIONS))
+    assert [s.explanation for s in solutions] == ["batch 1", "batch 2", "batch 3"]
+    assert all(isinstance(s, GeneratedSolution) for s in solutions)
+    assert single_calls == []
+
+
+def test_missing_and_invalid_items_are_re_solved_one_by_one():
+    batch, single, single_calls = _chains({"solutions": [
+        _solution(1, correct_option_index=3),  # Out of range for three options.
+        {"question_number": 2},  # No explanation.
+        _solution(7),  # No such question.
+    ]})
+    solutions = asyncio.run(solve_in_batch(batch, single, QUESTIONS))
+    assert [s["explanation"] for s in solutions] == ["single: Pick one", "single: Explain", "single: Describe"]
+    assert single_calls == QUESTIONS
+
+
+def test_mcq_without_an_answer_index_is_invalid():
+    batch, single, single_calls = _chains({"solutions": [_solution(1), _solution(2), _solution(3)]})
+    solutions = asyncio.run(solve_in_batch(batch, single, QUESTIONS))
+    assert solutions[0] == {"explanation": "single: Pick one"}
+    assert single_calls == [QUESTIONS[0]]
+
+
+def test_the_first_item_for_a_question_wins():
+    batch, single, _ = _chains({"solutions": [
+        _solution(1, correct_option_index=0), _solution(1, correct_option_index=1), _solution(2), _solution(3),
+    ]})
+    solutions = asyncio.run(solve_in_batch(batch, single, QUESTIONS))
+    assert solutions[0].correct_option_index == 0
+
+
+def test_failed_or_malformed_batches_fall_back_to_single_calls():
+    for batch_result in (RuntimeError("bad gateway"), ["not", "a", "dict"], {"solutions": "nope"}):
+        batch, single, single_calls = _chains(batch_result)
+        solutions = asyncio.run(solve_in_batch(batch, single, QUESTIONS))
+        assert len(solutions) == len(QUESTIONS)
+        assert single_calls == QUESTIONS
+
+
+def test_a_single_question_skips_the_batch_prompt():
+    batch, single, single_calls = _chains(RuntimeError("batch chain must not be called"))
+    solutions = asyncio.run(solve_in_batch(batch, single, QUESTIONS[1:2]))
+    assert solutions == [{"explanation": "single: Explain"}]
+    assert single_calls == QUESTIONS[1:2]
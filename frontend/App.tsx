@@ -82,6 +82,9 @@ const App: React.FC = () => {
       onLog: (log) => {
         setProgressLogs(prev => [...prev, log.message]);
       },
+      onPartialResult: (partial) => {
+        setProgressLogs(prev => [...prev, `Question ${partial.completed}/${partial.total}${partial.final ? '' : '+'} ready (${partial.question.question_type}).`]);
+      },
       onResult: (result) => {
         finalResultReceived = true;
         setExamData(result);
@@ -1,6 +1,6 @@
 
 import { API_BASE_URL } from '../constants';
-import { ExamFromTopicRequest, FullExam, ExamQuestion } from '../types';
+import { ExamFromTopicRequest, FullExam, ExamQuestion, PartialResult } from '../types';
 
 async function handleResponse<T>(response: Response): Promise<T> {
   if (!response.ok) {
@@ -20,6 +20,7 @@ async function handleResponse<T>(response: Response): Promise<T> {
 export interface StreamCallbacks {
   onProgress: (progress: { step: string; status: string }) => void;
   onLog: (log: { message: string }) => void;
+  onPartialResult?: (partial: PartialResult) => void;
   onResult: (result: FullExam) => void;
   onError: (error: { detail: string }) => void;
   onEnd: () => void;
@@ -63,6 +64,9 @@ async function processStream(response: Response, callbacks: StreamCallbacks) {
             case 'log':
               callbacks.onLog(parsedData);
               break;
+            case 'partial_result':
+              callbacks.onPartialResult?.(parsedData as PartialResult);
+              break;
             case 'final_result':
               callbacks.onResult(parsedData as FullExam);
               break;
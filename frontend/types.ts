@@ -10,6 +10,7 @@ export interface ExamFromTopicRequest {
   grade_level: string;
   exam_title: string;
   question_specs: QuestionSpec[];
+  bypass_cache?: boolean;
 }
 
 export interface GeneratedSolution {
@@ -27,6 +28,14 @@ export interface ExamQuestion {
   solution: GeneratedSolution;
 }
 
+export interface PartialResult {
+  question: ExamQuestion;
+  completed: number;
+  // Questions generated so far; grows until `final` is true.
+  total: number;
+  final: boolean;
+}
+
 export interface IngestionSummary {
   message: string;
   processed_sources_count: number;
@@ -35,6 +44,14 @@ export interface IngestionSummary {
   ingested_sources: string[];
 }
 
+export interface LLMCacheSummary {
+  hits: number;
+  misses: number;
+  hit_rate: number;
+  saved_prompt_tokens: number;
+  saved_completion_tokens: number;
+}
+
 export interface FullExam {
   exam_id: string;
   ingestion_summary: IngestionSummary;
@@ -43,6 +60,7 @@ export interface FullExam {
   answer_key_markdown: string;
   questions: ExamQuestion[];
   sources_used: string[];
+  llm_cache?: LLMCacheSummary;
 }
 
 // Helper type for QuestionSpec with a local ID for list rendering